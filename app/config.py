@@ -44,6 +44,107 @@ class Config:
             'uploading': 'カレンダーにアップロード中...'
         }
     }
+    
+    # Google Custom Search 用HTTPクライアント設定
+    SEARCH_HTTP_TIMEOUT = float(os.getenv('SEARCH_HTTP_TIMEOUT', '10.0'))
+    SEARCH_HTTP_MAX_CONNECTIONS = int(os.getenv('SEARCH_HTTP_MAX_CONNECTIONS', '20'))
+    SEARCH_HTTP_MAX_KEEPALIVE = int(os.getenv('SEARCH_HTTP_MAX_KEEPALIVE', '10'))
+    
+    # ローカルキャッシュ（SQLite）の保存先
+    CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+    
+    # 検索レスポンスキャッシュ設定（秒）
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', str(6 * 60 * 60)))
+    SEARCH_CACHE_NEGATIVE_TTL = float(os.getenv('SEARCH_CACHE_NEGATIVE_TTL', str(60 * 60)))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1024'))
+    
+    # Custom Search 日次クォータ設定
+    SEARCH_DAILY_QUOTA = int(os.getenv('SEARCH_DAILY_QUOTA', '100'))
+    SEARCH_QUOTA_MAX_STALENESS_DAYS = float(os.getenv('SEARCH_QUOTA_MAX_STALENESS_DAYS', '14'))
+    
+    # バッチ収集のステージごとの同時実行数
+    COLLECT_SEARCH_CONCURRENCY = int(os.getenv('COLLECT_SEARCH_CONCURRENCY', '4'))
+    COLLECT_EXTRACT_CONCURRENCY = int(os.getenv('COLLECT_EXTRACT_CONCURRENCY', '2'))
+    COLLECT_QUEUE_SIZE = int(os.getenv('COLLECT_QUEUE_SIZE', '8'))
+    
+    # 検索クエリの打ち切り・ページ送り設定
+    SEARCH_PLAN_FIRST_WAVE = int(os.getenv('SEARCH_PLAN_FIRST_WAVE', '2'))
+    SEARCH_EARLY_STOP_URLS = int(os.getenv('SEARCH_EARLY_STOP_URLS', '5'))
+    SEARCH_THIN_RESULTS = int(os.getenv('SEARCH_THIN_RESULTS', '8'))
+    SEARCH_MAX_EXTRA_PAGES = int(os.getenv('SEARCH_MAX_EXTRA_PAGES', '1'))
+    
+    # 検索結果ページの本文取得（オプション）
+    PAGE_ENRICHMENT_ENABLED = os.getenv('PAGE_ENRICHMENT_ENABLED', 'False').lower() == 'true'
+    PAGE_FETCH_TIMEOUT = float(os.getenv('PAGE_FETCH_TIMEOUT', '8.0'))
+    PAGE_FETCH_MAX_CONNECTIONS = int(os.getenv('PAGE_FETCH_MAX_CONNECTIONS', '32'))
+    PAGE_FETCH_PER_HOST = int(os.getenv('PAGE_FETCH_PER_HOST', '2'))
+    PAGE_FETCH_MAX_BYTES = int(os.getenv('PAGE_FETCH_MAX_BYTES', str(512 * 1024)))
+    PAGE_CONTENT_MAX_CHARS = int(os.getenv('PAGE_CONTENT_MAX_CHARS', '1200'))
+    PAGE_FETCH_USER_AGENT = os.getenv(
+        'PAGE_FETCH_USER_AGENT', 'Mozilla/5.0 (compatible; ScheduleAutoFeed/0.1)'
+    )
+    
+    # Gemini抽出結果キャッシュ設定（プロンプト内容をキーとする）
+    EXTRACTION_CACHE_ENABLED = os.getenv('EXTRACTION_CACHE_ENABLED', 'True').lower() == 'true'
+    EXTRACTION_CACHE_TTL = float(os.getenv('EXTRACTION_CACHE_TTL', str(7 * 24 * 60 * 60)))
+    EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '256'))
+    # 手動でキャッシュを無効化したい場合に変更する（テンプレート変更時は自動で無効化される）
+    EXTRACTION_CACHE_VERSION = os.getenv('EXTRACTION_CACHE_VERSION', '1')
+    
+    # 抽出プロンプトに含める検索結果のトークン予算（価値の高い結果から採用）
+    PROMPT_SEARCH_TOKEN_BUDGET = int(os.getenv('PROMPT_SEARCH_TOKEN_BUDGET', '2500'))
+    
+    # 今日以降の日付表記を含まない検索結果をGemini送信前に除外するか
+    DATE_PREFILTER_ENABLED = os.getenv('DATE_PREFILTER_ENABLED', 'true').lower() == 'true'
+    DATE_PREFILTER_HORIZON_DAYS = int(os.getenv('DATE_PREFILTER_HORIZON_DAYS', '400'))
+    
+    # チケットサイト・公式スケジュールページの定型フォーマットをLLMを使わずに抽出するか
+    RULE_EXTRACTION_ENABLED = os.getenv('RULE_EXTRACTION_ENABLED', 'true').lower() == 'true'
+    # アーティストごとの公式サイトのドメイン（公式スケジュールページのルール抽出の対象）
+    # 例: "IVE=ive-official.jp;aespa=aespa-official.jp,smtown.jp"
+    OFFICIAL_SITE_DOMAINS = {
+        artist.strip().lower(): [domain.strip().lower() for domain in domains.split(',') if domain.strip()]
+        for artist, _, domains in (
+            entry.partition('=') for entry in os.getenv('OFFICIAL_SITE_DOMAINS', '').split(';') if '=' in entry
+        )
+    }
+    
+    # Custom Search・Gemini呼び出しの記録/再生（off / record / replay）
+    CASSETTE_MODE = os.getenv('CASSETTE_MODE', 'off').lower()
+    CASSETTE_PATH = os.getenv('CASSETTE_PATH', os.path.join(CACHE_DIR, 'cassettes', 'default.json.gz'))
+    # 再生時に記録されたレイテンシを何倍で再現するか（0で待機しない）
+    CASSETTE_LATENCY_SCALE = float(os.getenv('CASSETTE_LATENCY_SCALE', '0.0'))
+    
+    # Gemini API呼び出しのタイムアウト（秒）
+    GEMINI_REQUEST_TIMEOUT = float(os.getenv('GEMINI_REQUEST_TIMEOUT', '60.0'))
+    
+    # 外部API（Gemini・Custom Search）の再試行とサーキットブレーカー
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '0.5'))
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '8.0'))
+    RETRY_DEADLINE = float(os.getenv('RETRY_DEADLINE', '30.0'))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30.0'))
+    
+    # Firestoreに接続できなかった場合に再接続を試みる間隔（秒）
+    FIRESTORE_RECONNECT_INTERVAL = float(os.getenv('FIRESTORE_RECONNECT_INTERVAL', '60.0'))
+    
+    # モデルカスケード（安価なモデルから順に試し、不確かな結果のみ上位モデルへ）
+    GEMINI_CASCADE_MODELS = [
+        name.strip() for name in os.getenv('GEMINI_CASCADE_MODELS', 'gemini-1.5-flash,gemini-1.5-pro').split(',')
+        if name.strip()
+    ]
+    CASCADE_MIN_CONFIDENCE = float(os.getenv('CASCADE_MIN_CONFIDENCE', '0.7'))
+    
+    # 複数アーティストをまとめて1回のGemini呼び出しで抽出するバッチモード
+    GEMINI_BATCH_EXTRACTION = os.getenv('GEMINI_BATCH_EXTRACTION', 'False').lower() == 'true'
+    GEMINI_BATCH_MAX_ARTISTS = int(os.getenv('GEMINI_BATCH_MAX_ARTISTS', '10'))
+    GEMINI_BATCH_TOKEN_BUDGET = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', '12000'))
+    GEMINI_BATCH_LINGER = float(os.getenv('GEMINI_BATCH_LINGER', '0.5'))
+    
+    # ScheduleExtractor（ツイート・テキスト抽出）の一括プロンプト件数と同時実行数
+    EXTRACTOR_BATCH_SIZE = int(os.getenv('EXTRACTOR_BATCH_SIZE', '8'))
+    EXTRACTOR_CONCURRENCY = int(os.getenv('EXTRACTOR_CONCURRENCY', '4'))
 
 # 日本語プロンプトテンプレート
 JAPANESE_PROMPTS = {
@@ -103,6 +204,24 @@ JSON形式で回答してください：
 """
 }
 
+# 信頼性の高い情報源ドメイン（公式チケットサイト・大手メディア）
+HIGH_RELIABILITY_DOMAINS = [
+    # チケットサイト
+    'eplus.jp', 't.pia.jp', 'pia.jp', 'l-tike.com', 'ticket.yahoo.co.jp',
+    'tixplus.jp', 'ticketboard.jp', 'cnplayguide.com',
+    # 音楽・エンターテイメントメディア
+    'natalie.mu', 'billboard-japan.com', 'oricon.co.jp', 'barks.jp',
+    'musicman.co.jp', 'kstyle.com', 'wowkorea.jp',
+    # 新聞社・放送局
+    'nhk.or.jp', 'asahi.com', 'yomiuri.co.jp', 'mainichi.jp', 'nikkei.com'
+]
+
+# Geminiモデルの100万トークンあたりの料金（USD: 入力, 出力）。コスト見積もりに使用
+GEMINI_MODEL_PRICES = {
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-pro': (1.25, 5.00),
+}
+
 # 汎用ジャンル対応 改良版Gemini信頼性フィルタリングプロンプト
 UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE = """
 以下の検索結果から、{artist_name}の信頼性の高い{genre}スケジュール情報のみを抽出してください。
@@ -160,6 +279,64 @@ UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE = """
 }}
 """
 
+# 複数アーティスト一括抽出用プロンプト（判定基準は1回だけ送る）
+MULTI_ARTIST_SCHEDULE_PROMPT_TEMPLATE = """
+以下はアーティストごとにまとめた検索結果です。各アーティストについて、信頼性の高いスケジュール情報のみを抽出してください。
+
+【汎用信頼性判定基準】
+高信頼度：
+- 公式サイト（アーティスト・レーベル・事務所の公式サイト）
+- 大手メディア（新聞社、テレビ局、音楽専門メディア）
+- 公式チケットサイト（e+、チケットぴあ、ローソンチケット、イープラスなど）
+- 政府・自治体の公式発表
+- 認証済み公式SNSアカウント
+- 確立された音楽・エンターテイメント情報サイト
+
+低信頼度（無視する）：
+- 個人ブログ・まとめサイト・アフィリエイトサイト
+- 「〜かも」「〜らしい」「噂」「予想」「リーク」「憶測」を含む投稿
+- 匿名掲示板・SNSの非公式投稿
+- 「未確認」「情報待ち」「ファンの予想」を含む情報
+- Wikiサイト・フォーラム・Q&Aサイト
+
+【抽出ルール】
+1. 明確な日付が記載されているもののみ
+2. 過去の日付は除外
+3. 信頼度0.7未満の情報は除外
+4. 重複する情報は信頼度の高いものを優先
+5. 各アーティストの検索結果からは、そのアーティストに関連するイベントのみを抽出
+6. 指定されたジャンルに適合しない情報は除外
+
+{artist_sections}
+
+【出力形式】
+以下のJSON形式でのみ回答してください。他の文章は含めないでください。
+"artists"のキーには各セクションのID（{artist_ids}）を使い、すべてのIDを含めてください。
+
+{{
+    "artists": {{
+        "A1": {{
+            "events": [
+                {{
+                    "date": "YYYY-MM-DD",
+                    "time": "HH:MM",
+                    "title": "イベント名",
+                    "artist": "アーティスト名",
+                    "type": "コンサート|リリース|テレビ出演|ラジオ出演|イベント|ファンミーティング|その他",
+                    "location": "開催場所",
+                    "source": "https://...",
+                    "confidence": 0.9,
+                    "reliability": "high|medium|low",
+                    "genre": "ジャンル"
+                }}
+            ]
+        }}
+    }}
+}}
+
+該当する情報がないアーティストは空の配列を返してください：{{"events": []}}
+"""
+
 # K-POP専用（後方互換性のため残す）
 JAPANESE_SCHEDULE_PROMPT_TEMPLATE = """
 以下の検索結果から、{artist_name}の信頼性の高いK-POPスケジュール情報のみを抽出してください。
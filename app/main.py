@@ -5,6 +5,7 @@ Universal Entertainment Schedule Auto-Feed メインエントリポイント
 """
 
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional
 from datetime import datetime, timezone, timedelta
 
@@ -14,7 +15,11 @@ from pydantic import BaseModel
 
 # カレンダー機能のインポート
 from app.services.calendar import CalendarService
-from app.routers.events import EventData
+from app.models.events import EventData
+from app.services.schedule_collector import ScheduleCollector
+from app.services.cassette import save_cassette
+from app.services.page_fetcher import close_page_fetcher
+from app.services.llm_clients import get_llm_registry
 
 # ロギング設定
 logging.basicConfig(
@@ -24,11 +29,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションの起動・終了処理"""
+    # 検索用の共有HTTPクライアント（コネクションプール）を生成
+    ScheduleCollector.open_http_client()
+    # Geminiモデルを起動時に生成し、以降のリクエストで共有
+    get_llm_registry().warm_up()
+    yield
+    await ScheduleCollector.close_http_client()
+    await close_page_fetcher()
+    save_cassette()
+
 # FastAPIアプリケーション初期化
 app = FastAPI(
     title="Universal Entertainment Schedule Auto-Feed",
     description="あらゆるジャンルのアーティスト・エンターテイメント情報を自動収集するシステム",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # ルーターの登録
@@ -285,7 +303,8 @@ async def http_exception_handler(request, exc):
                 "status_code": exc.status_code,
                 "detail": exc.detail
             }
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
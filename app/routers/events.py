@@ -9,47 +9,16 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel
 from google.cloud import firestore
 
+from app.models.events import EventData
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-class EventData(BaseModel):
-    """イベントデータモデル"""
-    date: str = Field(..., description="イベント日付 (YYYY-MM-DD)")
-    time: str = Field(..., description="イベント時間 (HH:MM)")
-    title: str = Field(..., description="イベントタイトル")
-    artist: str = Field(..., description="アーティスト名")
-    type: str = Field(..., description="イベント種別")
-    location: str = Field(..., description="開催場所")
-    source: str = Field(..., description="情報源URL")
-    confidence: float = Field(..., ge=0.0, le=1.0, description="信頼度")
-    reliability: str = Field(..., description="信頼性レベル")
-    
-    @validator('date')
-    def validate_date_format(cls, v):
-        """日付フォーマットの検証"""
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError('日付は YYYY-MM-DD 形式で入力してください')
-    
-    @validator('time')
-    def validate_time_format(cls, v):
-        """時間フォーマットの検証（空文字許可）"""
-        if v == "":
-            return v
-        try:
-            datetime.strptime(v, '%H:%M')
-            return v
-        except ValueError:
-            raise ValueError('時間は HH:MM 形式で入力してください')
-
-
 class SaveResponse(BaseModel):
     """保存レスポンス"""
     id: str
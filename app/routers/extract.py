@@ -5,16 +5,26 @@ Gemini APIを使用したスケジュール情報抽出エンドポイント
 
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import google.generativeai as genai
+from app.config import Config
+from app.services.extraction_cache import get_extraction_cache
+from app.services.llm_clients import get_llm_registry
+from app.services.resilience import DependencyUnavailableError, call_with_retry, get_circuit_breaker
+from app.utils.gemini_json import (
+    EVENTS_RESPONSE_SCHEMA, IncrementalEventParser, json_generation_config, parse_events
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+
 
 class SourceItem(BaseModel):
     """検索結果の項目"""
@@ -33,40 +43,24 @@ class ExtractResponse(BaseModel):
     events: List[Dict[str, Any]]
 
 
-@router.post("/extract", response_model=ExtractResponse)
-async def extract_schedules(request: ExtractRequest) -> ExtractResponse:
+def _build_extract_prompt(sources: List[SourceItem]) -> str:
     """
-    検索結果からスケジュール情報を抽出
+    検索結果から抽出プロンプトを生成
     
     Args:
-        request: 検索結果のリスト
+        sources: 検索結果のリスト
         
     Returns:
-        抽出されたスケジュール情報
+        プロンプト文字列
     """
-    # バリデーション
-    if not request.sources:
-        raise HTTPException(status_code=400, detail="sourcesが空です")
-    
-    # Gemini API設定
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("GEMINI_API_KEY not found in environment variables")
-        raise HTTPException(status_code=500, detail="API設定エラー")
+    # 検索結果をテキストに変換
+    search_text = "\n\n".join([
+        f"タイトル: {item.title}\nURL: {item.url}\n内容: {item.snippet}"
+        for item in sources
+    ])
     
-    try:
-        # Gemini APIの初期化
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # 検索結果をテキストに変換
-        search_text = "\n\n".join([
-            f"タイトル: {item.title}\nURL: {item.url}\n内容: {item.snippet}"
-            for item in request.sources
-        ])
-        
-        # プロンプト作成
-        prompt = f"""
+    # プロンプト作成
+    return f"""
 以下の検索結果から、信頼性の高いK-POPスケジュール情報のみを抽出してください。
 
 【信頼性判定基準】
@@ -94,50 +88,220 @@ async def extract_schedules(request: ExtractRequest) -> ExtractResponse:
 【出力形式】
 以下のJSON形式で出力してください：
 {{
-    "events": [
-        {{
-            "date": "YYYY-MM-DD",
-            "time": "HH:MM",
-            "title": "イベント名",
-            "artist": "アーティスト名", 
-            "type": "コンサート|リリース|テレビ出演|ラジオ出演|イベント|その他",
-            "location": "開催場所",
-            "source": "https://...",
-            "confidence": 0.9,
-            "reliability": "high|medium|low"
-        }}
-    ]
+"events": [
+    {{
+        "date": "YYYY-MM-DD",
+        "time": "HH:MM",
+        "title": "イベント名",
+        "artist": "アーティスト名", 
+        "type": "コンサート|リリース|テレビ出演|ラジオ出演|イベント|その他",
+        "location": "開催場所",
+        "source": "https://...",
+        "confidence": 0.9,
+        "reliability": "high|medium|low"
+    }}
+]
 }}
 
 信頼性が低い場合は結果を空の配列で返してください。
 """
+
+
+def _require_api_key() -> str:
+    """Gemini APIキーを取得（未設定の場合500エラー）"""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("GEMINI_API_KEY not found in environment variables")
+        raise HTTPException(status_code=500, detail="API設定エラー")
+    return api_key
+
+
+@router.post("/extract", response_model=ExtractResponse)
+async def extract_schedules(request: ExtractRequest) -> ExtractResponse:
+    """
+    検索結果からスケジュール情報を抽出
+    
+    Args:
+        request: 検索結果のリスト
+        
+    Returns:
+        抽出されたスケジュール情報
+    """
+    # バリデーション
+    if not request.sources:
+        raise HTTPException(status_code=400, detail="sourcesが空です")
+    
+    # Gemini API設定
+    api_key = _require_api_key()
+    
+    try:
+        prompt = _build_extract_prompt(request.sources)
+        
+        # 同一プロンプトの応答はキャッシュから再利用
+        cache = get_extraction_cache()
+        cached_text = cache.get(GEMINI_MODEL_NAME, prompt) if cache is not None else None
+        if cached_text is not None:
+            return ExtractResponse(events=parse_events(cached_text) or [])
+        
+        # プロセスで共有するGeminiモデルを取得
+        model = get_llm_registry().get_gemini_model(api_key, GEMINI_MODEL_NAME)
         
-        # Gemini APIに送信
-        response = model.generate_content(prompt)
+        # Gemini APIに送信（イベントループを塞がないよう非同期APIを使用、429/5xxはバックオフして再試行）
+        timeout = Config.GEMINI_REQUEST_TIMEOUT
+        response = await call_with_retry(
+            lambda: asyncio.wait_for(
+                model.generate_content_async(
+                    prompt,
+                    generation_config=json_generation_config(EVENTS_RESPONSE_SCHEMA),
+                    request_options={'timeout': timeout}
+                ),
+                timeout=timeout
+            ),
+            get_circuit_breaker('gemini')
+        )
         
         # レスポンスをパース
-        try:
-            # JSONブロックを抽出
-            response_text = response.text.strip()
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_text = response_text[json_start:json_end].strip()
-            elif response_text.startswith("{"):
-                json_text = response_text
-            else:
-                # JSONが見つからない場合
-                json_text = '{"events": []}'
-            
-            result = json.loads(json_text)
-            events = result.get("events", [])
-            
-            return ExtractResponse(events=events)
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parse error: {e}, response: {response.text}")
+        events = parse_events(response.text)
+        if events is None:
+            logger.error(f"JSON parse error, response: {response.text}")
             return ExtractResponse(events=[])
+        
+        # 解析できた応答のみキャッシュする
+        if cache is not None:
+            cache.set(GEMINI_MODEL_NAME, prompt, response.text)
+        return ExtractResponse(events=events)
             
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini API timed out after {Config.GEMINI_REQUEST_TIMEOUT}s")
+        raise HTTPException(status_code=504, detail="スケジュール抽出がタイムアウトしました")
+    except DependencyUnavailableError as e:
+        logger.error(f"Gemini API unavailable: {e}")
+        headers = {'Retry-After': str(int(e.retry_after + 0.5))} if e.retry_after is not None else None
+        raise HTTPException(status_code=503, detail="スケジュール抽出サービスが一時的に利用できません",
+                            headers=headers)
     except Exception as e:
         logger.error(f"Gemini API error: {e}")
-        raise HTTPException(status_code=500, detail="スケジュール抽出エラー")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="スケジュール抽出エラー")
+
+
+def _ndjson(payload: Dict[str, Any]) -> bytes:
+    """NDJSONの1行にエンコード"""
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _chunk_text(chunk: Any) -> str:
+    """ストリーミング応答の断片からテキストを取り出す（テキストを含まない断片は空文字）"""
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+async def _stream_extracted_events(prompt: str, api_key: str) -> AsyncIterator[bytes]:
+    """
+    Geminiのストリーミング応答を逐次解析し、完成したイベントから順にNDJSONで送出
+    
+    各行は {"type": "event", "event": {...}}、最後に {"type": "done", "count": N}、
+    失敗時は {"type": "error", "status": 503|504|500, "message": ...} を送出する
+    
+    Args:
+        prompt: 抽出プロンプト
+        api_key: Gemini APIキー
+        
+    Returns:
+        NDJSONの行を返す非同期イテレータ
+    """
+    # 同一プロンプトの応答はキャッシュから再利用
+    cache = get_extraction_cache()
+    cached_text = cache.get(GEMINI_MODEL_NAME, prompt) if cache is not None else None
+    if cached_text is not None:
+        events = parse_events(cached_text) or []
+        for event in events:
+            yield _ndjson({"type": "event", "event": event})
+        yield _ndjson({"type": "done", "count": len(events), "cached": True})
+        return
+    
+    model = get_llm_registry().get_gemini_model(api_key, GEMINI_MODEL_NAME)
+    timeout = Config.GEMINI_REQUEST_TIMEOUT
+    parser = IncrementalEventParser()
+    breaker = get_circuit_breaker('gemini')
+    # ストリーム開始後の失敗はcall_with_retryの外で起きるため、ここでサーキットに記録する
+    streaming = False
+    
+    try:
+        # ストリームの開始までは429/5xxをバックオフして再試行する
+        response = await call_with_retry(
+            lambda: asyncio.wait_for(
+                model.generate_content_async(
+                    prompt,
+                    generation_config=json_generation_config(EVENTS_RESPONSE_SCHEMA),
+                    stream=True,
+                    request_options={'timeout': timeout}
+                ),
+                timeout=timeout
+            ),
+            breaker
+        )
+        streaming = True
+        
+        # 断片ごとのタイムアウトで、生成が止まった場合も打ち切る
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+            except StopAsyncIteration:
+                break
+            for event in parser.feed(_chunk_text(chunk)):
+                yield _ndjson({"type": "event", "event": event})
+        
+        for event in parser.finish():
+            yield _ndjson({"type": "event", "event": event})
+            
+    except asyncio.TimeoutError:
+        logger.error(f"Gemini stream timed out after {timeout}s")
+        if streaming:
+            breaker.record_failure()
+        yield _ndjson({"type": "error", "status": 504, "message": "スケジュール抽出がタイムアウトしました"})
+        return
+    except DependencyUnavailableError as e:
+        logger.error(f"Gemini API unavailable: {e}")
+        yield _ndjson({"type": "error", "status": 503,
+                       "message": "スケジュール抽出サービスが一時的に利用できません"})
+        return
+    except Exception as e:
+        logger.error(f"Gemini stream error: {e}")
+        if streaming:
+            breaker.record_failure()
+        yield _ndjson({"type": "error", "status": 500, "message": "スケジュール抽出エラー"})
+        return
+    
+    # 解析できた応答のみキャッシュする
+    if cache is not None and parse_events(parser.text) is not None:
+        cache.set(GEMINI_MODEL_NAME, prompt, parser.text)
+    yield _ndjson({"type": "done", "count": parser.emitted})
+
+
+@router.post("/extract/stream")
+async def stream_extract_schedules(request: ExtractRequest) -> StreamingResponse:
+    """
+    検索結果からスケジュール情報を抽出し、完成したイベントから順にNDJSONで返す
+    
+    Args:
+        request: 検索結果のリスト
+        
+    Returns:
+        application/x-ndjson のストリーミングレスポンス
+    """
+    # バリデーション（ストリーム開始前にHTTPエラーとして返す）
+    if not request.sources:
+        raise HTTPException(status_code=400, detail="sourcesが空です")
+    
+    api_key = _require_api_key()
+    breaker = get_circuit_breaker('gemini').get_stats()
+    if breaker['state'] == 'open':
+        raise HTTPException(status_code=503, detail="スケジュール抽出サービスが一時的に利用できません",
+                            headers={'Retry-After': str(int(breaker['retry_after_seconds'] + 0.5))})
+    
+    prompt = _build_extract_prompt(request.sources)
+    return StreamingResponse(_stream_extracted_events(prompt, api_key), media_type="application/x-ndjson")
+
@@ -12,7 +12,13 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel, Field
 
-from app.services.schedule_collector import ScheduleCollector
+from app.services.schedule_collector import ScheduleCollector, get_quota_manager, get_evidence_store
+from app.services.search_cache import get_search_cache
+from app.services.extraction_cache import get_extraction_cache
+from app.services.model_cascade import get_cascade_stats
+from app.services.llm_clients import get_llm_registry
+from app.services.resilience import get_circuit_breaker_stats
+from app.services.cassette import get_cassette
 from app.services.firestore_client import FirestoreClient
 from app.services.register import ArtistRegisterService
 from app.services.calendar import CalendarService
@@ -65,9 +71,17 @@ class BatchCollectionResponse(BaseModel):
     collected_at: Optional[str] = None
 
 
+# プロセスで共有するScheduleCollector（Firestore接続に成功した時点で固定）
+_schedule_collector: Optional[ScheduleCollector] = None
+
+
 # 依存関数
 def get_schedule_collector() -> ScheduleCollector:
-    """ScheduleCollectorのインスタンスを取得"""
+    """プロセスで共有するScheduleCollectorのインスタンスを取得"""
+    global _schedule_collector
+    if _schedule_collector is not None:
+        return _schedule_collector
+    
     try:
         # 環境変数から設定を取得
         google_api_key = os.getenv('GOOGLE_API_KEY')
@@ -84,12 +98,15 @@ def get_schedule_collector() -> ScheduleCollector:
             logger.warning(f"Firestore client initialization failed: {e}")
             firestore_client = None
         
-        return ScheduleCollector(
+        # Firestoreが使えない場合はコレクターが保存時に再接続を試みる
+        _schedule_collector = ScheduleCollector(
             google_api_key=google_api_key,
             google_search_engine_id=google_search_engine_id,
             gemini_api_key=gemini_api_key,
-            firestore_client=firestore_client
+            firestore_client=firestore_client,
+            firestore_factory=FirestoreClient
         )
+        return _schedule_collector
         
     except Exception as e:
         logger.error(f"Failed to initialize ScheduleCollector: {e}")
@@ -280,10 +297,17 @@ async def collect_registered_artists_schedules(
         # アーティスト名のリストを作成
         artist_names = [artist['name'] for artist in active_artists]
         
+        # 登録ユーザー数（クォータ配分の優先度）を取得
+        try:
+            subscriber_counts = firestore_client.get_artist_subscriber_counts()
+        except Exception as e:
+            logger.warning(f"Failed to get subscriber counts: {e}")
+            subscriber_counts = {}
+        
         # バッチ収集をバックグラウンドで実行
         background_tasks.add_task(
             _collect_registered_artists_background,
-            collector, artist_names, days_ahead, user_id
+            collector, artist_names, days_ahead, user_id, subscriber_counts
         )
         
         return {
@@ -336,6 +360,15 @@ async def get_collection_status():
             'timestamp': datetime.now().isoformat(),
             'environment_variables': env_status,
             'firestore': firestore_status,
+            'search_cache': get_search_cache().get_stats(),
+            'search_quota': get_quota_manager().get_status(),
+            'single_flight': ScheduleCollector.get_single_flight_stats(),
+            'evidence_reuse': get_evidence_store().get_stats(),
+            'extraction_cache': get_extraction_cache().get_stats() if get_extraction_cache() else None,
+            'model_cascade': get_cascade_stats().get_stats(),
+            'llm_clients': get_llm_registry().get_stats(),
+            'circuit_breakers': get_circuit_breaker_stats(),
+            'cassette': get_cassette().get_stats() if get_cassette() else None,
             'services': {
                 'google_search': 'configured' if env_status.get('GOOGLE_API_KEY') == 'configured' else 'not_configured',
                 'gemini_ai': 'configured' if env_status.get('GEMINI_API_KEY') == 'configured' else 'not_configured',
@@ -376,7 +409,7 @@ async def _add_to_calendar_background(events: List[Dict[str, Any]], user_id: str
         
         # Calendar サービスの初期化
         from app.services.calendar import CalendarService
-        from app.routers.events import EventData
+        from app.models.events import EventData
         
         calendar_service = CalendarService()
         
@@ -438,23 +471,20 @@ async def _add_to_calendar_background(events: List[Dict[str, Any]], user_id: str
 async def _collect_registered_artists_background(collector: ScheduleCollector,
                                                 artist_names: List[str],
                                                 days_ahead: int,
-                                                user_id: str):
+                                                user_id: str,
+                                                subscriber_counts: Optional[Dict[str, int]] = None):
     """登録済みアーティストの収集をバックグラウンドで実行"""
     try:
         logger.info(f"Background task: Collecting schedules for {len(artist_names)} registered artists")
         
+        # パイプラインの保存ステージで完了したアーティストから順にFirestoreに保存
         result = await collector.collect_multiple_artists_schedules(
             artist_names=artist_names,
-            days_ahead=days_ahead
+            days_ahead=days_ahead,
+            subscriber_counts=subscriber_counts,
+            save_to_firestore=True
         )
         
-        # 成功した収集結果をFirestoreに保存
-        for collection_result in result.get('successful_collections', []):
-            events = collection_result.get('extracted_events', [])
-            artist_name = collection_result.get('artist_name', '')
-            if events and artist_name:
-                await collector.save_schedules_to_firestore(events, artist_name)
-        
         logger.info(f"Background collection completed: {result['message']}")
         
     except Exception as e:
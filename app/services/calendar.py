@@ -19,7 +19,7 @@ logger = logging.getLogger(__name__)
 
 # 型ヒント用インポート
 try:
-    from app.routers.events import EventData
+    from app.models.events import EventData
 except ImportError:
     # テストスクリプトから実行された場合の代替import
     from typing import Any
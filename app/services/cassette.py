@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+外部API呼び出しの記録/再生（カセット）
+Custom Search・Geminiへのリクエストと応答の組をgzip圧縮したJSONファイルに記録し、
+再生モードではネットワークに出ずに記録済みの応答（と必要ならレイテンシ）を返す
+検索クエリや日付の絞り込みは今日の日付で変わるため、再生時は記録した日を「今日」として扱う
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_FORMAT_VERSION = 1
+
+# 記録しないリクエストパラメータ（APIキーをカセットファイルに残さない）
+_SECRET_PARAMS = {'key'}
+
+
+class CassetteMissError(Exception):
+    """再生モードで記録にないリクエストが発行された"""
+
+
+class ReplayedResponse:
+    """記録済みのHTTP応答（httpx.Responseのうちパイプラインが使う属性だけを持つ）"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: Any):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+
+    def json(self) -> Any:
+        return self._body
+
+
+class ReplayedGeneration:
+    """記録済みのGemini応答（GenerateContentResponseのtextのみ）"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Cassette:
+    """リクエストの内容ハッシュをキーに応答を記録・再生するカセット"""
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    def __init__(self, path: str, mode: str, latency_scale: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            path: カセットファイルのパス（gzip圧縮JSON）
+            mode: record（実際に呼び出して記録）または replay（記録から再生）
+            latency_scale: 再生時に記録されたレイテンシを何倍で再現するか（0で待機しない）
+
+        Raises:
+            ValueError: モードが不正な場合
+        """
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = Config.CASSETTE_LATENCY_SCALE if latency_scale is None else latency_scale
+        self._lock = threading.Lock()
+        data = self._load()
+        self._interactions: Dict[str, Dict[str, Any]] = data.get('interactions', {})
+        recorded_on = data.get('recorded_on')
+        self.recorded_on = date.fromisoformat(recorded_on) if recorded_on and mode == self.REPLAY else date.today()
+        self._stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == self.RECORD
+
+    def today(self) -> date:
+        """収集の基準日（再生時は記録した日、記録時は今日）"""
+        return self.recorded_on
+
+    def _load(self) -> Dict[str, Any]:
+        """カセットファイルを読み込む（ファイルがない場合は空）"""
+        if not os.path.exists(self.path):
+            if self.mode == self.REPLAY:
+                logger.warning(f"Cassette not found, every request will miss: {self.path}")
+            return {}
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_FORMAT_VERSION:
+            logger.warning(f"Ignoring cassette with unsupported version: {self.path}")
+            return {}
+        return data
+
+    def save(self) -> None:
+        """
+        記録内容をカセットファイルに書き出す（一時ファイル経由で置き換える）
+        圧縮に時間がかかるため記録ごとには呼ばず、記録の終わり（スクリプトの終了時・アプリの停止時）に1回呼ぶ
+        """
+        with self._lock:
+            payload = {'version': CASSETTE_FORMAT_VERSION, 'recorded_on': self.recorded_on.isoformat(),
+                       'interactions': self._interactions}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+    @staticmethod
+    def make_key(kind: str, request: Dict[str, Any]) -> str:
+        """リクエストの種別と内容からキーを生成"""
+        material = json.dumps([kind, request], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def record(self, kind: str, request: Dict[str, Any], response: Dict[str, Any],
+               latency: float) -> None:
+        """
+        リクエストと応答の組をメモリに記録（ファイルへの書き出しはsave()で行う）
+
+        Args:
+            kind: リクエストの種別（search / gemini）
+            request: リクエストの内容（キーの生成に使う）
+            response: 応答の内容
+            latency: 応答までの秒数
+        """
+        with self._lock:
+            self._interactions[self.make_key(kind, request)] = {
+                'kind': kind,
+                'request': request,
+                'response': response,
+                'latency': round(latency, 4)
+            }
+            self._stats['recorded'] += 1
+
+    def lookup(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        記録済みの応答を取得
+
+        Args:
+            kind: リクエストの種別
+            request: リクエストの内容
+
+        Returns:
+            記録（response・latency）
+
+        Raises:
+            CassetteMissError: 記録にないリクエストの場合
+        """
+        with self._lock:
+            interaction = self._interactions.get(self.make_key(kind, request))
+            if interaction is None:
+                self._stats['missed'] += 1
+                summary = json.dumps(request, ensure_ascii=False, default=str)[:200]
+                raise CassetteMissError(f"No recorded {kind} interaction for {summary}")
+            self._stats['replayed'] += 1
+            return interaction
+
+    def replay_delay(self, interaction: Dict[str, Any]) -> float:
+        """記録されたレイテンシから再生時の待機秒数を計算"""
+        return interaction.get('latency', 0.0) * self.latency_scale
+
+    def wrap_http_client(self, client: Any) -> 'CassetteHTTPClient':
+        """HTTPクライアントを記録/再生付きにする"""
+        return CassetteHTTPClient(client, self)
+
+    def wrap_gemini_model(self, model_name: str, model: Any) -> 'CassetteGeminiModel':
+        """Gemini（google-generativeai・Vertex AI）のモデルを記録/再生付きにする"""
+        return CassetteGeminiModel(model_name, model, self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """モード・記録件数と記録/再生/ミスの件数"""
+        with self._lock:
+            return {'mode': self.mode, 'path': self.path, 'recorded_on': self.recorded_on.isoformat(),
+                    'interactions': len(self._interactions), **self._stats}
+
+
+class CassetteHTTPClient:
+    """Custom Search呼び出し（GET）を記録/再生するHTTPクライアントのラッパー"""
+
+    def __init__(self, client: Any, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+
+    @staticmethod
+    def _request(url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {'url': url,
+                'params': {k: v for k, v in (params or {}).items() if k not in _SECRET_PARAMS}}
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        request = self._request(url, params)
+        if not self._cassette.recording:
+            interaction = self._cassette.lookup('search', request)
+            delay = self._cassette.replay_delay(interaction)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            response = interaction['response']
+            return ReplayedResponse(response['status_code'], response['headers'], response['body'])
+
+        started = time.monotonic()
+        response = await self._client.get(url, params=params, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        retry_after = response.headers.get('Retry-After')
+        headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self._cassette.record('search', request, {
+            'status_code': response.status_code, 'headers': headers, 'body': body
+        }, time.monotonic() - started)
+        return response
+
+
+class CassetteGeminiModel:
+    """Geminiモデルの generate_content / generate_content_async を記録/再生するラッパー"""
+
+    def __init__(self, model_name: str, model: Any, cassette: Cassette):
+        self.model_name = model_name
+        self._model = model
+        self._cassette = cassette
+
+    def _request(self, prompt: Any, generation_config: Any) -> Dict[str, Any]:
+        # Vertex AIのGenerationConfigなど辞書以外の設定は応答スキーマを取り出せないためキーに含めない
+        schema = generation_config.get('response_schema') if isinstance(generation_config, dict) else None
+        return {'model': self.model_name, 'prompt': prompt, 'response_schema': schema}
+
+    async def generate_content_async(self, prompt: Any, generation_config: Any = None, **kwargs) -> Any:
+        request = self._request(prompt, generation_config)
+        if not self._cassette.recording:
+            interaction = self._cassette.lookup('gemini', request)
+            delay = self._cassette.replay_delay(interaction)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return ReplayedGeneration(interaction['response']['text'])
+
+        started = time.monotonic()
+        response = await self._model.generate_content_async(prompt, generation_config=generation_config, **kwargs)
+        self._cassette.record('gemini', request, {'text': response.text}, time.monotonic() - started)
+        return response
+
+    def generate_content(self, prompt: Any, generation_config: Any = None, **kwargs) -> Any:
+        request = self._request(prompt, generation_config)
+        if not self._cassette.recording:
+            interaction = self._cassette.lookup('gemini', request)
+            delay = self._cassette.replay_delay(interaction)
+            if delay > 0:
+                time.sleep(delay)
+            return ReplayedGeneration(interaction['response']['text'])
+
+        started = time.monotonic()
+        response = self._model.generate_content(prompt, generation_config=generation_config, **kwargs)
+        self._cassette.record('gemini', request, {'text': response.text}, time.monotonic() - started)
+        return response
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """設定で有効なプロセス共有のカセットを取得（CASSETTE_MODE=offの場合None）"""
+    global _cassette
+    if Config.CASSETTE_MODE not in (Cassette.RECORD, Cassette.REPLAY):
+        return None
+    if _cassette is None:
+        _cassette = Cassette(Config.CASSETTE_PATH, Config.CASSETTE_MODE)
+        logger.info(f"Cassette {Config.CASSETTE_MODE} mode: {Config.CASSETTE_PATH}")
+    return _cassette
+
+
+def save_cassette() -> None:
+    """記録モードのプロセス共有カセットをファイルに書き出す（アプリの停止時に呼ぶ）"""
+    if _cassette is not None and _cassette.recording:
+        _cassette.save()
+        logger.info(f"Cassette saved: {_cassette.path}")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Gemini 抽出結果キャッシュ
+(モデル名, プロンプト) の内容ハッシュをキーとするプロセス内LRU + SQLite永続化の2層キャッシュ
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Dict, Any, Optional
+
+from app.config import (
+    Config, JAPANESE_PROMPTS, JAPANESE_SCHEDULE_PROMPT_TEMPLATE, UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE,
+    MULTI_ARTIST_SCHEDULE_PROMPT_TEMPLATE
+)
+from app.utils.gemini_json import EVENTS_RESPONSE_SCHEMA
+from app.services.sqlite_store import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def compute_template_version() -> str:
+    """
+    プロンプトテンプレートのバージョンタグを計算
+    app/config.py のテンプレートや応答スキーマが変更されると値が変わり、既存のキャッシュは無効になる
+    """
+    material = json.dumps(
+        [Config.EXTRACTION_CACHE_VERSION, UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE,
+         JAPANESE_SCHEDULE_PROMPT_TEMPLATE, MULTI_ARTIST_SCHEDULE_PROMPT_TEMPLATE, JAPANESE_PROMPTS,
+         EVENTS_RESPONSE_SCHEMA],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+class ExtractionCache(TTLCache):
+    """Gemini応答テキストの2層TTLキャッシュ"""
+
+    store_name = 'Extraction cache'
+    filename = 'extraction_cache.sqlite3'
+    table = 'extraction_cache'
+    value_column = 'response'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS extraction_cache ("
+        "key TEXT PRIMARY KEY, version TEXT NOT NULL, model TEXT NOT NULL, "
+        "response TEXT NOT NULL, expires_at REAL NOT NULL)",
+    )
+
+    def __init__(self, db_path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, version: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+            ttl: エントリの有効期間（秒）
+            max_entries: プロセス内LRUの最大件数
+            version: バージョンタグ（省略時はプロンプトテンプレートから計算）
+        """
+        self.version = version or compute_template_version()
+        super().__init__(
+            db_path,
+            ttl=Config.EXTRACTION_CACHE_TTL if ttl is None else ttl,
+            max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+
+    def _prepare_database(self, conn: sqlite3.Connection) -> None:
+        """古いバージョンのエントリを削除"""
+        cursor = conn.execute("DELETE FROM extraction_cache WHERE version != ?", (self.version,))
+        if cursor.rowcount:
+            logger.info(f"Extraction cache invalidated {cursor.rowcount} entries from older prompt templates")
+
+    def make_key(self, model_name: str, prompt: str) -> str:
+        """バージョンタグ・モデル名・プロンプトからキャッシュキーを生成"""
+        key_data = json.dumps([self.version, model_name, prompt], ensure_ascii=False)
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        キャッシュからGeminiの応答テキストを取得
+
+        Args:
+            model_name: モデル名
+            prompt: プロンプト
+
+        Returns:
+            キャッシュされた応答テキスト、なければNone
+        """
+        return self._lookup(self.make_key(model_name, prompt))
+
+    def set(self, model_name: str, prompt: str, response_text: str) -> None:
+        """
+        Geminiの応答テキストをキャッシュに保存
+        解析に成功した応答のみを保存すること
+
+        Args:
+            model_name: モデル名
+            prompt: プロンプト
+            response_text: Geminiの応答テキスト
+        """
+        self._store(self.make_key(model_name, prompt), response_text, self.ttl,
+                    version=self.version, model=model_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット・ミス件数などの統計を取得"""
+        stats = super().get_stats()
+        stats['version'] = self.version
+        return stats
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """プロセス共有の抽出キャッシュを取得（無効化されている場合None）"""
+    global _extraction_cache
+    if not Config.EXTRACTION_CACHE_ENABLED:
+        return None
+    if _extraction_cache is None:
+        _extraction_cache = ExtractionCache()
+    return _extraction_cache
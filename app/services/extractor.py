@@ -4,17 +4,28 @@
 Vertex AI Gemini APIを使用してテキストからスケジュール情報を抽出
 """
 
+import asyncio
 import json
 import logging
 import re
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from google.cloud import aiplatform
 from google.oauth2 import service_account
 import vertexai
-from vertexai.generative_models import GenerativeModel
-from app.config import get_prompt, JAPANESE_PROMPTS
+from vertexai.generative_models import GenerativeModel, GenerationConfig
+from app.config import Config, get_prompt, JAPANESE_PROMPTS
+from app.services.extraction_cache import ExtractionCache, get_extraction_cache
+from app.services.llm_clients import LLMClientRegistry, get_llm_registry
+from app.services.cassette import Cassette, get_cassette
+from app.services.model_cascade import find_escalation_reason, get_cascade_stats
+from app.utils.gemini_json import (
+    EVENTS_RESPONSE_SCHEMA, build_batch_response_schema, parse_batch_events, parse_events
+)
 from app.utils.japanese import JapaneseTextProcessor
+from app.utils.search_results import estimate_tokens
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
@@ -23,26 +34,84 @@ logger = logging.getLogger(__name__)
 class ScheduleExtractor:
     """スケジュール情報抽出クラス"""
     
-    def __init__(self, project_id: str, location: str = "asia-northeast1"):
+    def __init__(self, project_id: str, location: str = "asia-northeast1",
+                 extraction_cache: Optional[ExtractionCache] = None,
+                 cascade_models: Optional[List[str]] = None,
+                 batch_size: Optional[int] = None,
+                 max_concurrency: Optional[int] = None,
+                 llm_registry: Optional[LLMClientRegistry] = None,
+                 cassette: Optional[Cassette] = None):
         """
         初期化
         
         Args:
             project_id: Google Cloud プロジェクトID
             location: Vertex AIのリージョン
+            extraction_cache: Gemini応答キャッシュ（省略時はプロセス共有インスタンス）
+            cascade_models: 安価な順のGeminiモデル名（省略時は設定値）
+            batch_size: 1回のプロンプトにまとめるテキスト数の上限（1で一括化しない）
+            max_concurrency: 同時に実行するGemini呼び出し数の上限
+            llm_registry: Vertex AIモデルの共有レジストリ（省略時はプロセス共有インスタンス）
+            cassette: Gemini呼び出しの記録/再生（省略時は設定で有効な場合の共有インスタンス）
         """
         self.project_id = project_id
         self.location = location
-        self.model_name = "gemini-1.5-pro"
         self.text_processor = JapaneseTextProcessor()
+        self.extraction_cache = extraction_cache or get_extraction_cache()
+        self.cascade_stats = get_cascade_stats()
+        self.batch_size = batch_size or Config.EXTRACTOR_BATCH_SIZE
+        self.max_concurrency = max_concurrency or Config.EXTRACTOR_CONCURRENCY
         
-        # Vertex AI初期化
-        vertexai.init(project=project_id, location=location)
-        self.model = GenerativeModel(self.model_name)
+        # Vertex AI初期化（安価なモデルから順に試すカスケード、初期化とモデルはプロセスで共有）
+        registry = llm_registry or get_llm_registry()
+        registry.get(('vertexai', project_id, location), lambda: vertexai.init(project=project_id, location=location))
+        self.models = [
+            (name, registry.get(('vertex', project_id, location, name), lambda name=name: GenerativeModel(name)))
+            for name in cascade_models or Config.GEMINI_CASCADE_MODELS
+        ]
+        # 記録/再生モードではGeminiの呼び出しをカセット経由にする
+        self.cassette = cassette or get_cassette()
+        if self.cassette is not None:
+            self.models = [(name, self.cassette.wrap_gemini_model(name, model)) for name, model in self.models]
+        self.model_name, self.model = self.models[0]
+        # スキーマ指定のJSON出力モード
+        self.generation_config = GenerationConfig(
+            response_mime_type='application/json',
+            response_schema=EVENTS_RESPONSE_SCHEMA
+        )
+        
+        # 同期版のAPIで使う専用のイベントループ（初回呼び出し時に起動）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         
         logger.info(f"Gemini API初期化完了 - プロジェクト: {project_id}, リージョン: {location}")
     
+    def _run(self, coroutine):
+        """
+        同期版のAPIから非同期の抽出を実行
+        Vertex AIの非同期クライアントは最初に使ったイベントループに紐づくため、
+        呼び出しごとにループを作らず専用スレッドの1つのループで実行する
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='schedule-extractor', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+    
     def extract_schedules_from_text(self, text: str, artist_name: str = None) -> List[Dict[str, Any]]:
+        """
+        テキストからスケジュール情報を抽出（同期版、専用のイベントループで実行）
+        
+        Args:
+            text: 抽出対象のテキスト
+            artist_name: アーティスト名（オプション）
+            
+        Returns:
+            抽出されたスケジュール情報のリスト
+        """
+        return self._run(self.extract_schedules_from_text_async(text, artist_name))
+    
+    async def extract_schedules_from_text_async(self, text: str, artist_name: str = None) -> List[Dict[str, Any]]:
         """
         テキストからスケジュール情報を抽出
         
@@ -60,17 +129,8 @@ class ScheduleExtractor:
             # プロンプト生成
             prompt = self._create_extraction_prompt(normalized_text, artist_name)
             
-            logger.info(f"Geminiでスケジュール抽出開始")
-            
-            # Gemini APIを呼び出し
-            response = self.model.generate_content(prompt)
-            
-            if not response.text:
-                logger.warning("Geminiから空のレスポンス")
-                return []
-            
-            # JSONレスポンスを解析
-            schedules = self._parse_gemini_response(response.text)
+            # 安価なモデルから順に抽出し、不確かな場合のみ上位モデルへ
+            schedules = await self._extract_with_cascade(prompt)
             
             # 後処理
             processed_schedules = self._post_process_schedules(schedules, artist_name)
@@ -82,6 +142,93 @@ class ScheduleExtractor:
             logger.error(f"スケジュール抽出エラー: {str(e)}")
             return []
     
+    async def _extract_with_cascade(self, prompt: str, start_tier: int = 0,
+                              fallback: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        モデルカスケードでスケジュール情報を抽出
+        
+        Args:
+            prompt: 抽出プロンプト
+            start_tier: 最初に試すモデルの階層（一括抽出の結果が不確かな場合は1から）
+            fallback: どのモデルの呼び出し・解析にも成功しなかった場合の結果（一括抽出の結果）
+            
+        Returns:
+            抽出されたスケジュール情報（後処理前）
+        """
+        best = fallback
+        if start_tier == 0:
+            self.cascade_stats.record_request()
+        
+        for tier, (model_name, model) in enumerate(self.models[start_tier:], start_tier):
+            try:
+                events = await self._extract_with_model(prompt, model_name, model)
+            except asyncio.TimeoutError:
+                logger.error(f"スケジュール抽出タイムアウト ({model_name}): {Config.GEMINI_REQUEST_TIMEOUT}秒")
+                break
+            except Exception as e:
+                logger.error(f"スケジュール抽出エラー ({model_name}): {str(e)}")
+                break
+            if events is not None:
+                best = events
+            reason = find_escalation_reason(events)
+            if reason is None or tier == len(self.models) - 1:
+                break
+            self.cascade_stats.record_escalation(model_name, reason)
+        
+        return best or []
+    
+    async def _extract_with_model(self, prompt: str, model_name: str,
+                                  model: GenerativeModel) -> Optional[List[Dict[str, Any]]]:
+        """指定モデルで抽出（同一モデル・同一プロンプトの応答はキャッシュから再利用、解析失敗時None）"""
+        return await self._generate_and_decode(prompt, model_name, model, self.generation_config, self._decode_events)
+    
+    async def _generate_and_decode(self, prompt: str, model_name: str, model: GenerativeModel,
+                                   generation_config: GenerationConfig, decode):
+        """
+        Gemini APIを呼び出して応答を解析（同一モデル・同一プロンプトの応答はキャッシュから再利用）
+        
+        Args:
+            prompt: 抽出プロンプト
+            model_name: モデル名
+            model: モデル
+            generation_config: 応答スキーマを含む生成設定
+            decode: 応答テキストの解析関数（解析失敗時None）
+            
+        Returns:
+            解析結果（空のレスポンス・解析失敗時None）
+            
+        Raises:
+            asyncio.TimeoutError: GEMINI_REQUEST_TIMEOUT秒以内に応答がない場合
+        """
+        if self.extraction_cache is not None:
+            cached_text = self.extraction_cache.get(model_name, prompt)
+            if cached_text is not None:
+                logger.info(f"抽出キャッシュを使用: {model_name}")
+                return decode(cached_text)
+        
+        logger.info(f"Geminiでスケジュール抽出開始: {model_name}")
+        
+        # Gemini APIを呼び出し（イベントループを止めないよう非同期版を使い、応答が遅い場合は打ち切る）
+        started = time.monotonic()
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, generation_config=generation_config),
+            timeout=Config.GEMINI_REQUEST_TIMEOUT
+        )
+        response_text = response.text or ''
+        self.cascade_stats.record_call(
+            model_name, time.monotonic() - started, estimate_tokens(prompt), estimate_tokens(response_text)
+        )
+        
+        if not response_text:
+            logger.warning("Geminiから空のレスポンス")
+            return None
+        
+        # JSONレスポンスを解析（解析できた応答のみキャッシュする）
+        decoded = decode(response_text)
+        if decoded is not None and self.extraction_cache is not None:
+            self.extraction_cache.set(model_name, prompt, response_text)
+        return decoded
+    
     def _create_extraction_prompt(self, text: str, artist_name: str = None) -> str:
         """スケジュール抽出用のプロンプトを生成"""
         
@@ -132,30 +279,179 @@ class ScheduleExtractor:
             
         return formatted_prompt
     
-    def _parse_gemini_response(self, response_text: str) -> List[Dict[str, Any]]:
-        """Geminiレスポンスを解析してスケジュール情報を抽出"""
-        try:
-            # JSONブロックを抽出
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                json_text = json_match.group(1)
-            else:
-                # JSONブロックがない場合はレスポンス全体をJSONとして解析
-                json_text = response_text
+    def _create_batch_extraction_prompt(self, items: List[Tuple[str, Optional[str]]]) -> str:
+        """
+        複数テキスト一括抽出用のプロンプトを生成
+        
+        Args:
+            items: (正規化済みテキスト, アーティスト名) のリスト（先頭からT1, T2, ...のIDを割り当てる）
             
-            # JSON解析
-            data = json.loads(json_text)
+        Returns:
+            プロンプト文字列
+        """
+        sections = []
+        for index, (text, artist_name) in enumerate(items, 1):
+            header = f"【ID: T{index}" + (f" / アーティスト: {artist_name}" if artist_name else "") + "】"
+            sections.append(f"{header}\n{text}")
+        item_ids = ', '.join(f"T{index}" for index in range(1, len(items) + 1))
+        
+        return f"""
+以下の複数のテキストから、それぞれK-POPスケジュール情報を抽出してください。
+各テキストにはIDが付いています。イベントは必ず記載元のテキストのIDに振り分けてください。
+
+【抽出ルール】
+1. 日付が明確に記載されているもののみ抽出
+2. 過去の日付は除外
+3. 時間が不明な場合は空文字を設定
+4. 場所が不明な場合は空文字を設定
+5. 確実でない情報は除外
+6. 他のIDのテキストの情報を混ぜない
+
+【テキスト】
+{chr(10).join(sections)}
+
+【出力形式】
+ID（{item_ids}）をキーとして、以下のJSON形式で回答してください。イベントがないIDも空配列で含めてください：
+{{"artists": {{"T1": {{"events": [{{"date": "YYYY-MM-DD", "time": "HH:MM", "title": "イベント名", "artist": "アーティスト名", "type": "イベント種別", "location": "場所", "confidence": 0.9}}]}}}}}}
+"""
+    
+    def _chunk_items(self, items: List[Tuple[str, Optional[str]]]) -> List[List[int]]:
+        """
+        一括プロンプトにまとめるテキストの位置を件数上限とトークン予算で区切る
+        
+        Args:
+            items: (正規化済みテキスト, アーティスト名) のリスト
+            
+        Returns:
+            チャンクごとのitemsの位置のリスト
+        """
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        tokens = 0
+        for index, (text, _) in enumerate(items):
+            item_tokens = estimate_tokens(text)
+            if current and (len(current) >= self.batch_size
+                            or tokens + item_tokens > Config.GEMINI_BATCH_TOKEN_BUDGET):
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(index)
+            tokens += item_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    async def _extract_batch(self, items: List[Tuple[str, Optional[str]]],
+                             semaphore: asyncio.Semaphore) -> List[List[Dict[str, Any]]]:
+        """
+        複数テキストを1つのプロンプトで抽出し、テキストごとに振り分ける
+        応答に含まれないテキストは単体プロンプトで、結果が不確かなテキストは上位モデルで再抽出する
+        （再抽出は一括呼び出しの枠を解放してから、1件ずつ同じ同時実行数の枠を取って並行に実行する）
+        
+        Args:
+            items: (正規化済みテキスト, アーティスト名) のリスト
+            semaphore: Gemini呼び出しの同時実行数を制限するセマフォ
+            
+        Returns:
+            itemsと同じ順のスケジュール情報（後処理前）
+        """
+        item_ids = [f"T{index}" for index in range(1, len(items) + 1)]
+        prompt = self._create_batch_extraction_prompt(items)
+        generation_config = GenerationConfig(
+            response_mime_type='application/json',
+            response_schema=build_batch_response_schema(item_ids)
+        )
+        
+        try:
+            async with semaphore:
+                extracted = await self._generate_and_decode(
+                    prompt, self.model_name, self.model, generation_config,
+                    lambda text: parse_batch_events(text, item_ids)
+                ) or {}
+        except Exception as e:
+            logger.warning(f"一括抽出エラー（{len(items)}件を単体抽出に切り替え）: {str(e)}")
+            extracted = {}
+        
+        async def resolve(item_id: str, text: str, artist_name: Optional[str]) -> List[Dict[str, Any]]:
+            events = extracted.get(item_id)
+            if events is None:
+                async with semaphore:
+                    return await self._extract_with_cascade(self._create_extraction_prompt(text, artist_name))
             
-            if 'events' in data:
-                return data['events']
+            self.cascade_stats.record_request()
+            reason = find_escalation_reason(events)
+            if reason is not None and len(self.models) > 1:
+                self.cascade_stats.record_escalation(self.model_name, reason)
+                # 上位モデルの呼び出しに成功していれば空の結果でも採用する
+                async with semaphore:
+                    events = await self._extract_with_cascade(
+                        self._create_extraction_prompt(text, artist_name), start_tier=1, fallback=events
+                    )
+            return events
+        
+        return list(await asyncio.gather(*[
+            resolve(item_id, text, artist_name) for item_id, (text, artist_name) in zip(item_ids, items)
+        ]))
+    
+    async def _extract_chunk(self, items: List[Tuple[str, Optional[str]]],
+                             semaphore: asyncio.Semaphore) -> List[List[Dict[str, Any]]]:
+        """チャンク内のテキストを抽出し、テキストごとの後処理済みスケジュールを返す"""
+        try:
+            if len(items) == 1:
+                text, artist_name = items[0]
+                async with semaphore:
+                    schedules_per_item = [
+                        await self._extract_with_cascade(self._create_extraction_prompt(text, artist_name))
+                    ]
             else:
-                logger.warning("レスポンスにeventsキーが見つかりません")
-                return []
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON解析エラー: {str(e)}")
-            logger.debug(f"解析対象テキスト: {response_text}")
+                schedules_per_item = await self._extract_batch(items, semaphore)
+        except Exception as e:
+            logger.error(f"スケジュール抽出エラー: {str(e)}")
+            return [[] for _ in items]
+        
+        return [
+            self._post_process_schedules(schedules, artist_name)
+            for schedules, (_, artist_name) in zip(schedules_per_item, items)
+        ]
+    
+    async def _extract_many(self, texts: List[str], artist_names: List[Optional[str]]) -> List[List[Dict[str, Any]]]:
+        """
+        複数テキストをチャンクにまとめ、チャンク単位で並行に抽出
+        
+        Args:
+            texts: 抽出対象のテキスト
+            artist_names: textsと同じ順のアーティスト名
+            
+        Returns:
+            textsと同じ順の後処理済みスケジュール情報
+        """
+        items = [(self.text_processor.normalize_text(text), artist_name)
+                 for text, artist_name in zip(texts, artist_names)]
+        chunks = self._chunk_items(items)
+        if not chunks:
             return []
+        
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        chunk_results = await asyncio.gather(*[
+            self._extract_chunk([items[index] for index in chunk], semaphore) for chunk in chunks
+        ])
+        
+        results: List[List[Dict[str, Any]]] = [[] for _ in items]
+        for chunk, schedules_per_item in zip(chunks, chunk_results):
+            for index, schedules in zip(chunk, schedules_per_item):
+                results[index] = schedules
+        
+        logger.info(f"{len(items)}件のテキストを{len(chunks)}回の呼び出しで抽出 "
+                    f"({time.monotonic() - started:.1f}秒)")
+        return results
+    
+    def _decode_events(self, response_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Geminiレスポンスのeventsを取り出す（解析に失敗した場合None）"""
+        events = parse_events(response_text)
+        if events is None:
+            logger.error("JSON解析エラー")
+            logger.debug(f"解析対象テキスト: {response_text}")
+        return events
     
     def _post_process_schedules(self, schedules: List[Dict[str, Any]], 
                               artist_name: str = None) -> List[Dict[str, Any]]:
@@ -223,6 +519,18 @@ class ScheduleExtractor:
         return type_mapping.get(event_type.lower(), 'その他')
     
     def extract_from_tweets(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        ツイートデータからスケジュール情報を抽出（同期版、専用のイベントループで実行）
+        
+        Args:
+            tweets: ツイートデータのリスト
+            
+        Returns:
+            抽出されたスケジュール情報のリスト
+        """
+        return self._run(self.extract_from_tweets_async(tweets))
+    
+    async def extract_from_tweets_async(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         ツイートデータからスケジュール情報を抽出
         
@@ -233,23 +541,20 @@ class ScheduleExtractor:
             抽出されたスケジュール情報のリスト
         """
         all_schedules = []
+        tweets = [tweet for tweet in tweets if tweet.get('content')]
         
-        for tweet in tweets:
-            content = tweet.get('content', '')
-            username = tweet.get('username', '')
-            display_name = tweet.get('display_name', '')
-            
-            if not content:
-                continue
-            
-            # ツイート内容からスケジュール抽出
-            schedules = self.extract_schedules_from_text(content, display_name)
-            
+        # 複数ツイートをまとめたプロンプトで並行に抽出
+        schedules_per_tweet = await self._extract_many(
+            [tweet['content'] for tweet in tweets],
+            [tweet.get('display_name', '') for tweet in tweets]
+        )
+        
+        for tweet, schedules in zip(tweets, schedules_per_tweet):
             # ツイート情報を追加
             for schedule in schedules:
                 schedule['source_tweet_id'] = tweet.get('id')
                 schedule['source_tweet_url'] = tweet.get('url')
-                schedule['source_username'] = username
+                schedule['source_username'] = tweet.get('username', '')
                 
             all_schedules.extend(schedules)
         
@@ -258,6 +563,20 @@ class ScheduleExtractor:
     def batch_extract_schedules(self, text_list: List[str], 
                                artist_names: List[str] = None) -> List[Dict[str, Any]]:
         """
+        複数のテキストから一括でスケジュール抽出（同期版、専用のイベントループで実行）
+        
+        Args:
+            text_list: テキストのリスト
+            artist_names: 対応するアーティスト名のリスト
+            
+        Returns:
+            すべての抽出結果をまとめたリスト
+        """
+        return self._run(self.batch_extract_schedules_async(text_list, artist_names))
+    
+    async def batch_extract_schedules_async(self, text_list: List[str],
+                                            artist_names: List[str] = None) -> List[Dict[str, Any]]:
+        """
         複数のテキストから一括でスケジュール抽出
         
         Args:
@@ -268,10 +587,10 @@ class ScheduleExtractor:
             すべての抽出結果をまとめたリスト
         """
         all_schedules = []
+        names = [artist_names[i] if artist_names and i < len(artist_names) else None
+                 for i in range(len(text_list))]
         
-        for i, text in enumerate(text_list):
-            artist_name = artist_names[i] if artist_names and i < len(artist_names) else None
-            schedules = self.extract_schedules_from_text(text, artist_name)
+        for schedules in await self._extract_many(text_list, names):
             all_schedules.extend(schedules)
         
         return all_schedules
@@ -316,6 +635,13 @@ class ScheduleExtractor:
         return validated
 
 # 便利関数
+def get_schedule_extractor(project_id: str, location: str = "asia-northeast1") -> ScheduleExtractor:
+    """プロジェクト・リージョンごとに共有するScheduleExtractorを取得"""
+    return get_llm_registry().get(
+        ('schedule_extractor', project_id, location),
+        lambda: ScheduleExtractor(project_id, location)
+    )
+
 def extract_schedules_from_tweets(tweets: List[Dict[str, Any]], 
                                 project_id: str) -> List[Dict[str, Any]]:
     """
@@ -328,8 +654,7 @@ def extract_schedules_from_tweets(tweets: List[Dict[str, Any]],
     Returns:
         抽出されたスケジュール情報のリスト
     """
-    extractor = ScheduleExtractor(project_id)
-    return extractor.extract_from_tweets(tweets)
+    return get_schedule_extractor(project_id).extract_from_tweets(tweets)
 
 def extract_schedules_from_text(text: str, project_id: str, 
                                artist_name: str = None) -> List[Dict[str, Any]]:
@@ -344,8 +669,7 @@ def extract_schedules_from_text(text: str, project_id: str,
     Returns:
         抽出されたスケジュール情報のリスト
     """
-    extractor = ScheduleExtractor(project_id)
-    return extractor.extract_schedules_from_text(text, artist_name)
+    return get_schedule_extractor(project_id).extract_schedules_from_text(text, artist_name)
 
 # 使用例
 if __name__ == "__main__":
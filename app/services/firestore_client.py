@@ -205,6 +205,28 @@ class FirestoreClient:
             logger.error(f"Failed to get all registered artists: {e}")
             raise
     
+    def get_artist_subscriber_counts(self) -> Dict[str, int]:
+        """
+        アーティストごとの登録ユーザー数を取得
+        （検索クォータ配分の優先度で使用）
+        
+        Returns:
+            アーティスト名をキーとした登録ユーザー数の辞書
+        """
+        try:
+            counts: Dict[str, int] = {}
+            for doc in self.collection.stream():
+                name = doc.to_dict().get('name')
+                if name:
+                    counts[name] = counts.get(name, 0) + 1
+            
+            logger.info(f"Retrieved subscriber counts for {len(counts)} artists")
+            return counts
+            
+        except Exception as e:
+            logger.error(f"Failed to get artist subscriber counts: {e}")
+            raise
+    
     def check_artist_exists(self, user_id: str, artist_name: str) -> bool:
         """
         指定されたアーティストが既に登録されているかチェック
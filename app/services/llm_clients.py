@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+LLMクライアントレジストリ
+Geminiモデルなどの生成コストが高いクライアントをプロセスで1度だけ生成して共有する
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientRegistry:
+    """キーごとにクライアントを1度だけ生成して共有するレジストリ"""
+
+    def __init__(self):
+        self._clients: Dict[Hashable, Any] = {}
+        # 生成関数の中から別のクライアントを取得できるよう再入可能なロックを使う
+        self._lock = threading.RLock()
+        self._configured_api_key: Optional[str] = None
+        self._stats = {'created': 0, 'reused': 0}
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        キーに対応するクライアントを取得（未生成ならfactoryで生成して登録）
+
+        Args:
+            key: クライアントを識別するキー
+            factory: クライアントを生成する関数
+
+        Returns:
+            共有クライアント
+        """
+        with self._lock:
+            if key in self._clients:
+                self._stats['reused'] += 1
+                return self._clients[key]
+            client = factory()
+            self._clients[key] = client
+            self._stats['created'] += 1
+        logger.info(f"LLM client created: {key}")
+        return client
+
+    def get_gemini_model(self, api_key: str, model_name: str) -> genai.GenerativeModel:
+        """
+        Gemini APIのモデルを取得（APIキーの設定もキーが変わった時だけ行う）
+
+        Args:
+            api_key: Gemini APIキー
+            model_name: モデル名
+
+        Returns:
+            共有GenerativeModel
+        """
+        with self._lock:
+            if self._configured_api_key != api_key:
+                genai.configure(api_key=api_key)
+                self._configured_api_key = api_key
+        return self.get(('gemini', model_name), lambda: genai.GenerativeModel(model_name))
+
+    def get_gemini_models(self, api_key: str,
+                          model_names: Optional[List[str]] = None) -> List[Tuple[str, genai.GenerativeModel]]:
+        """
+        カスケード用に安価な順のGeminiモデルを取得
+
+        Args:
+            api_key: Gemini APIキー
+            model_names: モデル名（省略時は設定値）
+
+        Returns:
+            (モデル名, 共有GenerativeModel) のリスト
+        """
+        return [(name, self.get_gemini_model(api_key, name))
+                for name in model_names or Config.GEMINI_CASCADE_MODELS]
+
+    def warm_up(self, api_key: Optional[str] = None) -> int:
+        """
+        起動時にカスケードの全モデルを生成しておく
+
+        Args:
+            api_key: Gemini APIキー（省略時は環境変数）
+
+        Returns:
+            生成済みクライアント数（APIキー未設定の場合0）
+        """
+        api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            logger.warning("GEMINI_API_KEY not set; skipping LLM client warm-up")
+            return 0
+        self.get_gemini_models(api_key)
+        logger.info(f"LLM clients warmed up: {len(self._clients)}")
+        return len(self._clients)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """レジストリの統計（生成数・再利用数・登録キー）"""
+        with self._lock:
+            return {**self._stats, 'clients': [str(key) for key in self._clients]}
+
+
+_llm_registry: Optional[LLMClientRegistry] = None
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """プロセス共有のLLMクライアントレジストリを取得"""
+    global _llm_registry
+    if _llm_registry is None:
+        _llm_registry = LLMClientRegistry()
+    return _llm_registry
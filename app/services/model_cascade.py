@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Gemini モデルカスケード
+安価なモデルの抽出結果が不確かな場合のみ上位モデルへ昇格させる判定と、階層ごとの統計
+"""
+
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from app.config import Config, GEMINI_MODEL_PRICES
+
+logger = logging.getLogger(__name__)
+
+
+def _is_valid_event(event: Dict[str, Any]) -> bool:
+    """日付・タイトルがそろい、日付がYYYY-MM-DD形式か"""
+    if not event.get('title') or not event.get('date'):
+        return False
+    try:
+        datetime.strptime(str(event['date']), '%Y-%m-%d')
+        return True
+    except ValueError:
+        return False
+
+
+def _has_disagreement(events: List[Dict[str, Any]]) -> bool:
+    """同じタイトル・日付のイベントで時刻または場所が情報源によって食い違うか"""
+    seen: Dict[tuple, tuple] = {}
+    for event in events:
+        key = (str(event.get('title', '')).strip().lower(), event.get('date'))
+        details = (event.get('time') or '', str(event.get('location') or '').strip())
+        if key in seen and seen[key] != details:
+            return True
+        seen[key] = details
+    return False
+
+
+def find_escalation_reason(events: Optional[List[Dict[str, Any]]],
+                           min_confidence: Optional[float] = None) -> Optional[str]:
+    """
+    抽出結果を上位モデルで再抽出すべきか判定
+
+    Args:
+        events: 抽出されたイベント（解析失敗の場合None）
+        min_confidence: これ未満のconfidenceを含む場合に昇格させる閾値
+
+    Returns:
+        昇格理由（parse_failure / validation / low_confidence / disagreement）、不要な場合None
+    """
+    if events is None:
+        return 'parse_failure'
+
+    threshold = Config.CASCADE_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    if any(not _is_valid_event(event) for event in events):
+        return 'validation'
+    for event in events:
+        try:
+            if float(event.get('confidence', 1.0)) < threshold:
+                return 'low_confidence'
+        except (TypeError, ValueError):
+            return 'validation'
+    if _has_disagreement(events):
+        return 'disagreement'
+    return None
+
+
+class CascadeStats:
+    """モデル階層ごとの呼び出し数・レイテンシ・見積もりコストと昇格率の集計"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, float]] = {}
+        self._escalations: Counter = Counter()
+        self._requests = 0
+
+    def record_request(self) -> None:
+        """カスケード抽出の開始を記録"""
+        with self._lock:
+            self._requests += 1
+
+    def record_call(self, model_name: str, latency: float, input_tokens: int, output_tokens: int) -> None:
+        """
+        モデル呼び出しを記録
+
+        Args:
+            model_name: モデル名
+            latency: 所要時間（秒）
+            input_tokens: 入力トークン数（見積もり）
+            output_tokens: 出力トークン数（見積もり）
+        """
+        input_price, output_price = GEMINI_MODEL_PRICES.get(model_name, (0.0, 0.0))
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+        with self._lock:
+            tier = self._tiers.setdefault(model_name, {
+                'calls': 0, 'latency_seconds': 0.0, 'input_tokens': 0, 'output_tokens': 0,
+                'estimated_cost_usd': 0.0
+            })
+            tier['calls'] += 1
+            tier['latency_seconds'] += latency
+            tier['input_tokens'] += input_tokens
+            tier['output_tokens'] += output_tokens
+            tier['estimated_cost_usd'] += cost
+
+    def record_escalation(self, from_model: str, reason: str) -> None:
+        """上位モデルへの昇格を記録"""
+        logger.info(f"Escalating extraction from {from_model}: {reason}")
+        with self._lock:
+            self._escalations[reason] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """階層ごとの統計と昇格率を取得"""
+        with self._lock:
+            tiers = {}
+            for model_name, tier in self._tiers.items():
+                tiers[model_name] = {
+                    'calls': tier['calls'],
+                    'avg_latency_ms': round(tier['latency_seconds'] / tier['calls'] * 1000, 1),
+                    'input_tokens': tier['input_tokens'],
+                    'output_tokens': tier['output_tokens'],
+                    'estimated_cost_usd': round(tier['estimated_cost_usd'], 6)
+                }
+            escalations = sum(self._escalations.values())
+            return {
+                'requests': self._requests,
+                'escalations': escalations,
+                'escalation_rate': round(escalations / self._requests, 3) if self._requests else 0.0,
+                'escalation_reasons': dict(self._escalations),
+                'tiers': tiers
+            }
+
+
+_cascade_stats: Optional[CascadeStats] = None
+
+
+def get_cascade_stats() -> CascadeStats:
+    """プロセス共有のカスケード統計を取得"""
+    global _cascade_stats
+    if _cascade_stats is None:
+        _cascade_stats = CascadeStats()
+    return _cascade_stats
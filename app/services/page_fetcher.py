@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+検索結果ページの本文取得サービス
+ホストごとの同時接続数制限・条件付きGET（ETag/Last-Modified）キャッシュ付き
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import Config
+from app.services.sqlite_store import SQLiteStore
+from app.utils.japanese import JapaneseTextProcessor
+
+# BeautifulSoupがない環境では本文取得を無効化
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 本文として扱わない要素
+NOISE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg']
+
+
+class PageContentFetcher(SQLiteStore):
+    """検索結果ページから日付を含む本文ブロックを取得"""
+
+    store_name = 'Page cache'
+    filename = 'page_cache.sqlite3'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS page_cache ("
+        "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, text TEXT NOT NULL, fetched_at TEXT NOT NULL)",
+    )
+
+    def __init__(self, db_path: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
+        """
+        初期化
+
+        Args:
+            db_path: 条件付きGET用キャッシュのSQLiteパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+            client: HTTPクライアント（省略時は初回取得時に生成）
+        """
+        self._client = client
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+        super().__init__(db_path)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """HTTPクライアントを取得（未生成の場合は生成）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=Config.PAGE_FETCH_TIMEOUT,
+                follow_redirects=True,
+                headers={'User-Agent': Config.PAGE_FETCH_USER_AGENT},
+                limits=httpx.Limits(max_connections=Config.PAGE_FETCH_MAX_CONNECTIONS)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """HTTPクライアントを破棄"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """ホストごとの同時接続数制限"""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(Config.PAGE_FETCH_PER_HOST)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def enrich_results(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        検索結果のページを並行取得し、日付を含む本文をpage_textとして付与
+
+        Args:
+            search_results: 検索結果のリスト
+
+        Returns:
+            page_textを付与した検索結果のリスト
+        """
+        if not BS4_AVAILABLE:
+            logger.warning("beautifulsoup4 is not installed; page enrichment skipped")
+            return search_results
+
+        texts = await asyncio.gather(*[
+            self.fetch_date_text(result.get('url', '')) for result in search_results
+        ])
+
+        enriched = []
+        for result, text in zip(search_results, texts):
+            enriched.append({**result, 'page_text': text} if text else result)
+        return enriched
+
+    async def fetch_date_text(self, url: str) -> str:
+        """
+        ページを取得して日付を含む本文ブロックを返す
+        前回のETag/Last-Modifiedを送信し、304の場合は保存済みの本文を返す
+
+        Args:
+            url: ページURL
+
+        Returns:
+            日付を含む本文（取得できない場合は空文字）
+        """
+        if not url.startswith(('http://', 'https://')):
+            return ''
+
+        cached = self._get_cached(url)
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            async with self._host_semaphore(url):
+                async with self._get_client().stream('GET', url, headers=headers) as response:
+                    if response.status_code == 304 and cached:
+                        self._stats['not_modified'] += 1
+                        return cached['text']
+
+                    content_type = response.headers.get('content-type', '')
+                    if response.status_code != 200 or 'html' not in content_type:
+                        return ''
+
+                    body = await self._read_capped(response)
+                    etag = response.headers.get('etag')
+                    last_modified = response.headers.get('last-modified')
+                    encoding = response.encoding or 'utf-8'
+
+            # HTMLの解析はCPUを使うため、イベントループを止めないようスレッドで行う
+            text = await asyncio.to_thread(self.extract_date_blocks, body.decode(encoding, errors='replace'))
+            self._store(url, etag, last_modified, text)
+            self._stats['fetched'] += 1
+            return text
+
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.debug(f"Page fetch failed for {url}: {e}")
+            return cached['text'] if cached else ''
+
+    @staticmethod
+    async def _read_capped(response: httpx.Response) -> bytes:
+        """レスポンス本文を上限バイト数まで読み込む"""
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= Config.PAGE_FETCH_MAX_BYTES:
+                break
+        return b''.join(chunks)[:Config.PAGE_FETCH_MAX_BYTES]
+
+    @staticmethod
+    def extract_date_blocks(html: str) -> str:
+        """
+        HTMLから日付らしき表記を含むテキストブロックのみを抽出
+
+        Args:
+            html: HTML文字列
+
+        Returns:
+            日付を含む行を改行区切りで連結した文字列（上限文字数で切り詰め）
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(NOISE_TAGS):
+            tag.decompose()
+
+        blocks = []
+        seen = set()
+        length = 0
+
+        for line in soup.get_text('\n').splitlines():
+            line = ' '.join(line.split())
+            if not line or line in seen or not JapaneseTextProcessor.contains_date_mention(line):
+                continue
+            seen.add(line)
+            blocks.append(line)
+            length += len(line) + 1
+            if length >= Config.PAGE_CONTENT_MAX_CHARS:
+                break
+
+        return '\n'.join(blocks)[:Config.PAGE_CONTENT_MAX_CHARS]
+
+    def _get_cached(self, url: str) -> Optional[Dict[str, Any]]:
+        """保存済みの検証子と本文を取得"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, text FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'text': row[2]}
+
+    def _store(self, url: str, etag: Optional[str], last_modified: Optional[str], text: str) -> None:
+        """検証子と本文を保存"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache (url, etag, last_modified, text, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, text, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得件数・304件数・失敗件数を取得"""
+        return dict(self._stats)
+
+
+_page_fetcher: Optional[PageContentFetcher] = None
+
+
+def get_page_fetcher() -> PageContentFetcher:
+    """プロセス共有のページ取得サービスを取得"""
+    global _page_fetcher
+    if _page_fetcher is None:
+        _page_fetcher = PageContentFetcher()
+    return _page_fetcher
+
+
+async def close_page_fetcher() -> None:
+    """プロセス共有のページ取得サービスのHTTPクライアントを破棄"""
+    if _page_fetcher is not None:
+        await _page_fetcher.aclose()
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+外部API呼び出しの耐障害性ユーティリティ
+ジッター付き指数バックオフによる再試行と、依存先ごとのサーキットブレーカー
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import Config
+
+# google-api-coreはgoogle-generativeaiの依存として入る想定（ない環境ではHTTPステータスのみで判定）
+try:
+    from google.api_core import exceptions as google_exceptions
+    _GOOGLE_TRANSIENT_ERRORS = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.GatewayTimeout,
+    )
+except ImportError:
+    _GOOGLE_TRANSIENT_ERRORS = ()
+
+logger = logging.getLogger(__name__)
+
+# 再試行で回復が見込めるHTTPステータス
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TransientError(Exception):
+    """再試行で回復が見込める一時的なエラー（429/5xxなど）"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class DependencyUnavailableError(Exception):
+    """依存先が利用できない（再試行を使い切った、またはサーキットが開いている）"""
+
+    def __init__(self, dependency: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{dependency}: {message}")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    """サーキットが開いているため呼び出しを行わずに失敗した"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-Afterヘッダーを待機秒数に変換
+
+    Args:
+        value: ヘッダー値（秒数またはHTTP日付）
+
+    Returns:
+        待機秒数（解釈できない場合None）
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """再試行で回復が見込める例外か"""
+    return isinstance(error, TransientError) or isinstance(error, _GOOGLE_TRANSIENT_ERRORS)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  retry_after: Optional[float] = None) -> float:
+    """
+    再試行までの待機秒数（フルジッター付き指数バックオフ、Retry-Afterがあればそれ以上待つ）
+
+    Retry-Afterはmax_delayで切り詰めない（早く再試行しても429が返るだけのため）。
+    全体の期限に収まるかは呼び出し側で判定する
+
+    Args:
+        attempt: 失敗した試行の番号（1始まり）
+        base_delay: 初回の待機上限秒数
+        max_delay: バックオフの待機上限秒数
+        retry_after: サーバーが指定した待機秒数
+
+    Returns:
+        待機秒数
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """
+    依存先ごとのサーキットブレーカー
+    連続失敗がしきい値に達すると一定時間呼び出しを遮断し、経過後に1件だけ試行して復旧を確認する
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            name: 依存先の名前
+            failure_threshold: サーキットを開く連続失敗回数
+            reset_timeout: サーキットを開いてから試行を再開するまでの秒数
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = Config.CIRCUIT_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def _retry_after(self) -> float:
+        return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def before_call(self) -> bool:
+        """
+        呼び出し前に状態を確認
+
+        Returns:
+            この呼び出しが復旧確認の試行枠を得たか
+
+        Raises:
+            CircuitOpenError: サーキットが開いている場合
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._retry_after() > 0:
+                    self._stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, "circuit open", self._retry_after())
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                # 復旧確認の試行は1件だけ通す
+                if self._trial_in_flight:
+                    self._stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, "circuit half-open", self.reset_timeout)
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """呼び出し成功を記録（サーキットを閉じる）"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            self._stats['successes'] += 1
+
+    def release_trial(self) -> None:
+        """成否を判定せずに終わった呼び出し（キャンセル・呼び出し側の誤りなど）の復旧確認枠を解放"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """呼び出し失敗を記録（しきい値到達または復旧確認の失敗でサーキットを開く）"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._stats['failures'] += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats['opened'] += 1
+                    logger.warning(f"Circuit for {self.name} opened after "
+                                   f"{self._consecutive_failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """サーキットの状態と統計を取得"""
+        with self._lock:
+            state = self._state
+            if state == self.OPEN and self._retry_after() <= 0:
+                state = self.HALF_OPEN
+            return {
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_after_seconds': round(self._retry_after(), 1) if state == self.OPEN else 0.0,
+                **self._stats
+            }
+
+
+async def call_with_retry(func: Callable[[], Awaitable[Any]], breaker: CircuitBreaker,
+                          max_attempts: Optional[int] = None,
+                          base_delay: Optional[float] = None,
+                          max_delay: Optional[float] = None,
+                          deadline: Optional[float] = None) -> Any:
+    """
+    サーキットブレーカーを通して非同期呼び出しを実行し、一時的なエラーはバックオフして再試行
+
+    一時的なエラーとタイムアウトはサーキットの失敗として数え、それ以外の例外（4xxなど）はそのまま送出する
+
+    Args:
+        func: 呼び出し関数（試行ごとに新しいコルーチンを返す）
+        breaker: 依存先のサーキットブレーカー
+        max_attempts: 最大試行回数
+        base_delay: 初回の待機上限秒数
+        max_delay: バックオフの待機上限秒数（Retry-Afterには適用しない）
+        deadline: 最初の呼び出しから再試行を打ち切るまでの秒数
+
+    Returns:
+        呼び出し結果
+
+    Raises:
+        CircuitOpenError: サーキットが開いている場合
+        DependencyUnavailableError: 一時的なエラーで再試行を使い切った、または期限までに再試行できない場合
+        asyncio.TimeoutError: 呼び出しがタイムアウトした場合（再試行しない）
+    """
+    max_attempts = max_attempts or Config.RETRY_MAX_ATTEMPTS
+    base_delay = Config.RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = Config.RETRY_MAX_DELAY if max_delay is None else max_delay
+    deadline = Config.RETRY_DEADLINE if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + deadline
+
+    for attempt in range(1, max_attempts + 1):
+        is_trial = breaker.before_call()
+        try:
+            result = await func()
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            if not is_transient_error(e):
+                # 呼び出し側の誤り（4xx・応答のブロックなど）は依存先の障害とも回復の証拠とも数えない
+                if is_trial:
+                    breaker.release_trial()
+                raise
+            breaker.record_failure()
+            retry_after = getattr(e, 'retry_after', None)
+            if attempt == max_attempts:
+                raise DependencyUnavailableError(
+                    breaker.name, f"gave up after {attempt} attempts: {e}", retry_after
+                ) from e
+            delay = backoff_delay(attempt, base_delay, max_delay, retry_after)
+            if loop.time() + delay > give_up_at:
+                raise DependencyUnavailableError(
+                    breaker.name, f"gave up after {attempt} attempts: retry in {delay:.1f}s exceeds deadline",
+                    retry_after
+                ) from e
+            logger.warning(f"{breaker.name} call failed ({e}); retrying in {delay:.2f}s "
+                           f"(attempt {attempt}/{max_attempts})")
+            await asyncio.sleep(delay)
+        except BaseException:
+            # キャンセルなどは依存先の成否ではないが、復旧確認の枠を握ったままにしない
+            if is_trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """依存先ごとにプロセスで共有するサーキットブレーカーを取得"""
+    with _circuit_breakers_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(name)
+        return _circuit_breakers[name]
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """全依存先のサーキットの状態を取得"""
+    with _circuit_breakers_lock:
+        breakers = list(_circuit_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
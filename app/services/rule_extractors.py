@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+ルールベースのスケジュール抽出
+定型フォーマットのチケットサイト・公式スケジュールページの検索結果から、LLMを使わずにイベントを取り出す
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import Config
+from app.utils.japanese import JapaneseTextProcessor
+
+logger = logging.getLogger(__name__)
+
+_OPEN_TIME = re.compile(r'開演\s*[:：]?\s*(\d{1,2}:\d{2})|(\d{1,2}:\d{2})\s*開演')
+_DOORS_TIME = re.compile(r'開場\s*[:：]?\s*\d{1,2}:\d{2}|\d{1,2}:\d{2}\s*開場')
+_ANY_TIME = re.compile(r'(?<!\d)(\d{1,2}:\d{2})(?!\d)')
+_VENUE_LABEL = re.compile(r'(?:会場|場所)\s*[:：]\s*([^\s/|｜、,()（）]+)')
+_SEGMENT_NOISE = re.compile(r'(?:公演日時?|日時|開場|開演|会場|場所)\s*[:：]?')
+_TITLE_SEPARATOR = re.compile(r'\s+[-|｜–]\s+|｜|\s*\|\s*')
+# 公演日ではなくチケットの発売・受付日程であることを示す語（「一般発売：11/1」のように日付の前に来ることもある）
+_SALE_WORDS = re.compile(r'発売|受付|抽選|先行|締切')
+_SALE_HEADING_TAIL = re.compile(r'\S*(?:発売|受付|抽選|先行|締切)\S*\s*[:：]$')
+# 公式スケジュールの行タイトルとして不自然なもの（助詞で始まる・文の句読点を含む＝記事の本文）
+_PARTICLE_START = re.compile(r'^(?:は|が|を|に|で|の|と|も|へ|や|から|より|まで)')
+_SENTENCE_PUNCTUATION = re.compile(r'[。、]|[!?](?=\s|$)')
+
+
+class RuleExtractor(ABC):
+    """ルールベース抽出の基底クラス（domainsに一致するURLの検索結果を扱う）"""
+
+    name = 'rule'
+    domains: List[str] = []
+    # タイトル末尾から取り除くサイト名
+    site_names: List[str] = []
+    default_type = 'その他'
+    confidence = 0.9
+
+    def __init__(self):
+        self.text_processor = JapaneseTextProcessor()
+
+    def matches(self, result: Dict[str, Any]) -> bool:
+        """ドメイン以外の条件で対象とするか（ドメイン登録のない抽出器で使用）"""
+        return False
+
+    @abstractmethod
+    def extract(self, result: Dict[str, Any], artist_name: str,
+                today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        検索結果からイベントを抽出
+
+        Args:
+            result: 検索結果（title・url・snippet・page_text）
+            artist_name: アーティスト名
+            today: 年のない日付の年を補う基準日（省略時は今日）
+
+        Returns:
+            抽出したイベント（定型フォーマットとして読めない場合None、LLMに回す）
+        """
+
+    def _clean_title(self, title: str) -> str:
+        """検索結果タイトルからサイト名などの付加部分を取り除く"""
+        parts = [part.strip() for part in _TITLE_SEPARATOR.split(self.text_processor.normalize_text(title or ''))]
+        parts = [part for part in parts
+                 if part and not any(site.lower() in part.lower() for site in self.site_names)]
+        return parts[0] if parts else ''
+
+    def _mentions_artist(self, text: str, artist_name: str) -> bool:
+        """テキストにアーティスト名が含まれるか（英字名は LIVE 中の IVE のような部分一致を除く）"""
+        artist = re.escape(self.text_processor.normalize_text(artist_name))
+        pattern = rf'(?<![A-Za-z0-9]){artist}(?![A-Za-z0-9])'
+        return bool(re.search(pattern, self.text_processor.normalize_text(text or ''), re.IGNORECASE))
+
+    def _date_segments(self, text: str, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        テキストを日付表記ごとに区切り、日付とその後ろの記述の組を返す
+        （年のない日付・和暦・期間も読み、期間は開始日で代表させる）
+        confirmedは年が明示されているか、年のない日付の年を曜日表記で確かめられたか
+        日だけの列挙（11月15日・16日 東京ドーム の15日）は後ろの日付の記述を共有する
+        """
+        expressions = self.text_processor.parse_date_expressions(text, today)
+        segments = []
+        following_detail = ''
+        for index in range(len(expressions) - 1, -1, -1):
+            expression = expressions[index]
+            end = expressions[index + 1]['span'][0] if index + 1 < len(expressions) else len(text)
+            gap = text[expression['span'][1]:end]
+            detail = following_detail if gap.strip() in ('・', '、', ',') else gap.strip(' 　/|｜,、')
+            following_detail = detail
+            segments.append({
+                'date': expression['start'].isoformat(),
+                'detail': detail,
+                'confirmed': expression['explicit_year'] or expression['weekday'] is not None
+            })
+        return segments[::-1]
+
+    def _event(self, result: Dict[str, Any], artist_name: str, date: str, title: str,
+               time: str = '', location: str = '', event_type: Optional[str] = None) -> Dict[str, Any]:
+        """抽出結果をGeminiの抽出結果と同じ形式のイベントにする"""
+        return {
+            'date': date,
+            'time': time,
+            'title': title,
+            'artist': artist_name,
+            'type': event_type or self.default_type,
+            'location': location,
+            'source': result.get('url', ''),
+            'confidence': self.confidence,
+            'reliability': 'high',
+            'extractor': self.name
+        }
+
+
+class TicketListingExtractor(RuleExtractor):
+    """チケットサイト（e+・チケットぴあ・ローソンチケット）の公演一覧から公演日・開演時刻・会場を抽出"""
+
+    name = 'ticket_listing'
+    domains = ['eplus.jp', 't.pia.jp', 'pia.jp', 'l-tike.com']
+    site_names = ['イープラス', 'e+', 'チケットぴあ', 'ぴあ', 'ローチケ', 'ローソンチケット', 'チケット情報']
+    default_type = 'コンサート'
+
+    def extract(self, result: Dict[str, Any], artist_name: str,
+                today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        title = self._clean_title(result.get('title', ''))
+        # 他アーティストの公演一覧を誤って取り込まないよう、タイトルにアーティスト名があるものだけ扱う
+        if not title or not self._mentions_artist(title, artist_name):
+            return None
+
+        text = self.text_processor.normalize_text(
+            ' '.join(result.get(field) or '' for field in ('snippet', 'page_text'))
+        )
+        segments = self._performance_segments(self._date_segments(text, today))
+        if not segments:
+            return None
+
+        detected = self.text_processor.detect_event_type(title)
+        event_type = detected if detected != 'その他' else self.default_type
+        events = []
+        for segment in segments:
+            detail = segment['detail']
+            # 開場時刻を除いてから開演時刻（表記がなければ最初の時刻）を探す
+            without_doors = _DOORS_TIME.sub(' ', detail)
+            open_time = _OPEN_TIME.search(without_doors)
+            if open_time:
+                time = open_time.group(1) or open_time.group(2)
+            else:
+                any_time = _ANY_TIME.search(without_doors)
+                time = any_time.group(1) if any_time else ''
+            events.append(self._event(
+                result, artist_name, segment['date'], title,
+                time=self.text_processor.normalize_time(time) or '',
+                location=self._find_venue(detail), event_type=event_type
+            ))
+        return events
+
+    @classmethod
+    def _performance_segments(cls, segments: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        発売・受付日程の日付を除いた公演日の区切りを返す
+
+        Args:
+            segments: 日付ごとの区切り
+
+        Returns:
+            公演日の区切り（開演時刻・会場の手がかりがない、または年を確定できない公演日があれば
+            定型とみなさずNone）
+        """
+        performances = []
+        sale_label_before = False
+        for segment in segments:
+            detail = segment['detail']
+            # 末尾の「一般発売：」などは次の日付の見出しなので、この日付の記述から外す
+            heading = _SALE_HEADING_TAIL.search(detail)
+            if heading:
+                detail = detail[:heading.start()].rstrip(' 　/|｜,、')
+            is_sale = sale_label_before or bool(_SALE_WORDS.search(detail))
+            sale_label_before = heading is not None
+            if is_sale:
+                continue
+            # 年も曜日もない日付は過去の公演の可能性があるため、年の判断をLLMに任せる
+            if not segment['confirmed'] or not cls._has_performance_signal(detail):
+                return None
+            performances.append({**segment, 'detail': detail})
+        return performances
+
+    @classmethod
+    def _has_performance_signal(cls, detail: str) -> bool:
+        """公演の記述に開演時刻・会場の手がかりがあるか"""
+        if _OPEN_TIME.search(detail) or _VENUE_LABEL.search(detail):
+            return True
+        return bool(_ANY_TIME.search(detail)) and bool(cls._find_venue(detail))
+
+    @staticmethod
+    def _find_venue(detail: str) -> str:
+        """公演の記述から会場名を取り出す（「会場：」表記がなければ時刻の後ろの最初の語）"""
+        labelled = _VENUE_LABEL.search(detail)
+        if labelled:
+            return labelled.group(1)
+        remainder = _SEGMENT_NOISE.sub(' ', _ANY_TIME.sub(' ', detail))
+        for token in re.split(r'[\s/|｜、,()（）]+', remainder):
+            if len(token) >= 2 and not token.isdigit():
+                return token
+        return ''
+
+
+class OfficialScheduleExtractor(RuleExtractor):
+    """公式サイトのSCHEDULEページ（日付ごとに1行のイベント一覧）からイベントを抽出"""
+
+    name = 'official_schedule'
+    confidence = 0.85
+    _SCHEDULE_PATH = re.compile(r'/(?:schedule|schedules|live|event|events)(?:/|$)', re.IGNORECASE)
+
+    @staticmethod
+    def _host(result: Dict[str, Any]) -> str:
+        return urlsplit(result.get('url', '')).netloc.lower().split(':')[0]
+
+    @staticmethod
+    def _on_domain(host: str, domains: List[str]) -> bool:
+        return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+    def matches(self, result: Dict[str, Any]) -> bool:
+        # ニュース記事などを読まないよう、公式サイト（設定済みのドメインかofficialを含むホスト）のみ扱う
+        host = self._host(result)
+        configured = [domain for domains in Config.OFFICIAL_SITE_DOMAINS.values() for domain in domains]
+        if not (self._on_domain(host, configured) or 'official' in host):
+            return False
+        return bool(self._SCHEDULE_PATH.search(urlsplit(result.get('url', '')).path))
+
+    def _is_artist_site(self, host: str, artist_name: str) -> bool:
+        """ホストがアーティストの公式サイトか（設定がなければホスト名にアーティスト名があるofficialサイト）"""
+        domains = Config.OFFICIAL_SITE_DOMAINS.get(artist_name.strip().lower())
+        if domains:
+            return self._on_domain(host, domains)
+        return 'official' in host and self._mentions_artist(host.replace('-', ' ').replace('.', ' '), artist_name)
+
+    def _schedule_lines(self, result: Dict[str, Any],
+                        today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        日付で始まる行ごとに日付と記述を取り出す
+
+        Returns:
+            行ごとの日付と記述（日付が行頭にない・1行に複数ある場合は一覧ではないとみなしNone）
+        """
+        lines = []
+        for field in ('snippet', 'page_text'):
+            for raw in (result.get(field) or '').splitlines():
+                line = self.text_processor.normalize_text(raw)
+                if not line:
+                    continue
+                expressions = self.text_processor.parse_date_expressions(line, today)
+                if not expressions:
+                    continue
+                if len(expressions) > 1 or expressions[0]['span'][0] != 0:
+                    return None
+                expression = expressions[0]
+                # 年も曜日もない日付は過去のイベントの可能性があるため、年の判断をLLMに任せる
+                if not (expression['explicit_year'] or expression['weekday'] is not None):
+                    return None
+                lines.append({'date': expression['start'].isoformat(),
+                              'detail': line[expression['span'][1]:].strip(' 　/|｜,、')})
+        return lines
+
+    def extract(self, result: Dict[str, Any], artist_name: str,
+                today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        # 他アーティストの公式サイトを取り込まない
+        if not self._is_artist_site(self._host(result), artist_name):
+            return None
+
+        lines = self._schedule_lines(result, today)
+        if not lines:
+            return None
+
+        events = []
+        for line in lines:
+            detail = line['detail']
+            time_match = _ANY_TIME.search(detail)
+            # 「[LIVE] タイトル」のカテゴリ表記は種別判定にのみ使う
+            title = re.sub(r'^\[[^\]]{1,12}\]\s*', '', _ANY_TIME.sub(' ', detail)).strip(' -:：')
+            title = re.split(r'\s{2,}|\s[|｜]\s', title)[0].strip()
+            # 1件でもタイトルらしくない行（短すぎる・文の一部）があれば定型ページとみなさずLLMに回す
+            if len(title) < 2 or _PARTICLE_START.match(title) or _SENTENCE_PUNCTUATION.search(title):
+                return None
+            events.append(self._event(
+                result, artist_name, line['date'], title[:100],
+                time=self.text_processor.normalize_time(time_match.group(1)) if time_match else '',
+                event_type=self.text_processor.detect_event_type(detail)
+            ))
+        return events
+
+
+class RuleExtractorRegistry:
+    """ドメインごとのルールベース抽出器の登録先"""
+
+    def __init__(self):
+        self._by_domain: Dict[str, RuleExtractor] = {}
+        self._matchers: List[RuleExtractor] = []
+
+    def register(self, extractor: RuleExtractor) -> None:
+        """
+        抽出器を登録（domainsがあればドメインで、なければmatches()で対象を判定）
+
+        Args:
+            extractor: 抽出器
+        """
+        if extractor.domains:
+            for domain in extractor.domains:
+                self._by_domain[domain.lower()] = extractor
+        else:
+            self._matchers.append(extractor)
+
+    def find(self, result: Dict[str, Any]) -> Optional[RuleExtractor]:
+        """
+        検索結果を扱える抽出器を探す（サブドメインも一致とみなす）
+
+        Args:
+            result: 検索結果
+
+        Returns:
+            抽出器（該当なしの場合None）
+        """
+        host = urlsplit(result.get('url', '')).netloc.lower().split(':')[0]
+        labels = host.split('.')
+        for index in range(len(labels) - 1):
+            extractor = self._by_domain.get('.'.join(labels[index:]))
+            if extractor is not None:
+                return extractor
+        for extractor in self._matchers:
+            if extractor.matches(result):
+                return extractor
+        return None
+
+    def extract(self, search_results: List[Dict[str, Any]], artist_name: str,
+                today: Optional[date] = None) -> Tuple[List[Dict[str, Any]], int, List[Dict[str, Any]]]:
+        """
+        ルールで読める検索結果からイベントを抽出し、読めなかった検索結果を残す
+
+        Args:
+            search_results: 検索結果のリスト
+            artist_name: アーティスト名
+            today: 年のない日付の年を補う基準日（省略時は今日）
+
+        Returns:
+            (抽出したイベント, ルールで扱った検索結果の数, LLMに回す検索結果)
+        """
+        events: List[Dict[str, Any]] = []
+        handled = 0
+        leftovers = []
+        for result in search_results:
+            extractor = self.find(result)
+            extracted = None
+            if extractor is not None:
+                try:
+                    extracted = extractor.extract(result, artist_name, today)
+                except Exception as e:
+                    logger.warning(f"Rule extractor {extractor.name} failed for {result.get('url')}: {e}")
+            if extracted is None:
+                leftovers.append(result)
+                continue
+            handled += 1
+            events.extend(extracted)
+        return events, handled, leftovers
+
+
+def build_default_registry() -> RuleExtractorRegistry:
+    """標準のチケットサイト・公式スケジュールページ用抽出器を登録したレジストリを生成"""
+    registry = RuleExtractorRegistry()
+    registry.register(TicketListingExtractor())
+    registry.register(OfficialScheduleExtractor())
+    return registry
+
+
+_rule_extractor_registry: Optional[RuleExtractorRegistry] = None
+
+
+def get_rule_extractor_registry() -> Optional[RuleExtractorRegistry]:
+    """プロセス共有のルールベース抽出器レジストリを取得（無効化されている場合None）"""
+    global _rule_extractor_registry
+    if not Config.RULE_EXTRACTION_ENABLED:
+        return None
+    if _rule_extractor_registry is None:
+        _rule_extractor_registry = build_default_registry()
+    return _rule_extractor_registry
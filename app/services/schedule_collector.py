@@ -6,26 +6,445 @@ Google Search API + Gemini抽出の統合処理
 
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import hashlib
+import math
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Tuple
+from datetime import datetime, date, timedelta, timezone
 import json
 
 import httpx
-from google.generativeai import GenerativeModel
-import google.generativeai as genai
 
-from app.config import JAPANESE_SCHEDULE_PROMPT_TEMPLATE, UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE
+from app.config import (
+    Config, JAPANESE_SCHEDULE_PROMPT_TEMPLATE, UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE,
+    MULTI_ARTIST_SCHEDULE_PROMPT_TEMPLATE
+)
 from app.utils.japanese import JapaneseTextProcessor
+from app.utils.gemini_json import (
+    EVENTS_RESPONSE_SCHEMA, build_batch_response_schema, json_generation_config,
+    parse_events, parse_batch_events
+)
+from app.utils.search_results import (
+    canonicalize_url, dedupe_search_results, estimate_tokens, is_high_reliability_url,
+    select_results_within_budget
+)
 from app.services.firestore_client import FirestoreClient
+from app.services.extraction_cache import ExtractionCache, get_extraction_cache
+from app.services.llm_clients import LLMClientRegistry, get_llm_registry
+from app.services.resilience import (
+    TRANSIENT_STATUS_CODES, DependencyUnavailableError, TransientError, call_with_retry,
+    get_circuit_breaker, parse_retry_after
+)
+from app.services.model_cascade import CascadeStats, find_escalation_reason, get_cascade_stats
+from app.services.search_cache import SearchCache, get_search_cache
+from app.services.page_fetcher import PageContentFetcher, get_page_fetcher
+from app.services.rule_extractors import RuleExtractorRegistry, get_rule_extractor_registry
+from app.services.cassette import Cassette, CassetteMissError, get_cassette
+from app.services.sqlite_store import SQLiteStore
+
+# HTTP/2はh2パッケージがある場合のみ有効化
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+GOOGLE_SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
+# 1アーティストあたりの検索クエリテンプレート数
+MAX_QUERIES_PER_ARTIST = 4
+
+# 1クエリあたりの取得件数
+SEARCH_RESULTS_PER_QUERY = 5
+
+# Custom Searchの日次クォータは米国太平洋時間の0時にリセットされる
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+class SearchQuotaManager(SQLiteStore):
+    """Custom Search の日次クォータ管理"""
+    
+    store_name = 'Quota'
+    filename = 'search_quota.sqlite3'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS quota_usage (day TEXT PRIMARY KEY, used INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS artist_refresh (artist TEXT PRIMARY KEY, refreshed_at TEXT NOT NULL)",
+    )
+    
+    def __init__(self, daily_quota: Optional[int] = None, db_path: Optional[str] = None):
+        """
+        初期化
+        
+        Args:
+            daily_quota: 1日あたりのクエリ上限
+            db_path: SQLiteファイルのパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+        """
+        self.daily_quota = Config.SEARCH_DAILY_QUOTA if daily_quota is None else daily_quota
+        super().__init__(db_path)
+    
+    @staticmethod
+    def _today() -> str:
+        """クォータ集計日（太平洋時間）"""
+        return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+    
+    def get_used(self) -> int:
+        """本日消費したクエリ数"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM quota_usage WHERE day = ?", (self._today(),)
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def get_remaining(self) -> int:
+        """本日の残りクエリ数"""
+        return max(self.daily_quota - self.get_used(), 0)
+    
+    def try_consume(self, count: int = 1) -> bool:
+        """
+        クォータを消費（残りが不足している場合は消費しない）
+        
+        Args:
+            count: 消費するクエリ数
+            
+        Returns:
+            消費できた場合True
+        """
+        day = self._today()
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM quota_usage WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            if used + count > self.daily_quota:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quota_usage (day, used) VALUES (?, ?)", (day, used + count)
+            )
+            self._conn.commit()
+        return True
+    
+    def record_refresh(self, artist_name: str) -> None:
+        """アーティストの最終収集日時を記録"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artist_refresh (artist, refreshed_at) VALUES (?, ?)",
+                (artist_name, datetime.now().isoformat())
+            )
+            self._conn.commit()
+    
+    def get_days_since_refresh(self, artist_name: str) -> Optional[float]:
+        """最終収集からの経過日数（未収集の場合None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_at FROM artist_refresh WHERE artist = ?", (artist_name,)
+            ).fetchone()
+        if not row:
+            return None
+        return (datetime.now() - datetime.fromisoformat(row[0])).total_seconds() / 86400
+    
+    def get_priority(self, artist_name: str, subscriber_count: int = 0) -> float:
+        """
+        アーティストの収集優先度を算出
+        登録ユーザー数が多く、前回収集から時間が経っているほど高い
+        """
+        days = self.get_days_since_refresh(artist_name)
+        staleness = Config.SEARCH_QUOTA_MAX_STALENESS_DAYS if days is None else min(
+            days, Config.SEARCH_QUOTA_MAX_STALENESS_DAYS
+        )
+        return math.log1p(max(subscriber_count, 0)) + staleness / 7
+    
+    def allocate(self, artist_names: List[str],
+                 subscriber_counts: Optional[Dict[str, int]] = None,
+                 max_per_artist: int = MAX_QUERIES_PER_ARTIST) -> Dict[str, int]:
+        """
+        残りクォータをアーティストに配分
+        優先度順に1クエリずつ配り、予算が少ないときは1人あたりのクエリ数を減らす
+        
+        Args:
+            artist_names: アーティスト名のリスト
+            subscriber_counts: アーティスト名ごとの登録ユーザー数
+            max_per_artist: 1アーティストあたりの最大クエリ数
+            
+        Returns:
+            アーティスト名ごとの割当クエリ数（0は今回スキップ）
+        """
+        subscriber_counts = subscriber_counts or {}
+        ordered = sorted(
+            artist_names,
+            key=lambda name: self.get_priority(name, subscriber_counts.get(name, 0)),
+            reverse=True
+        )
+        
+        remaining = self.get_remaining()
+        allocation = {name: 0 for name in artist_names}
+        
+        for _ in range(max_per_artist):
+            for name in ordered:
+                if remaining <= 0:
+                    break
+                allocation[name] += 1
+                remaining -= 1
+        
+        return allocation
+    
+    def get_status(self) -> Dict[str, Any]:
+        """クォータの状況を取得"""
+        used = self.get_used()
+        return {
+            'day': self._today(),
+            'daily_quota': self.daily_quota,
+            'used': used,
+            'remaining': max(self.daily_quota - used, 0)
+        }
+
+
+_quota_manager: Optional[SearchQuotaManager] = None
+
+
+def get_quota_manager() -> SearchQuotaManager:
+    """プロセス共有のクォータマネージャーを取得"""
+    global _quota_manager
+    if _quota_manager is None:
+        _quota_manager = SearchQuotaManager()
+    return _quota_manager
+
+
+class SearchQueryPlanner(SQLiteStore):
+    """検索クエリの実績に基づく発行順序の決定"""
+    
+    store_name = 'Query stats'
+    filename = 'search_query_stats.sqlite3'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS query_stats ("
+        "query_id TEXT PRIMARY KEY, runs INTEGER NOT NULL, events INTEGER NOT NULL)",
+    )
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初期化
+        
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+        """
+        super().__init__(db_path)
+    
+    def get_score(self, query_id: str) -> float:
+        """クエリ1回あたりのイベント獲得率（実績がない場合は0.5）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT runs, events FROM query_stats WHERE query_id = ?", (query_id,)
+            ).fetchone()
+        runs, events = row if row else (0, 0)
+        return (events + 1) / (runs + 2)
+    
+    def rank(self, queries: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """イベント獲得率の高い順にクエリを並べ替え（同率の場合は元の順序）"""
+        return sorted(queries, key=lambda query: self.get_score(query['id']), reverse=True)
+    
+    def _increment(self, query_id: str, runs: int = 0, events: int = 0) -> None:
+        """実績を加算"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO query_stats (query_id, runs, events) VALUES (?, ?, ?) "
+                "ON CONFLICT(query_id) DO UPDATE SET runs = runs + ?, events = events + ?",
+                (query_id, runs, events, runs, events)
+            )
+            self._conn.commit()
+    
+    def record_run(self, query_id: str) -> None:
+        """クエリの発行を記録"""
+        self._increment(query_id, runs=1)
+    
+    def record_yield(self, search_results: List[Dict[str, str]],
+                     events: List[Dict[str, Any]]) -> None:
+        """
+        抽出されたイベントを出典URLを返したクエリに帰属させて記録
+        
+        Args:
+            search_results: 検索結果（query_idを含む）
+            events: バリデーション済みイベント
+        """
+        query_by_url = {result.get('url'): result.get('query_id') for result in search_results}
+        counts: Dict[str, int] = {}
+        
+        for event in events:
+            query_id = query_by_url.get(event.get('source'))
+            if query_id:
+                counts[query_id] = counts.get(query_id, 0) + 1
+        
+        for query_id, count in counts.items():
+            self._increment(query_id, events=count)
+
+
+_query_planner: Optional[SearchQueryPlanner] = None
+
+
+def get_query_planner() -> SearchQueryPlanner:
+    """プロセス共有のクエリプランナーを取得"""
+    global _query_planner
+    if _query_planner is None:
+        _query_planner = SearchQueryPlanner()
+    return _query_planner
+
+
+class EvidenceStore(SQLiteStore):
+    """アーティストごとの検索結果フィンガープリントとバリデーション済みイベントの保存"""
+    
+    store_name = 'Evidence'
+    filename = 'search_evidence.sqlite3'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS evidence ("
+        "artist_key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, events TEXT NOT NULL, "
+        "updated_at TEXT NOT NULL)",
+    )
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初期化
+        
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+        """
+        self._stats = {'gemini_calls_skipped': 0, 'fingerprint_changed': 0}
+        
+        super().__init__(db_path)
+    
+    @staticmethod
+    def fingerprint(search_results: List[Dict[str, Any]]) -> str:
+        """プロンプトに入る検索結果（URL・タイトル・概要・本文抜粋）の順序付きハッシュ"""
+        evidence = [
+            [result.get('url', ''), result.get('title', ''),
+             result.get('snippet', ''), result.get('page_text', '')]
+            for result in search_results
+        ]
+        return hashlib.sha256(json.dumps(evidence, ensure_ascii=False).encode()).hexdigest()
+    
+    @staticmethod
+    def _artist_key(flight_key: Tuple[str, str, int]) -> str:
+        """正規化アーティスト名とジャンルから保存キーを生成"""
+        return json.dumps([flight_key[0], flight_key[1]], ensure_ascii=False)
+    
+    def get_events(self, flight_key: Tuple[str, str, int], fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        フィンガープリントが前回と一致する場合に前回のイベントを取得
+        
+        Args:
+            flight_key: (正規化アーティスト名, ジャンル, days_ahead)
+            fingerprint: 今回の検索結果のフィンガープリント
+            
+        Returns:
+            前回のバリデーション済みイベント（一致しない場合None）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, events FROM evidence WHERE artist_key = ?",
+                (self._artist_key(flight_key),)
+            ).fetchone()
+            
+            if not row:
+                return None
+            if row[0] != fingerprint:
+                self._stats['fingerprint_changed'] += 1
+                return None
+            
+            self._stats['gemini_calls_skipped'] += 1
+        return json.loads(row[1])
+    
+    def save(self, flight_key: Tuple[str, str, int], fingerprint: str,
+             events: List[Dict[str, Any]]) -> None:
+        """フィンガープリントとバリデーション済みイベントを保存"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evidence (artist_key, fingerprint, events, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self._artist_key(flight_key), fingerprint,
+                 json.dumps(events, ensure_ascii=False), datetime.now().isoformat())
+            )
+            self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Gemini呼び出しのスキップ件数などを取得"""
+        with self._lock:
+            return dict(self._stats)
+
+
+_evidence_store: Optional[EvidenceStore] = None
+
+
+def get_evidence_store() -> EvidenceStore:
+    """プロセス共有のエビデンスストアを取得"""
+    global _evidence_store
+    if _evidence_store is None:
+        _evidence_store = EvidenceStore()
+    return _evidence_store
+
 
 class ScheduleCollector:
     """スケジュール収集・抽出・保存の統合サービス"""
     
+    # 全インスタンスで共有するHTTPクライアント（FastAPIのlifespanで生成・破棄）
+    _http_client: Optional[httpx.AsyncClient] = None
+    
+    # 実行中の収集（同一アーティストの同時収集を1回にまとめる）
+    _in_flight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+    _single_flight_stats = {'executed': 0, 'coalesced': 0}
+    
+    @classmethod
+    def open_http_client(cls) -> httpx.AsyncClient:
+        """
+        共有HTTPクライアントを生成（既に存在する場合はそれを返す）
+        
+        Returns:
+            コネクションプール付きのHTTPクライアント
+        """
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=Config.SEARCH_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=Config.SEARCH_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.SEARCH_HTTP_MAX_KEEPALIVE
+                )
+            )
+            logger.info(f"Shared HTTP client opened (http2={HTTP2_AVAILABLE})")
+        return cls._http_client
+    
+    @classmethod
+    def get_single_flight_stats(cls) -> Dict[str, int]:
+        """同時収集のまとめ込み件数を取得"""
+        return {**cls._single_flight_stats, 'in_flight': len(cls._in_flight)}
+    
+    @classmethod
+    async def close_http_client(cls) -> None:
+        """共有HTTPクライアントを破棄"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+            logger.info("Shared HTTP client closed")
+    
     def __init__(self, google_api_key: str, google_search_engine_id: str, 
-                 gemini_api_key: str, firestore_client: Optional[FirestoreClient] = None):
+                 gemini_api_key: str, firestore_client: Optional[FirestoreClient] = None,
+                 firestore_factory: Optional[Callable[[], FirestoreClient]] = None,
+                 search_cache: Optional[SearchCache] = None,
+                 quota_manager: Optional[SearchQuotaManager] = None,
+                 query_planner: Optional[SearchQueryPlanner] = None,
+                 page_fetcher: Optional[PageContentFetcher] = None,
+                 evidence_store: Optional[EvidenceStore] = None,
+                 extraction_cache: Optional[ExtractionCache] = None,
+                 enrich_pages: Optional[bool] = None,
+                 search_concurrency: Optional[int] = None,
+                 extract_concurrency: Optional[int] = None,
+                 batch_extraction: Optional[bool] = None,
+                 cascade_models: Optional[List[str]] = None,
+                 cascade_stats: Optional[CascadeStats] = None,
+                 date_prefilter: Optional[bool] = None,
+                 llm_registry: Optional[LLMClientRegistry] = None,
+                 rule_extractors: Optional[RuleExtractorRegistry] = None,
+                 cassette: Optional[Cassette] = None):
         """
         初期化
         
@@ -34,15 +453,65 @@ class ScheduleCollector:
             google_search_engine_id: Google検索エンジンID
             gemini_api_key: Gemini API キー
             firestore_client: Firestoreクライアント
+            firestore_factory: Firestoreクライアントの生成関数（接続できていない間、保存時に一定間隔で再接続を試みる）
+            search_cache: 検索レスポンスキャッシュ（省略時はプロセス共有キャッシュ）
+            quota_manager: 検索クォータ管理（省略時はプロセス共有インスタンス）
+            query_planner: 検索クエリプランナー（省略時はプロセス共有インスタンス）
+            page_fetcher: 検索結果ページの本文取得サービス（省略時はプロセス共有インスタンス）
+            evidence_store: 検索結果フィンガープリントと抽出結果の保存先（省略時はプロセス共有インスタンス）
+            extraction_cache: Gemini応答キャッシュ（省略時はプロセス共有インスタンス、設定で無効化可能）
+            enrich_pages: 検索結果ページの本文を取得してプロンプトに含めるか
+            search_concurrency: 同時に検索するアーティスト数の上限
+            extract_concurrency: 同時に実行するGemini抽出数の上限
+            batch_extraction: 複数アーティスト収集時に検索結果をまとめて1回のGemini呼び出しで抽出するか
+            cascade_models: 安価な順のGeminiモデル名（省略時は設定値）
+            cascade_stats: モデル階層ごとの統計（省略時はプロセス共有インスタンス）
+            date_prefilter: 今日以降の日付表記を含まない検索結果をGemini送信前に除外するか
+            llm_registry: Geminiモデルの共有レジストリ（省略時はプロセス共有インスタンス）
+            rule_extractors: 定型ページのルールベース抽出器（省略時は設定で有効な場合の共有インスタンス）
+            cassette: Custom Search・Gemini呼び出しの記録/再生（省略時は設定で有効な場合の共有インスタンス）
         """
         self.google_api_key = google_api_key
         self.google_search_engine_id = google_search_engine_id
         self.gemini_api_key = gemini_api_key
         self.firestore_client = firestore_client
+        self.firestore_factory = firestore_factory
+        self._firestore_retry_at = 0.0
+        self.search_cache = search_cache or get_search_cache()
+        self.quota_manager = quota_manager or get_quota_manager()
+        self.query_planner = query_planner or get_query_planner()
+        self.evidence_store = evidence_store or get_evidence_store()
+        self.extraction_cache = extraction_cache or get_extraction_cache()
+        self.enrich_pages = Config.PAGE_ENRICHMENT_ENABLED if enrich_pages is None else enrich_pages
+        self.page_fetcher = page_fetcher or (get_page_fetcher() if self.enrich_pages else None)
+        self.date_prefilter = Config.DATE_PREFILTER_ENABLED if date_prefilter is None else date_prefilter
+        self.rule_extractors = rule_extractors or get_rule_extractor_registry()
+        
+        # ステージごとの同時実行数制限（上流APIのレート制限対策）
+        self.search_concurrency = search_concurrency or Config.COLLECT_SEARCH_CONCURRENCY
+        self.extract_concurrency = extract_concurrency or Config.COLLECT_EXTRACT_CONCURRENCY
+        self._search_semaphore = asyncio.Semaphore(self.search_concurrency)
+        self._extract_semaphore = asyncio.Semaphore(self.extract_concurrency)
+        
+        # 複数アーティスト一括抽出の設定と統計
+        self.batch_extraction = Config.GEMINI_BATCH_EXTRACTION if batch_extraction is None else batch_extraction
+        self.batch_stats = {'batch_requests': 0, 'batched_artists': 0, 'fallback_artists': 0}
         
-        # Gemini初期化
-        genai.configure(api_key=gemini_api_key)
-        self.gemini_model = GenerativeModel('gemini-1.5-flash')
+        # Gemini初期化（安価なモデルから順に試すカスケード、モデルはプロセスで共有）
+        self.llm_registry = llm_registry or get_llm_registry()
+        self.gemini_models = self.llm_registry.get_gemini_models(gemini_api_key, cascade_models)
+        
+        # 記録/再生モードではSearch・Geminiの呼び出しをカセット経由にする
+        self.cassette = cassette or get_cassette()
+        if self.cassette is not None:
+            self.gemini_models = [(name, self.cassette.wrap_gemini_model(name, model))
+                                  for name, model in self.gemini_models]
+        self.gemini_model_name, self.gemini_model = self.gemini_models[0]
+        self.cascade_stats = cascade_stats or get_cascade_stats()
+        
+        # 依存先ごとのサーキットブレーカー（プロセスで共有）
+        self.search_breaker = get_circuit_breaker('google_search')
+        self.gemini_breaker = get_circuit_breaker('gemini')
         
         # 日本語処理ユーティリティ
         self.japanese_processor = JapaneseTextProcessor()
@@ -50,70 +519,539 @@ class ScheduleCollector:
         logger.info("ScheduleCollector initialized")
     
     async def collect_artist_schedules(self, artist_name: str, 
-                                     days_ahead: int = 30, genre: str = "エンターテイメント") -> Dict[str, Any]:
+                                     days_ahead: int = 30, genre: str = "エンターテイメント",
+                                     max_queries: Optional[int] = None) -> Dict[str, Any]:
         """
         指定されたアーティストのスケジュール情報を収集
         
         Args:
             artist_name: アーティスト名
             days_ahead: 何日先まで検索するか
+            max_queries: 検索クエリ数の上限（クォータ配分による）
             
         Returns:
             収集結果と抽出されたスケジュール
         """
+        job = self._new_job(artist_name, days_ahead, genre, max_queries)
+        
+        # 同じアーティストの収集が実行中ならその結果を共有
+        in_flight = self._in_flight.get(job['flight_key'])
+        if in_flight is not None:
+            return await self._await_in_flight(job['flight_key'], in_flight)
+        
+        logger.info(f"Starting schedule collection for artist: {artist_name}")
+        self._start_flight(job)
+        
         try:
-            logger.info(f"Starting schedule collection for artist: {artist_name}")
+            for stage in self._pipeline_stages(save_to_firestore=False):
+                await self._run_stage(stage['handler'], job)
+                if job['result'] is not None and not job['result']['success']:
+                    break
+        finally:
+            self._finish_flight(job)
+        
+        return job['result']
+    
+    async def iter_multiple_artists_schedules(self, artist_names: List[str],
+                                              days_ahead: int = 30,
+                                              subscriber_counts: Optional[Dict[str, int]] = None,
+                                              save_to_firestore: bool = False
+                                              ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        複数アーティストのスケジュール情報をストリーミングパイプラインで収集し、
+        完了したアーティストから順に返す
+        
+        検索 → 重複除去 → (本文取得) → プロンプト生成 → Gemini抽出 → バリデーション → 保存 の各ステージが
+        上限付きキューで接続され、後段がアーティストNを処理している間に
+        前段はアーティストN+1を処理する
+        
+        Args:
+            artist_names: アーティスト名のリスト
+            days_ahead: 何日先まで検索するか
+            subscriber_counts: アーティスト名ごとの登録ユーザー数（クォータ配分の優先度）
+            save_to_firestore: 保存ステージでFirestoreに保存するか
             
-            # 1. Google検索でスケジュール情報を収集
-            search_results = await self._search_artist_schedules(artist_name, days_ahead)
+        Yields:
+            アーティストごとの収集結果
+        """
+        # 残りクォータを優先度順に配分
+        allocation = self.quota_manager.allocate(
+            artist_names, subscriber_counts,
+            max_per_artist=MAX_QUERIES_PER_ARTIST + Config.SEARCH_MAX_EXTRA_PAGES
+        )
+        scheduled_artists = [artist for artist in artist_names if allocation[artist] > 0]
+        skipped_artists = [artist for artist in artist_names if allocation[artist] == 0]
+        
+        if skipped_artists:
+            logger.warning(f"Search quota exhausted: skipping {len(skipped_artists)} artists")
+        
+        for artist in skipped_artists:
+            yield {
+                'success': False,
+                'artist_name': artist,
+                'message': f'検索クォータ不足のため{artist}の収集をスキップしました',
+                'search_results': [],
+                'extracted_events': []
+            }
+        
+        jobs = [
+            self._new_job(artist, days_ahead, "エンターテイメント", allocation[artist])
+            for artist in scheduled_artists
+        ]
+        
+        async for result in self._run_pipeline(jobs, save_to_firestore):
+            yield result
+    
+    def _reference_date(self) -> date:
+        """収集の基準日（カセット再生時は記録した日に固定し、日付で変わる検索クエリ・絞り込みを再現する）"""
+        return self.cassette.today() if self.cassette is not None else date.today()
+    
+    def _new_job(self, artist_name: str, days_ahead: int, genre: str,
+                 max_queries: Optional[int]) -> Dict[str, Any]:
+        """パイプラインで受け渡すアーティスト単位のジョブを生成"""
+        normalized_name = self.japanese_processor.normalize_text(artist_name).lower()
+        return {
+            'artist_name': artist_name,
+            'days_ahead': days_ahead,
+            'genre': genre,
+            'max_queries': max_queries,
+            'flight_key': (normalized_name, genre, days_ahead),
+            'owns_flight': False,
+            'search_results': [],
+            'prompt': None,
+            'evidence_fingerprint': None,
+            'extracted_events': [],
+            'reused_extraction': False,
+            'extraction_failed': False,
+            'prefiltered_out': False,
+            'rule_events': [],
+            'result': None,
+            'timings': {}
+        }
+    
+    def _start_flight(self, job: Dict[str, Any]) -> None:
+        """ジョブを実行中として登録"""
+        self._in_flight[job['flight_key']] = asyncio.get_running_loop().create_future()
+        self._single_flight_stats['executed'] += 1
+        job['owns_flight'] = True
+    
+    def _finish_flight(self, job: Dict[str, Any]) -> None:
+        """ジョブの結果を待機中の呼び出し元に共有し、実行中の登録を解除"""
+        if not job.get('owns_flight'):
+            return
+        job['owns_flight'] = False
+        
+        future = self._in_flight.pop(job['flight_key'], None)
+        if future is None or future.done():
+            return
+        if job['result'] is not None:
+            future.set_result(job['result'])
+        else:
+            # 実行元がキャンセルされた場合も待機側には失敗結果を返す（cancelすると待機側まで中断される）
+            future.set_result(self._failure_result(job, RuntimeError('collection was cancelled')))
+    
+    async def _await_in_flight(self, flight_key: Tuple[str, str, int],
+                               future: asyncio.Future) -> Dict[str, Any]:
+        """実行中の収集結果を待つ"""
+        self._single_flight_stats['coalesced'] += 1
+        logger.info(f"Coalescing duplicate collection for {flight_key[0]}")
+        return dict(await asyncio.shield(future))
+    
+    def _pipeline_stages(self, save_to_firestore: bool, batch_extraction: bool = False) -> List[Dict[str, Any]]:
+        """パイプラインのステージ定義（ハンドラとワーカー数、batchはジョブのリストを受け取るステージ）"""
+        stages = [
+            {'name': 'search', 'handler': self._stage_search, 'workers': self.search_concurrency},
+            {'name': 'dedupe', 'handler': self._stage_dedupe, 'workers': 1},
+        ]
+        if self.enrich_pages:
+            stages.append({'name': 'enrich', 'handler': self._stage_enrich, 'workers': self.search_concurrency})
+        if self.date_prefilter:
+            stages.append({'name': 'prefilter', 'handler': self._stage_prefilter, 'workers': 1})
+        if self.rule_extractors is not None:
+            stages.append({'name': 'rules', 'handler': self._stage_rule_extract, 'workers': 1})
+        stages += [
+            {'name': 'prompt', 'handler': self._stage_build_prompt, 'workers': 1},
+            {'name': 'extract', 'handler': self._stage_extract_batch, 'workers': self.extract_concurrency,
+             'batch': True}
+            if batch_extraction else
+            {'name': 'extract', 'handler': self._stage_extract, 'workers': self.extract_concurrency},
+            {'name': 'validate', 'handler': self._stage_validate, 'workers': 1},
+        ]
+        if save_to_firestore:
+            stages.append({'name': 'save', 'handler': self._stage_save, 'workers': 1})
+        return stages
+    
+    async def _run_stage(self, handler, job: Dict[str, Any]) -> None:
+        """ステージを実行し、所要時間と例外をジョブに記録"""
+        started = time.monotonic()
+        try:
+            await handler(job)
+        except Exception as e:
+            logger.error(f"Failed to collect schedules for {job['artist_name']}: {e}")
+            job['result'] = self._failure_result(job, e)
+        finally:
+            job['timings'][handler.__name__] = time.monotonic() - started
+    
+    @staticmethod
+    def _failure_result(job: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """ステージで発生した例外からジョブの失敗結果を生成"""
+        return {
+            'success': False,
+            'message': f'スケジュール収集中にエラーが発生しました: {str(error)}',
+            'artist_name': job['artist_name'],
+            'search_results': [],
+            'extracted_events': []
+        }
+    
+    async def _run_batch_stage(self, handler, jobs: List[Dict[str, Any]]) -> None:
+        """複数ジョブをまとめて処理するステージを実行し、所要時間と例外を各ジョブに記録"""
+        started = time.monotonic()
+        try:
+            await handler(jobs)
+        except Exception as e:
+            for job in jobs:
+                if job['result'] is None:
+                    logger.error(f"Failed to collect schedules for {job['artist_name']}: {e}")
+                    job['result'] = self._failure_result(job, e)
+        finally:
+            elapsed = time.monotonic() - started
+            for job in jobs:
+                job['timings'][handler.__name__] = elapsed
+    
+    async def _take_batch(self, queue: asyncio.Queue,
+                          carry: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        キューからトークン予算と件数上限に収まる分のジョブを取り出す
+        予算を超えたジョブはcarryに残し、次のバッチの先頭にする
+        
+        Args:
+            queue: 入力キュー
+            carry: 前回のバッチに入らなかったジョブ
             
-            if not search_results:
-                return {
-                    'success': False,
-                    'message': f'{artist_name}のスケジュール情報が見つかりませんでした',
-                    'search_results': [],
-                    'extracted_events': []
-                }
+        Returns:
+            1回のGemini呼び出しでまとめて処理するジョブ
+        """
+        batch = [carry.pop() if carry else await queue.get()]
+        tokens = batch[0].get('search_tokens', 0)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.GEMINI_BATCH_LINGER
+        
+        while len(batch) < Config.GEMINI_BATCH_MAX_ARTISTS:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                job = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if tokens + job.get('search_tokens', 0) > Config.GEMINI_BATCH_TOKEN_BUDGET:
+                carry.append(job)
+                break
+            batch.append(job)
+            tokens += job.get('search_tokens', 0)
+        
+        return batch
+    
+    async def _run_pipeline(self, jobs: List[Dict[str, Any]],
+                            save_to_firestore: bool) -> AsyncIterator[Dict[str, Any]]:
+        """
+        ステージをワーカーと上限付きキューで接続してジョブを流す
+        
+        Args:
+            jobs: アーティスト単位のジョブ
+            save_to_firestore: 保存ステージを含めるか
             
-            # 2. Geminiでスケジュール情報を抽出・フィルタリング
-            extracted_events = await self._extract_schedules_with_gemini(
-                search_results, artist_name, genre
-            )
+        Yields:
+            完了したジョブの収集結果
+        """
+        if not jobs:
+            return
+        
+        stages = self._pipeline_stages(save_to_firestore, self.batch_extraction and len(jobs) > 1)
+        queues = [asyncio.Queue(maxsize=Config.COLLECT_QUEUE_SIZE) for _ in stages]
+        results: asyncio.Queue = asyncio.Queue()
+        busy_time = {stage['name']: 0.0 for stage in stages}
+        batch_locks = [asyncio.Lock() for _ in stages]
+        carries: List[List[Dict[str, Any]]] = [[] for _ in stages]
+        started = time.monotonic()
+        
+        async def forward(index: int, job: Dict[str, Any]) -> None:
+            failed = job['result'] is not None and not job['result']['success']
+            if failed or index == len(stages) - 1:
+                self._finish_flight(job)
+                await results.put(job['result'])
+            else:
+                await queues[index + 1].put(job)
+        
+        async def worker(index: int) -> None:
+            stage = stages[index]
+            while True:
+                if stage.get('batch'):
+                    # バッチの詰め込みは1ワーカーずつ行い、ワーカー間でジョブが分散しないようにする
+                    async with batch_locks[index]:
+                        batch = await self._take_batch(queues[index], carries[index])
+                    stage_started = time.monotonic()
+                    await self._run_batch_stage(stage['handler'], batch)
+                else:
+                    batch = [await queues[index].get()]
+                    stage_started = time.monotonic()
+                    await self._run_stage(stage['handler'], batch[0])
+                busy_time[stage['name']] += time.monotonic() - stage_started
+                
+                for job in batch:
+                    await forward(index, job)
+        
+        async def follow(job: Dict[str, Any], future: asyncio.Future) -> None:
+            # 結果の件数で終了を判定するため、どう終わっても結果を必ず1件だけ積む
+            result = None
+            try:
+                result = await self._await_in_flight(job['flight_key'], future)
+            except Exception as e:
+                logger.error(f"Failed to share collection for {job['artist_name']}: {e}")
+                result = self._failure_result(job, e)
+            finally:
+                results.put_nowait(result or self._failure_result(job, RuntimeError('collection was cancelled')))
+        
+        async def feed() -> None:
+            for job in jobs:
+                # 同じアーティストの収集が実行中ならパイプラインに流さず結果を共有
+                in_flight = self._in_flight.get(job['flight_key'])
+                if in_flight is not None:
+                    tasks.append(asyncio.ensure_future(follow(job, in_flight)))
+                    continue
+                self._start_flight(job)
+                await queues[0].put(job)
+        
+        tasks = [
+            asyncio.ensure_future(worker(index))
+            for index, stage in enumerate(stages)
+            for _ in range(max(stage['workers'], 1))
+        ]
+        tasks.append(asyncio.ensure_future(feed()))
+        
+        try:
+            for _ in range(len(jobs)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for job in jobs:
+                self._finish_flight(job)
             
-            # 3. 日本語処理とバリデーション
-            validated_events = self._validate_and_normalize_events(
-                extracted_events, artist_name
+            elapsed = time.monotonic() - started
+            busy_summary = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in busy_time.items())
+            skipped = sum(1 for job in jobs if job['reused_extraction'])
+            logger.info(f"Pipeline finished {len(jobs)} artists in {elapsed:.2f}s "
+                        f"({skipped} Gemini calls skipped; stage busy time: {busy_summary}; "
+                        f"batch stats: {self.batch_stats})")
+    
+    async def _stage_search(self, job: Dict[str, Any]) -> None:
+        """検索ステージ: Google検索でスケジュール情報を収集（URL重複除去を含む）"""
+        artist_name = job['artist_name']
+        
+        async with self._search_semaphore:
+            job['search_results'] = await self._search_artist_schedules(
+                artist_name, job['days_ahead'], job['max_queries']
             )
-            
-            logger.info(f"Collection completed: {len(validated_events)} events found for {artist_name}")
-            
-            return {
-                'success': True,
-                'message': f'{artist_name}のスケジュール情報を{len(validated_events)}件取得しました',
-                'artist_name': artist_name,
-                'search_results': search_results,
-                'extracted_events': validated_events,
-                'collected_at': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to collect schedules for {artist_name}: {e}")
-            return {
+        self.quota_manager.record_refresh(artist_name)
+        
+        if not job['search_results']:
+            job['result'] = {
                 'success': False,
-                'message': f'スケジュール収集中にエラーが発生しました: {str(e)}',
+                'message': f'{artist_name}のスケジュール情報が見つかりませんでした',
                 'artist_name': artist_name,
                 'search_results': [],
                 'extracted_events': []
             }
     
+    async def _stage_dedupe(self, job: Dict[str, Any]) -> None:
+        """重複除去ステージ: 正規化URLとタイトル・概要の近似重複を除去"""
+        search_results = job['search_results']
+        unique_results, removed = dedupe_search_results(search_results)
+        
+        tokens_saved = 0
+        if removed:
+            tokens_saved = (
+                estimate_tokens(self._format_search_results_for_gemini(search_results))
+                - estimate_tokens(self._format_search_results_for_gemini(unique_results))
+            )
+            logger.info(f"Removed {len(removed)} near-duplicate results for {job['artist_name']} "
+                        f"(~{tokens_saved} prompt tokens saved)")
+        
+        job['search_results'] = unique_results
+        job['dedupe'] = {'removed': len(removed), 'prompt_tokens_saved': tokens_saved}
+    
+    async def _stage_enrich(self, job: Dict[str, Any]) -> None:
+        """本文取得ステージ: 検索結果ページから日付を含む本文ブロックを取得"""
+        job['search_results'] = await self.page_fetcher.enrich_results(job['search_results'])
+    
+    async def _stage_prefilter(self, job: Dict[str, Any]) -> None:
+        """日付事前フィルタステージ: 今日以降の日付表記を含まない検索結果を除外"""
+        kept = self._prefilter_dated_results(job['search_results'], job['artist_name'])
+        job['date_prefilter'] = {'kept': len(kept), 'dropped': len(job['search_results']) - len(kept)}
+        job['search_results'] = kept
+        job['prefiltered_out'] = not kept
+    
+    async def _stage_rule_extract(self, job: Dict[str, Any]) -> None:
+        """ルール抽出ステージ: 定型フォーマットの検索結果はLLMを使わずに抽出し、残りだけをGeminiに回す"""
+        if job['prefiltered_out']:
+            return
+        job['rule_events'], handled, job['llm_results'] = self.rule_extractors.extract(
+            job['search_results'], job['artist_name'], today=self._reference_date()
+        )
+        job['rule_extraction'] = {'results': handled, 'events': len(job['rule_events'])}
+        if handled:
+            logger.info(f"Rule-based extraction for {job['artist_name']}: {len(job['rule_events'])} events "
+                        f"from {handled} results, {len(job['llm_results'])} results left for Gemini")
+    
+    @staticmethod
+    def _llm_results(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Geminiに回す検索結果（ルール抽出で扱った結果を除く）"""
+        return job.get('llm_results', job['search_results'])
+    
+    def _needs_llm(self, job: Dict[str, Any]) -> bool:
+        """Geminiでの抽出が必要か（事前フィルタ・ルール抽出で検索結果が残らなければ不要）"""
+        if job['prefiltered_out']:
+            return False
+        # ルール抽出を通っていなければ従来どおり検索結果の有無に関わらずGeminiに回す
+        return 'llm_results' not in job or bool(job['llm_results'])
+    
+    async def _stage_build_prompt(self, job: Dict[str, Any]) -> None:
+        """プロンプト生成ステージ: トークン予算内で価値の高い検索結果を選んでプロンプトを生成"""
+        if not self._needs_llm(job):
+            return
+        job['prompt_results'], job['search_tokens'] = self._select_prompt_results(
+            self._llm_results(job), job['artist_name']
+        )
+        job['prompt'] = self._build_extraction_prompt(
+            job['prompt_results'], job['artist_name'], job['genre']
+        )
+        job['prompt_tokens'] = estimate_tokens(job['prompt'])
+    
+    def _reuse_previous_extraction(self, job: Dict[str, Any]) -> bool:
+        """検索結果が前回と同一なら前回のバリデーション済みイベントを再利用"""
+        job['evidence_fingerprint'] = self.evidence_store.fingerprint(job.get('prompt_results') or self._llm_results(job))
+        previous_events = self.evidence_store.get_events(job['flight_key'], job['evidence_fingerprint'])
+        if previous_events is None:
+            return False
+        
+        logger.info(f"Search evidence unchanged for {job['artist_name']}; skipping Gemini")
+        job['extracted_events'] = previous_events
+        job['reused_extraction'] = True
+        return True
+    
+    async def _stage_extract(self, job: Dict[str, Any]) -> None:
+        """抽出ステージ: Geminiでスケジュール情報を抽出・フィルタリング"""
+        if not self._needs_llm(job) or self._reuse_previous_extraction(job):
+            return
+        
+        async with self._extract_semaphore:
+            events = await self._extract_from_prompt(job['prompt'], job['artist_name'])
+        job['extracted_events'] = events or []
+        job['extraction_failed'] = events is None
+    
+    async def _stage_extract_batch(self, jobs: List[Dict[str, Any]]) -> None:
+        """
+        一括抽出ステージ: 複数アーティストの検索結果を1つのプロンプトにまとめて抽出
+        応答を解析できなかったアーティストは単体プロンプトで再抽出する
+        """
+        pending = [job for job in jobs
+                   if self._needs_llm(job) and not self._reuse_previous_extraction(job)]
+        if not pending:
+            return
+        
+        extracted: Dict[int, List[Dict[str, Any]]] = {}
+        if len(pending) > 1:
+            prompt = self._build_batch_extraction_prompt(pending)
+            async with self._extract_semaphore:
+                extracted = await self._extract_batch_from_prompt(prompt, pending)
+            self.batch_stats['batch_requests'] += 1
+            self.batch_stats['batched_artists'] += len(extracted)
+            logger.info(f"Batched {len(extracted)}/{len(pending)} artists into one Gemini request")
+        
+        async def extract_single(job: Dict[str, Any], start_tier: int = 0) -> None:
+            try:
+                async with self._extract_semaphore:
+                    events = await self._extract_from_prompt(job['prompt'], job['artist_name'], start_tier)
+            except DependencyUnavailableError as e:
+                # 一括抽出の他のアーティストに影響させず、このアーティストだけ失敗にする
+                logger.error(f"Failed to collect schedules for {job['artist_name']}: {e}")
+                job['result'] = self._failure_result(job, e)
+                return
+            # 上位モデルの呼び出しに成功していれば空の結果でも採用し、失敗時のみ一括抽出の結果を残す
+            if events is not None:
+                job['extracted_events'] = events
+            job['extraction_failed'] = events is None and not job['extracted_events']
+        
+        fallback = [job for index, job in enumerate(pending) if index not in extracted]
+        if len(pending) > 1:
+            self.batch_stats['fallback_artists'] += len(fallback)
+        
+        # 一括抽出の結果が不確かなアーティストは上位モデルで単体再抽出
+        escalated = []
+        for index, events in extracted.items():
+            pending[index]['extracted_events'] = events
+            self.cascade_stats.record_request()
+            reason = find_escalation_reason(events)
+            if reason is not None and len(self.gemini_models) > 1:
+                self.cascade_stats.record_escalation(self.gemini_model_name, reason)
+                escalated.append(pending[index])
+        
+        await asyncio.gather(
+            *[extract_single(job) for job in fallback],
+            *[extract_single(job, start_tier=1) for job in escalated]
+        )
+    
+    async def _stage_validate(self, job: Dict[str, Any]) -> None:
+        """バリデーションステージ: 日本語処理と正規化（再利用時は過去日付の再フィルタリング）"""
+        artist_name = job['artist_name']
+        validated_events = self._validate_and_normalize_events(
+            job['rule_events'] + job['extracted_events'], artist_name
+        )
+        
+        if not job.get('reused_extraction') and not job['prefiltered_out']:
+            self.query_planner.record_yield(job['search_results'], validated_events)
+            if job['evidence_fingerprint'] is not None and not job.get('extraction_failed'):
+                # 前回結果の再利用はGeminiで抽出した分だけを対象にする
+                llm_events = validated_events if not job['rule_events'] else \
+                    self._validate_and_normalize_events(job['extracted_events'], artist_name)
+                self.evidence_store.save(job['flight_key'], job['evidence_fingerprint'], llm_events)
+        
+        logger.info(f"Collection completed: {len(validated_events)} events found for {artist_name}")
+        
+        job['result'] = {
+            'success': True,
+            'message': f'{artist_name}のスケジュール情報を{len(validated_events)}件取得しました',
+            'artist_name': artist_name,
+            'search_results': job['search_results'],
+            'extracted_events': validated_events,
+            'dedupe': job.get('dedupe', {}),
+            'date_prefilter': job.get('date_prefilter', {}),
+            'rule_extraction': job.get('rule_extraction', {}),
+            'reused_previous_extraction': job.get('reused_extraction', False),
+            'prompt_tokens': job.get('prompt_tokens', 0),
+            'collected_at': datetime.now().isoformat()
+        }
+    
+    async def _stage_save(self, job: Dict[str, Any]) -> None:
+        """保存ステージ: Firestoreに保存"""
+        events = job['result']['extracted_events']
+        if events:
+            save_result = await self.save_schedules_to_firestore(events, job['artist_name'])
+            job['result']['saved_count'] = save_result.get('saved_count', 0)
+    
     async def collect_multiple_artists_schedules(self, artist_names: List[str], 
-                                               days_ahead: int = 30) -> Dict[str, Any]:
+                                               days_ahead: int = 30,
+                                               subscriber_counts: Optional[Dict[str, int]] = None,
+                                               save_to_firestore: bool = False) -> Dict[str, Any]:
         """
         複数アーティストのスケジュール情報を並行して収集
         
         Args:
             artist_names: アーティスト名のリスト
             days_ahead: 何日先まで検索するか
+            subscriber_counts: アーティスト名ごとの登録ユーザー数（クォータ配分の優先度）
+            save_to_firestore: 収集結果をFirestoreに保存するか
             
         Returns:
             全アーティストの収集結果
@@ -121,26 +1059,15 @@ class ScheduleCollector:
         try:
             logger.info(f"Starting batch collection for {len(artist_names)} artists")
             
-            # 並行してスケジュール収集を実行
-            tasks = [
-                self.collect_artist_schedules(artist, days_ahead) 
-                for artist in artist_names
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
             # 結果を整理
             successful_results = []
             failed_results = []
             total_events = 0
             
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    failed_results.append({
-                        'artist_name': artist_names[i],
-                        'error': str(result)
-                    })
-                elif result.get('success'):
+            async for result in self.iter_multiple_artists_schedules(
+                artist_names, days_ahead, subscriber_counts, save_to_firestore
+            ):
+                if result.get('success'):
                     successful_results.append(result)
                     total_events += len(result.get('extracted_events', []))
                 else:
@@ -167,149 +1094,483 @@ class ScheduleCollector:
                 'total_events': 0
             }
     
+    def _build_search_queries(self, artist_name: str) -> List[Dict[str, str]]:
+        """
+        アーティストの検索クエリを生成
+        
+        Args:
+            artist_name: アーティスト名
+            
+        Returns:
+            クエリID（実績集計用）とクエリ文字列のリスト
+        """
+        current_year = self._reference_date().year
+        next_year = current_year + 1
+        
+        return [
+            {'id': 'concert', 'q': f"{artist_name} コンサート ライブ 2024 2025"},
+            {'id': 'schedule', 'q': f"{artist_name} スケジュール イベント {current_year} {next_year}"},
+            {'id': 'ticket', 'q': f"{artist_name} 公演 チケット 日程"},
+            {'id': 'fanmeeting', 'q': f"{artist_name} ファンミーティング 握手会 サイン会"}
+        ]
+    
     async def _search_artist_schedules(self, artist_name: str, 
-                                     days_ahead: int) -> List[Dict[str, str]]:
+                                     days_ahead: int,
+                                     max_queries: Optional[int] = None) -> List[Dict[str, str]]:
         """
         Google Search APIでアーティストのスケジュール情報を検索
+        実績の高いクエリから順に発行し、信頼性の高いURLが十分集まった時点で打ち切る
         
         Args:
             artist_name: アーティスト名
             days_ahead: 何日先まで検索するか
+            max_queries: 発行するクエリ数の上限（ページ送りを含む）
             
         Returns:
             検索結果のリスト
+            
+        Raises:
+            DependencyUnavailableError: 検索APIの障害で1件も取得できなかった場合
         """
         try:
-            # 検索クエリの生成
-            current_year = datetime.now().year
-            next_year = current_year + 1
-            
-            search_queries = [
-                f"{artist_name} コンサート ライブ 2024 2025",
-                f"{artist_name} スケジュール イベント {current_year} {next_year}",
-                f"{artist_name} 公演 チケット 日程",
-                f"{artist_name} ファンミーティング 握手会 サイン会"
-            ]
+            if max_queries is None:
+                max_queries = MAX_QUERIES_PER_ARTIST + Config.SEARCH_MAX_EXTRA_PAGES
             
-            all_results = []
-            
-            async with httpx.AsyncClient() as client:
-                for query in search_queries:
-                    try:
-                        logger.debug(f"Searching: {query}")
-                        
-                        response = await client.get(
-                            "https://www.googleapis.com/customsearch/v1",
-                            params={
-                                "key": self.google_api_key,
-                                "cx": self.google_search_engine_id,
-                                "q": query,
-                                "lr": "lang_ja",  # 日本語検索
-                                "num": 5,  # 1クエリあたり5件
-                                "dateRestrict": f"d{days_ahead}"  # 指定日数以内
-                            },
-                            timeout=10.0
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            items = data.get("items", [])
-                            
-                            for item in items:
-                                result = {
-                                    "title": item.get("title", ""),
-                                    "url": item.get("link", ""),
-                                    "snippet": item.get("snippet", ""),
-                                    "query": query
-                                }
-                                all_results.append(result)
-                                
-                        else:
-                            logger.warning(f"Search API error: {response.status_code}")
-                            
-                        # API制限を避けるための短い遅延
-                        await asyncio.sleep(0.1)
-                        
-                    except Exception as e:
-                        logger.error(f"Search query failed for '{query}': {e}")
-                        continue
+            # 実績順に並べたクエリを先頭ウェーブと残りに分けて発行
+            search_queries = self.query_planner.rank(self._build_search_queries(artist_name))
+            search_queries = search_queries[:max_queries]
+            first_wave = max(Config.SEARCH_PLAN_FIRST_WAVE, 1)
+            waves = [search_queries[:first_wave], search_queries[first_wave:]]
             
-            # 重複URLを除去
+            client = self.open_http_client()
             unique_results = []
             seen_urls = set()
+            full_page_queries = []
+            unavailable: List[DependencyUnavailableError] = []
+            issued = 0
             
-            for result in all_results:
-                url = result.get("url", "")
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_results.append(result)
+            def merge(results: List[Dict[str, str]]) -> None:
+                # 正規化URLで重複を除去
+                for result in results:
+                    url = canonicalize_url(result.get("url", ""))
+                    if url and url not in seen_urls:
+                        seen_urls.add(url)
+                        unique_results.append(result)
+            
+            for wave in waves:
+                if not wave:
+                    continue
+                
+                high_reliability = sum(
+                    1 for result in unique_results if is_high_reliability_url(result['url'])
+                )
+                if high_reliability >= Config.SEARCH_EARLY_STOP_URLS:
+                    logger.info(f"Early stop for {artist_name}: {high_reliability} high-reliability URLs "
+                                f"after {issued} queries")
+                    break
+                
+                # ウェーブ内のクエリは共有クライアント上で並行実行
+                query_results = await asyncio.gather(*[
+                    self._run_search_query(client, query['q'], days_ahead, query_id=query['id'])
+                    for query in wave
+                ], return_exceptions=True)
+                issued += len(wave)
+                
+                for query, results in zip(wave, query_results):
+                    if isinstance(results, DependencyUnavailableError):
+                        unavailable.append(results)
+                        continue
+                    if isinstance(results, BaseException):
+                        raise results
+                    self.query_planner.record_run(query['id'])
+                    if len(results) >= SEARCH_RESULTS_PER_QUERY:
+                        full_page_queries.append(query)
+                    merge(results)
+            
+            # 結果が少ない場合のみ、次ページのある上位クエリでページ送り
+            extra_pages = min(Config.SEARCH_MAX_EXTRA_PAGES, max_queries - issued)
+            for query in full_page_queries[:max(extra_pages, 0)]:
+                if len(unique_results) >= Config.SEARCH_THIN_RESULTS:
+                    break
+                try:
+                    merge(await self._run_search_query(
+                        client, query['q'], days_ahead, query_id=query['id'],
+                        start=SEARCH_RESULTS_PER_QUERY + 1
+                    ))
+                except DependencyUnavailableError as e:
+                    unavailable.append(e)
+                    break
+            
+            # 検索APIの障害で1件も取れなかった場合は「イベントなし」と区別できるよう呼び出し元に伝える
+            if unavailable and not unique_results:
+                raise unavailable[0]
             
             logger.info(f"Search completed: {len(unique_results)} unique results for {artist_name}")
             return unique_results[:15]  # 最大15件に制限
             
+        except (DependencyUnavailableError, CassetteMissError):
+            raise
         except Exception as e:
             logger.error(f"Search failed for {artist_name}: {e}")
             return []
     
-    async def _extract_schedules_with_gemini(self, search_results: List[Dict[str, str]], 
-                                           artist_name: str, genre: str = "K-POP") -> List[Dict[str, Any]]:
+    async def _run_search_query(self, client: httpx.AsyncClient, query: str,
+                                days_ahead: int, query_id: str = "",
+                                start: int = 1) -> List[Dict[str, str]]:
         """
-        Gemini APIでスケジュール情報を抽出・フィルタリング
+        Google Search APIに1クエリを発行
+        
+        Args:
+            client: 共有HTTPクライアント
+            query: 検索クエリ
+            days_ahead: 何日先まで検索するか
+            query_id: クエリID（実績集計用）
+            start: 取得開始位置（ページ送り用）
+            
+        Returns:
+            検索結果のリスト（失敗時は空リスト）
+            
+        Raises:
+            DependencyUnavailableError: 429/5xxで再試行を使い切った、またはサーキットが開いている場合
+        """
+        params = {
+            "cx": self.google_search_engine_id,
+            "q": query,
+            "lr": "lang_ja",  # 日本語検索
+            "num": SEARCH_RESULTS_PER_QUERY,  # 1クエリあたり5件
+            "dateRestrict": f"d{days_ahead}"  # 指定日数以内
+        }
+        if start > 1:
+            params["start"] = start
+        
+        try:
+            items = self.search_cache.get(params)
+            
+            if items is None:
+                if not self.quota_manager.try_consume():
+                    logger.warning(f"Daily search quota exhausted, skipping query: {query}")
+                    return []
+                
+                logger.debug(f"Searching: {query}")
+                
+                response = await call_with_retry(
+                    lambda: self._request_search_page(client, params), self.search_breaker
+                )
+                
+                if response.status_code != 200:
+                    logger.warning(f"Search API error: {response.status_code}")
+                    return []
+                
+                items = [
+                    {
+                        "title": item.get("title", ""),
+                        "link": item.get("link", ""),
+                        "snippet": item.get("snippet", "")
+                    }
+                    for item in response.json().get("items", [])
+                ]
+                self.search_cache.set(params, items)
+            else:
+                logger.debug(f"Search cache hit: {query}")
+            
+            return [
+                {
+                    "title": item.get("title", ""),
+                    "url": item.get("link", ""),
+                    "snippet": item.get("snippet", ""),
+                    "query": query,
+                    "query_id": query_id
+                }
+                for item in items
+            ]
+            
+        except (DependencyUnavailableError, CassetteMissError):
+            # 再生モードの記録漏れは「検索結果なし」として隠さず、収集の失敗にする
+            raise
+        except Exception as e:
+            logger.error(f"Search query failed for '{query}': {e}")
+            return []
+    
+    async def _request_search_page(self, client: httpx.AsyncClient,
+                                   params: Dict[str, Any]) -> httpx.Response:
+        """
+        Google Search APIを1回呼び出す
+        
+        Raises:
+            TransientError: 429/5xx・通信エラーなど再試行で回復が見込める場合
+        """
+        if self.cassette is not None:
+            client = self.cassette.wrap_http_client(client)
+        try:
+            response = await client.get(
+                GOOGLE_SEARCH_ENDPOINT,
+                params={"key": self.google_api_key, **params}
+            )
+        except httpx.TransportError as e:
+            raise TransientError(f"Search API transport error: {e}") from e
+        
+        if response.status_code in TRANSIENT_STATUS_CODES:
+            raise TransientError(
+                f"Search API error: {response.status_code}", response.status_code,
+                parse_retry_after(response.headers.get('Retry-After'))
+            )
+        return response
+    
+    def _prefilter_dated_results(self, search_results: List[Dict[str, Any]],
+                                 artist_name: str) -> List[Dict[str, Any]]:
+        """
+        タイトル・スニペット・本文に今日以降の日付表記を含む検索結果だけを残す
         
         Args:
             search_results: Google検索結果
             artist_name: アーティスト名
             
         Returns:
-            抽出されたスケジュール情報
+            日付表記を含む検索結果（元の順序を維持）
         """
-        try:
-            # 検索結果をテキストに整理
-            search_text = self._format_search_results_for_gemini(search_results)
-            
-            # プロンプトの生成（汎用版を使用）
-            prompt = UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE.format(
-                artist_name=artist_name,
-                genre=genre,
-                search_results=search_text
+        today = self._reference_date()
+        kept = [
+            result for result in search_results
+            if self.japanese_processor.has_plausible_future_date(
+                ' '.join(result.get(field) or '' for field in ('title', 'snippet', 'page_text')),
+                today, Config.DATE_PREFILTER_HORIZON_DAYS
             )
+        ]
+        logger.info(f"Date prefilter for {artist_name}: kept {len(kept)}/{len(search_results)} results")
+        return kept
+    
+    def _select_prompt_results(self, search_results: List[Dict[str, Any]],
+                               artist_name: str) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        信頼性と日付表記の密度で検索結果を評価し、トークン予算内で価値の高い順に選ぶ
+        
+        Args:
+            search_results: Google検索結果
+            artist_name: アーティスト名
+            
+        Returns:
+            (価値の高い順の採用結果, 採用結果の見積もりトークン数)
+        """
+        selected, tokens = select_results_within_budget(
+            search_results, Config.PROMPT_SEARCH_TOKEN_BUDGET,
+            lambda result: self._format_search_result(0, result)
+        )
+        logger.info(f"Prompt input for {artist_name}: {len(selected)}/{len(search_results)} results, "
+                    f"~{tokens} search tokens (budget {Config.PROMPT_SEARCH_TOKEN_BUDGET})")
+        return selected, tokens
+    
+    def _build_extraction_prompt(self, search_results: List[Dict[str, str]],
+                                 artist_name: str, genre: str = "K-POP") -> str:
+        """
+        Gemini用の抽出プロンプトを生成
+        
+        Args:
+            search_results: Google検索結果
+            artist_name: アーティスト名
+            genre: ジャンル
             
-            logger.debug(f"Sending extraction request to Gemini for {artist_name}")
+        Returns:
+            プロンプト文字列
+        """
+        # 検索結果をテキストに整理
+        search_text = self._format_search_results_for_gemini(search_results)
+        
+        # プロンプトの生成（汎用版を使用）
+        return UNIVERSAL_SCHEDULE_PROMPT_TEMPLATE.format(
+            artist_name=artist_name,
+            genre=genre,
+            search_results=search_text
+        )
+    
+    def _build_batch_extraction_prompt(self, jobs: List[Dict[str, Any]]) -> str:
+        """
+        複数アーティスト一括抽出用のプロンプトを生成
+        
+        Args:
+            jobs: 抽出対象のジョブ（先頭からA1, A2, ...のIDを割り当てる）
             
-            # Gemini APIで抽出
-            response = await asyncio.to_thread(
-                self.gemini_model.generate_content, prompt
+        Returns:
+            プロンプト文字列
+        """
+        sections = []
+        for index, job in enumerate(jobs, 1):
+            sections.append(
+                f"【ID: A{index} / アーティスト: {job['artist_name']} / ジャンル: {job['genre']}】\n"
+                f"{self._format_search_results_for_gemini(job.get('prompt_results') or job['search_results'])}"
             )
+        
+        return MULTI_ARTIST_SCHEDULE_PROMPT_TEMPLATE.format(
+            artist_sections='\n\n'.join(sections),
+            artist_ids=', '.join(f"A{index}" for index in range(1, len(jobs) + 1))
+        )
+    
+    async def _extract_batch_from_prompt(self, prompt: str,
+                                         jobs: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        一括抽出プロンプトをGemini APIに送信し、アーティストごとのイベントに分割
+        
+        Args:
+            prompt: 一括抽出プロンプト
+            jobs: プロンプトに含めたジョブ
             
-            # レスポンスからJSONを抽出
-            response_text = response.text.strip()
+        Returns:
+            ジョブの位置をキーとしたイベントリスト（解析できなかったアーティストは含まない）
+        """
+        section_ids = [f"A{index}" for index in range(1, len(jobs) + 1)]
+        try:
+            response_text = await self._generate_text(prompt, build_batch_response_schema(section_ids))
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch extraction failed for {len(jobs)} artists, falling back to single calls: {e}")
+            return {}
+        
+        extracted = parse_batch_events(response_text, section_ids)
+        if extracted is None:
+            logger.warning(f"Batch response unparseable for {len(jobs)} artists, falling back to single calls")
+            return {}
+        return {section_ids.index(section_id): events for section_id, events in extracted.items()}
+    
+    async def _extract_from_prompt(self, prompt: str, artist_name: str,
+                                   start_tier: int = 0) -> Optional[List[Dict[str, Any]]]:
+        """
+        生成済みプロンプトをGemini APIに送信してイベントを抽出
+        安価なモデルから順に試し、結果が不確かな場合のみ上位モデルで再抽出する
+        
+        Args:
+            prompt: 抽出プロンプト
+            artist_name: アーティスト名
+            start_tier: 最初に試すモデルの階層（一括抽出からの昇格時は1）
             
-            # JSONの開始と終了を探す
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+        Returns:
+            抽出されたスケジュール情報（API呼び出し・解析に失敗した場合None）
             
-            if json_start >= 0 and json_end > json_start:
-                json_text = response_text[json_start:json_end]
-                
-                try:
-                    extracted_data = json.loads(json_text)
-                    events = extracted_data.get('events', [])
-                    
-                    logger.info(f"Gemini extraction completed: {len(events)} events for {artist_name}")
-                    return events
-                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse Gemini JSON response: {e}")
-                    logger.debug(f"Raw response: {response_text}")
-                    return []
-            else:
-                logger.warning("No valid JSON found in Gemini response")
-                logger.debug(f"Raw response: {response_text}")
-                return []
-                
-        except Exception as e:
-            logger.error(f"Gemini extraction failed for {artist_name}: {e}")
-            return []
+        Raises:
+            DependencyUnavailableError: Gemini APIが利用できず、下位モデルの結果もない場合
+        """
+        best = None
+        last_tier = len(self.gemini_models) - 1
+        # 一括抽出からの昇格は一括抽出の側で記録済み
+        if start_tier == 0:
+            self.cascade_stats.record_request()
+        
+        for tier in range(min(start_tier, last_tier), last_tier + 1):
+            model_name = self.gemini_models[tier][0]
+            try:
+                events = await self._extract_with_model(prompt, artist_name, tier)
+            except DependencyUnavailableError as e:
+                # 下位モデルの結果があればそれを使い、なければ「イベントなし」と区別できるよう送出
+                logger.error(f"Gemini unavailable for {artist_name} ({model_name}): {e}")
+                if best is None:
+                    raise
+                return best
+            except asyncio.TimeoutError:
+                logger.error(f"Gemini extraction timed out for {artist_name} ({model_name}) "
+                             f"after {Config.GEMINI_REQUEST_TIMEOUT}s")
+                return best
+            except CassetteMissError:
+                raise
+            except Exception as e:
+                logger.error(f"Gemini extraction failed for {artist_name} ({model_name}): {e}")
+                return best
+            
+            if events is not None:
+                best = events
+            reason = find_escalation_reason(events)
+            if reason is None or tier == last_tier:
+                return best
+            self.cascade_stats.record_escalation(model_name, reason)
+        
+        return best
+    
+    async def _extract_with_model(self, prompt: str, artist_name: str,
+                                  tier: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        指定階層のモデルで抽出（同一モデル・同一プロンプトの応答は抽出キャッシュから再利用）
+        
+        Args:
+            prompt: 抽出プロンプト
+            artist_name: アーティスト名
+            tier: モデルの階層
+            
+        Returns:
+            抽出されたスケジュール情報（解析に失敗した場合None）
+            
+        Raises:
+            asyncio.TimeoutError: 応答がタイムアウトした場合
+        """
+        model_name = self.gemini_models[tier][0]
+        if self.extraction_cache is not None:
+            cached_text = self.extraction_cache.get(model_name, prompt)
+            if cached_text is not None:
+                logger.info(f"Extraction cache hit for {artist_name} ({model_name})")
+                return self._parse_gemini_events(cached_text, artist_name)
+        
+        logger.debug(f"Sending extraction request to {model_name} for {artist_name}")
+        response_text = await self._generate_text(prompt, EVENTS_RESPONSE_SCHEMA, tier)
+        
+        events = self._parse_gemini_events(response_text, artist_name)
+        # 解析できた応答のみキャッシュする
+        if events is not None and self.extraction_cache is not None:
+            self.extraction_cache.set(model_name, prompt, response_text)
+        return events
+    
+    async def _generate_text(self, prompt: str, response_schema: Dict[str, Any], tier: int = 0) -> str:
+        """
+        Gemini APIの非同期APIでプロンプトを送信（タイムアウト時はリクエストをキャンセル）
+        スキーマ指定のJSON出力モードで呼び出し、階層ごとのレイテンシと見積もりトークン数を記録する
+        
+        Args:
+            prompt: プロンプト
+            response_schema: 応答のJSONスキーマ
+            tier: 使用するモデルの階層
+            
+        Returns:
+            応答テキスト
+            
+        Raises:
+            asyncio.TimeoutError: GEMINI_REQUEST_TIMEOUT以内に応答がない場合
+            DependencyUnavailableError: 429/5xxで再試行を使い切った、またはサーキットが開いている場合
+        """
+        model_name, model = self.gemini_models[tier]
+        timeout = Config.GEMINI_REQUEST_TIMEOUT
+        started = time.monotonic()
+        response = await call_with_retry(
+            lambda: asyncio.wait_for(
+                model.generate_content_async(
+                    prompt,
+                    generation_config=json_generation_config(response_schema),
+                    request_options={'timeout': timeout}
+                ),
+                timeout=timeout
+            ),
+            self.gemini_breaker
+        )
+        response_text = response.text.strip()
+        self.cascade_stats.record_call(
+            model_name, time.monotonic() - started, estimate_tokens(prompt), estimate_tokens(response_text)
+        )
+        return response_text
+    
+    def _parse_gemini_events(self, response_text: str, artist_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gemini応答テキストからイベントリストを取り出す
+        
+        Args:
+            response_text: Geminiの応答テキスト
+            artist_name: アーティスト名
+            
+        Returns:
+            イベントリスト（解析に失敗した場合None）
+        """
+        events = parse_events(response_text)
+        if events is None:
+            logger.warning(f"Failed to parse Gemini JSON response for {artist_name}")
+            logger.debug(f"Raw response: {response_text}")
+            return None
+        
+        logger.info(f"Gemini extraction completed: {len(events)} events for {artist_name}")
+        return events
     
     def _format_search_results_for_gemini(self, search_results: List[Dict[str, str]]) -> str:
         """
@@ -321,22 +1582,23 @@ class ScheduleCollector:
         Returns:
             整理されたテキスト
         """
-        formatted_text = ""
-        
-        for i, result in enumerate(search_results, 1):
-            title = result.get("title", "")
-            url = result.get("url", "")
-            snippet = result.get("snippet", "")
-            
-            formatted_text += f"""
-【検索結果 {i}】
-タイトル: {title}
-URL: {url}
-概要: {snippet}
-
+        return "\n".join(
+            self._format_search_result(i, result) for i, result in enumerate(search_results, 1)
+        ).strip()
+    
+    @staticmethod
+    def _format_search_result(index: int, result: Dict[str, str]) -> str:
+        """検索結果1件をGemini用のテキスト形式に整理"""
+        formatted_text = f"""
+【検索結果 {index}】
+タイトル: {result.get("title", "")}
+URL: {result.get("url", "")}
+概要: {result.get("snippet", "")}
 """
-        
-        return formatted_text.strip()
+        page_text = result.get("page_text", "")
+        if page_text:
+            formatted_text += f"本文抜粋:\n{page_text}\n"
+        return formatted_text
     
     def _validate_and_normalize_events(self, events: List[Dict[str, Any]], 
                                      artist_name: str) -> List[Dict[str, Any]]:
@@ -351,29 +1613,28 @@ URL: {url}
             バリデーション済みイベントリスト
         """
         validated_events = []
+        # 日付・時刻はまとめて正規化（同じ表記は1度だけ解析）
+        today = self._reference_date()
+        normalized_dates = self.japanese_processor.normalize_dates([event.get('date', '') for event in events], today)
+        normalized_times = self.japanese_processor.normalize_times([event.get('time', '') for event in events])
         
-        for event in events:
+        for event, normalized_date, normalized_time in zip(events, normalized_dates, normalized_times):
             try:
                 # 必須フィールドのチェック
                 if not event.get('date') or not event.get('title'):
                     continue
                 
-                # 日本語日付の正規化
-                normalized_date = self.japanese_processor.normalize_date(event.get('date', ''))
                 if not normalized_date:
                     continue
                 
                 # 過去の日付をスキップ
                 try:
                     event_date = datetime.strptime(normalized_date, '%Y-%m-%d').date()
-                    if event_date < datetime.now().date():
+                    if event_date < today:
                         continue
                 except ValueError:
                     continue
                 
-                # 時刻の正規化
-                normalized_time = self.japanese_processor.normalize_time(event.get('time', ''))
-                
                 # アーティスト名の確認
                 event_artist = event.get('artist', artist_name)
                 if artist_name.lower() not in event_artist.lower():
@@ -412,6 +1673,28 @@ URL: {url}
         logger.info(f"Validation completed: {len(validated_events)} valid events")
         return validated_events
     
+    def _get_firestore_client(self) -> Optional[FirestoreClient]:
+        """
+        Firestoreクライアントを取得（未接続の場合はFIRESTORE_RECONNECT_INTERVAL秒ごとに再接続を試みる）
+        
+        Returns:
+            Firestoreクライアント、接続できない場合None
+        """
+        if self.firestore_client is not None or self.firestore_factory is None:
+            return self.firestore_client
+        
+        now = time.monotonic()
+        if now < self._firestore_retry_at:
+            return None
+        
+        try:
+            self.firestore_client = self.firestore_factory()
+            logger.info("Firestore client reconnected")
+        except Exception as e:
+            self._firestore_retry_at = now + Config.FIRESTORE_RECONNECT_INTERVAL
+            logger.warning(f"Firestore client reconnection failed: {e}")
+        return self.firestore_client
+    
     async def save_schedules_to_firestore(self, events: List[Dict[str, Any]], 
                                         artist_name: str) -> Dict[str, Any]:
         """
@@ -424,7 +1707,7 @@ URL: {url}
         Returns:
             保存結果
         """
-        if not self.firestore_client:
+        if not self._get_firestore_client():
             return {
                 'success': False,
                 'message': 'Firestoreクライアントが利用できません',
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import snscrape.modules.twitter as sntwitter
 from app.config import get_message
+from app.utils.japanese import JapaneseTextProcessor
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
@@ -171,21 +172,7 @@ class TwitterScraper:
     
     def _contains_date_pattern(self, text: str) -> bool:
         """テキストに日付パターンが含まれているかチェック"""
-        import re
-        
-        date_patterns = [
-            r'\d{4}年\d{1,2}月\d{1,2}日',  # 2024年1月15日
-            r'\d{1,2}/\d{1,2}',            # 1/15
-            r'\d{1,2}月\d{1,2}日',         # 1月15日
-            r'\d{1,2}:\d{2}',              # 19:30
-            r'\d{1,2}時\d{1,2}分?',        # 19時30分
-        ]
-        
-        for pattern in date_patterns:
-            if re.search(pattern, text):
-                return True
-        
-        return False
+        return JapaneseTextProcessor.contains_date_or_time(text)
 
 def get_idol_tweets(username: str, max_tweets: int = 10) -> List[Dict[str, Any]]:
     """
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Google Custom Search レスポンスキャッシュ
+プロセス内LRU + SQLite永続化の2層キャッシュ
+"""
+
+import hashlib
+import json
+import logging
+from typing import List, Dict, Any, Optional
+
+from app.config import Config
+from app.services.sqlite_store import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# キャッシュキーに使用する検索パラメータ（APIキーは含めない）
+CACHE_KEY_FIELDS = ("q", "cx", "lr", "num", "dateRestrict", "start")
+
+
+class SearchCache(TTLCache):
+    """検索レスポンスの2層TTLキャッシュ"""
+
+    store_name = 'Search cache'
+    filename = 'search_cache.sqlite3'
+    table = 'search_cache'
+    value_column = 'items'
+    schema = (
+        "CREATE TABLE IF NOT EXISTS search_cache ("
+        "key TEXT PRIMARY KEY, items TEXT NOT NULL, expires_at REAL NOT NULL)",
+    )
+
+    def __init__(self, db_path: Optional[str] = None, ttl: Optional[float] = None,
+                 negative_ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合は設定値、空文字の場合はメモリのみ）
+            ttl: 結果ありレスポンスの有効期間（秒）
+            negative_ttl: 結果なしレスポンスの有効期間（秒）
+            max_entries: プロセス内LRUの最大件数
+        """
+        super().__init__(
+            db_path,
+            ttl=Config.SEARCH_CACHE_TTL if ttl is None else ttl,
+            max_entries=Config.SEARCH_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        self.negative_ttl = Config.SEARCH_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        self._stats['negative_hits'] = 0
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """検索パラメータからキャッシュキーを生成"""
+        key_data = json.dumps([params.get(field) for field in CACHE_KEY_FIELDS], ensure_ascii=False)
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def get(self, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        キャッシュから検索結果を取得
+
+        Args:
+            params: 検索パラメータ
+
+        Returns:
+            キャッシュされた検索結果（itemsのリスト）、なければNone
+        """
+        return self._lookup(self.make_key(params))
+
+    def set(self, params: Dict[str, Any], items: List[Dict[str, Any]]) -> None:
+        """
+        検索結果をキャッシュに保存（空の結果は短いTTLで保存）
+
+        Args:
+            params: 検索パラメータ
+            items: 検索APIのitems
+        """
+        self._store(self.make_key(params), items, self.ttl if items else self.negative_ttl)
+
+    def _encode(self, items: List[Dict[str, Any]]) -> str:
+        return json.dumps(items, ensure_ascii=False)
+
+    def _decode(self, stored: str) -> List[Dict[str, Any]]:
+        return json.loads(stored)
+
+    def _record_hit(self, tier: str, items: List[Dict[str, Any]]) -> None:
+        """ヒット件数を記録（結果なしのヒットも数える）"""
+        super()._record_hit(tier, items)
+        if not items:
+            self._stats['negative_hits'] += 1
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """プロセス共有の検索キャッシュを取得"""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache()
+    return _search_cache
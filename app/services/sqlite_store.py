@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+SQLiteに状態を保存するストア・キャッシュの基底クラス
+データベースの準備（ディレクトリ作成・テーブル作成・開けない場合のメモリ動作）と、
+プロセス内LRU + SQLite永続化の2層TTLキャッシュの読み書き・統計・期限切れ削除をまとめる
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStore:
+    """SQLiteに状態を保存するストアの基底クラス（サブクラスはstore_name・filename・schemaを定義する）"""
+
+    store_name = 'Store'
+    filename = 'store.sqlite3'
+    schema: Tuple[str, ...] = ()
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合はCACHE_DIR下のfilename、空文字の場合はメモリのみ）
+        """
+        self._lock = threading.Lock()
+
+        if db_path is None:
+            db_path = os.path.join(Config.CACHE_DIR, self.filename)
+        self._conn = self._connect(db_path)
+
+    def _connect(self, db_path: str) -> Optional[sqlite3.Connection]:
+        """データベースに接続（空文字の場合はメモリ上のDB）"""
+        return self._open_database(db_path or ':memory:')
+
+    def _open_database(self, db_path: str, memory_fallback: bool = True) -> Optional[sqlite3.Connection]:
+        """
+        SQLiteデータベースを開いてテーブルを作成
+
+        Args:
+            db_path: SQLiteファイルのパス
+            memory_fallback: 開けない場合にメモリ上のDBを使うか
+
+        Returns:
+            接続（開けずmemory_fallbackがFalseの場合None、呼び出し側はメモリのみで動作する）
+        """
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            for statement in self.schema:
+                conn.execute(statement)
+            self._prepare_database(conn)
+            conn.commit()
+            return conn
+        except Exception as e:
+            logger.warning(f"{self.store_name} database unavailable, using memory only: {e}")
+            if memory_fallback and db_path != ':memory:':
+                return self._open_database(':memory:', memory_fallback=False)
+            return None
+
+    def _prepare_database(self, conn: sqlite3.Connection) -> None:
+        """テーブル作成後の準備（古いエントリの削除など、必要なサブクラスで上書き）"""
+
+
+class TTLCache(SQLiteStore):
+    """
+    プロセス内LRU + SQLite永続化の2層TTLキャッシュの基底クラス
+    サブクラスはテーブル（key・value_column・expires_atの列を持つ）を定義し、キーの生成と公開APIを実装する
+    """
+
+    table = 'cache'
+    value_column = 'value'
+
+    def __init__(self, db_path: Optional[str], ttl: float, max_entries: int):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス（Noneの場合はCACHE_DIR下のfilename、空文字の場合はメモリのみ）
+            ttl: エントリの有効期間（秒）
+            max_entries: プロセス内LRUの最大件数
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0
+        }
+        super().__init__(db_path)
+
+    def _connect(self, db_path: str) -> Optional[sqlite3.Connection]:
+        """データベースに接続（空文字・開けない場合はNoneでプロセス内LRUのみ）"""
+        return self._open_database(db_path, memory_fallback=False) if db_path else None
+
+    def _encode(self, value: Any) -> str:
+        """値をSQLiteに保存する文字列にする"""
+        return value
+
+    def _decode(self, stored: str) -> Any:
+        """SQLiteに保存した文字列を値に戻す"""
+        return stored
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        """
+        プロセス内LRU、SQLiteの順に有効期限内の値を探す
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            キャッシュされた値、なければNone
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._record_hit('memory_hits', entry[1])
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        f"SELECT {self.value_column}, expires_at FROM {self.table} WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"{self.store_name} read failed: {e}")
+                    row = None
+
+                if row and row[1] > now:
+                    value = self._decode(row[0])
+                    self._remember(key, row[1], value)
+                    self._record_hit('disk_hits', value)
+                    return value
+
+            self._stats['misses'] += 1
+            return None
+
+    def _store(self, key: str, value: Any, ttl: float, **columns: Any) -> None:
+        """
+        値を両方の層に保存（TTLが0以下の場合は保存しない）
+
+        Args:
+            key: キャッシュキー
+            value: 値
+            ttl: 有効期間（秒）
+            **columns: テーブルのその他の列の値
+        """
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        row = {'key': key, self.value_column: self._encode(value), **columns, 'expires_at': expires_at}
+
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats['stores'] += 1
+
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO {self.table} ({', '.join(row)}) "
+                        f"VALUES ({', '.join('?' for _ in row)})",
+                        tuple(row.values())
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"{self.store_name} write failed: {e}")
+
+    def purge_expired(self) -> int:
+        """期限切れエントリを削除し、削除件数を返す"""
+        now = time.time()
+        removed = 0
+
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+                    self._conn.commit()
+                    removed = cursor.rowcount
+                except sqlite3.Error as e:
+                    logger.warning(f"{self.store_name} purge failed: {e}")
+
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット・ミス件数などの統計を取得"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        stats['persistent'] = self._conn is not None
+        return stats
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        """プロセス内LRUにエントリを追加"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _record_hit(self, tier: str, value: Any) -> None:
+        """ヒット件数を記録"""
+        self._stats[tier] += 1
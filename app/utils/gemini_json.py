@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Gemini構造化出力ユーティリティ
+EventDataから生成したレスポンススキーマと、全抽出経路で共通のJSONパーサー
+"""
+
+import json
+import logging
+import re
+from typing import List, Dict, Any, Optional
+
+from app.models.events import EventData
+
+logger = logging.getLogger(__name__)
+
+# Pythonの型からレスポンススキーマの型への対応
+_SCHEMA_TYPES = {str: 'string', float: 'number', int: 'integer', bool: 'boolean'}
+
+_JSON_FENCE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+
+def build_event_schema() -> Dict[str, Any]:
+    """
+    EventDataのフィールドからイベント1件分のレスポンススキーマを生成
+
+    Returns:
+        OpenAPI形式のオブジェクトスキーマ
+    """
+    properties = {}
+    required = []
+    for name, field in EventData.model_fields.items():
+        properties[name] = {
+            'type': _SCHEMA_TYPES.get(field.annotation, 'string'),
+            'description': field.description or name
+        }
+        if field.is_required():
+            required.append(name)
+    return {'type': 'object', 'properties': properties, 'required': required}
+
+
+EVENT_SCHEMA = build_event_schema()
+
+# {"events": [...]} 形式の応答スキーマ
+EVENTS_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {'events': {'type': 'array', 'items': EVENT_SCHEMA}},
+    'required': ['events']
+}
+
+
+def build_batch_response_schema(section_ids: List[str]) -> Dict[str, Any]:
+    """
+    複数アーティスト一括抽出用の応答スキーマを生成
+
+    Args:
+        section_ids: プロンプト内のセクションID（A1, A2, ...）
+
+    Returns:
+        {"artists": {ID: {"events": [...]}}} 形式のスキーマ
+    """
+    return {
+        'type': 'object',
+        'properties': {
+            'artists': {
+                'type': 'object',
+                'properties': {section_id: EVENTS_RESPONSE_SCHEMA for section_id in section_ids},
+                'required': list(section_ids)
+            }
+        },
+        'required': ['artists']
+    }
+
+
+def json_generation_config(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """スキーマ指定のJSON出力モードを有効にするgeneration_config"""
+    return {'response_mime_type': 'application/json', 'response_schema': schema}
+
+
+def loads_response(response_text: str) -> Optional[Any]:
+    """
+    Gemini応答テキストをJSONとして読み込む
+    構造化出力の応答はそのまま読み込み、それ以外（キャッシュ済みの旧形式応答など）は
+    コードブロック・前後の文章を取り除いてから読み込む
+
+    Args:
+        response_text: Geminiの応答テキスト
+
+    Returns:
+        読み込んだ値（JSONが見つからない場合None）
+    """
+    text = (response_text or '').strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    fenced = _JSON_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    start = text.find('{')
+    end = text.rfind('}') + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end])
+    except json.JSONDecodeError as e:
+        logger.debug(f"JSON parse error: {e}")
+        return None
+
+
+def normalize_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    イベント1件の型をEventDataのフィールド型に揃える
+    文字列フィールドのNoneは空文字に、数値に変換できないconfidenceは除去する
+    """
+    normalized = dict(event)
+    for name, field in EventData.model_fields.items():
+        if name not in normalized:
+            continue
+        value = normalized[name]
+        if field.annotation is str:
+            normalized[name] = '' if value is None else str(value).strip()
+        elif field.annotation is float:
+            try:
+                normalized[name] = float(value)
+            except (TypeError, ValueError):
+                del normalized[name]
+    return normalized
+
+
+def parse_events(response_text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    {"events": [...]} 形式の応答からイベントリストを取り出す
+
+    Args:
+        response_text: Geminiの応答テキスト
+
+    Returns:
+        正規化済みイベントのリスト（応答を解析できない場合None）
+    """
+    data = loads_response(response_text)
+    events = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(events, list):
+        return None
+    return [normalize_event(event) for event in events if isinstance(event, dict)]
+
+
+def parse_batch_events(response_text: str, section_ids: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    {"artists": {ID: {"events": [...]}}} 形式の応答をセクションごとのイベントリストに分割
+
+    Args:
+        response_text: Geminiの応答テキスト
+        section_ids: プロンプト内のセクションID
+
+    Returns:
+        セクションIDをキーとしたイベントリスト（応答に含まれないIDは含まない、解析できない場合None）
+    """
+    data = loads_response(response_text)
+    artists = data.get('artists') if isinstance(data, dict) else None
+    if not isinstance(artists, dict):
+        return None
+
+    extracted = {}
+    for section_id in section_ids:
+        entry = artists.get(section_id)
+        events = entry.get('events') if isinstance(entry, dict) else None
+        if isinstance(events, list):
+            extracted[section_id] = [normalize_event(event) for event in events if isinstance(event, dict)]
+    return extracted
+
+
+class IncrementalEventParser:
+    """
+    ストリーミング応答から {"events": [...]} のイベントを完成した順に取り出すパーサー
+    文字列・エスケープを追跡しながら括弧の対応を数え、events配列直下のオブジェクトが閉じた時点で解析する
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        # 開いているコンテナ（'{' または '['）と、そのコンテナを値に持つキー
+        self._stack: List[tuple] = []
+        self._event_start = -1
+        self._event_depth = -1
+        self.emitted = 0
+
+    @property
+    def text(self) -> str:
+        """これまでに受け取った応答テキスト全体"""
+        return self._buffer
+
+    def _in_events_array(self) -> bool:
+        if not self._stack or self._stack[-1][0] != '[':
+            return False
+        # {"events": [...]} の配列、または旧形式のトップレベル配列
+        return self._stack[-1][1] == 'events' or len(self._stack) == 1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        応答の断片を追加し、新たに完成したイベントを取り出す
+
+        Args:
+            chunk: 応答テキストの断片
+
+        Returns:
+            この断片で完成したイベントのリスト（正規化済み）
+        """
+        self._buffer += chunk
+        completed = []
+        text = self._buffer
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    try:
+                        self._last_string = json.loads(text[self._string_start:index + 1])
+                    except json.JSONDecodeError:
+                        self._last_string = None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ':':
+                self._pending_key = self._last_string
+            elif char == ',':
+                self._pending_key = None
+            elif char in '{[':
+                if char == '{' and self._event_start < 0 and self._in_events_array():
+                    self._event_start = index
+                    self._event_depth = len(self._stack)
+                self._stack.append((char, self._pending_key))
+                self._pending_key = None
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if char == '}' and self._event_start >= 0 and len(self._stack) == self._event_depth:
+                    event = self._decode_event(text[self._event_start:index + 1])
+                    self._event_start = -1
+                    if event is not None:
+                        completed.append(event)
+        self._pos = len(text)
+        self.emitted += len(completed)
+        return completed
+
+    @staticmethod
+    def _decode_event(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            event = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.debug(f"Incomplete event skipped: {e}")
+            return None
+        return normalize_event(event) if isinstance(event, dict) else None
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        応答の終了時に、逐次解析で取り出せなかったイベントを応答全体から補完
+
+        Returns:
+            未送出のイベントのリスト
+        """
+        events = parse_events(self._buffer) or []
+        remaining = events[self.emitted:]
+        self.emitted += len(remaining)
+        return remaining
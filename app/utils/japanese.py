@@ -5,8 +5,252 @@
 
 import re
 import unicodedata
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+# 日付候補の検出パターン（NFKC正規化後のテキストに適用）
+_YM_PATTERN = re.compile(r'(?<!\d)(\d{4})\s*年\s*(\d{1,2})\s*月(?!\s*\d)')
+_WEEKDAY_PATTERN = re.compile(r'\(\s*(?:[月火水木金土日](?:・祝|祝)?|祝|(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\.?)\s*\)', re.IGNORECASE)
+
+# 日付表記の文法（NFKC正規化後のテキストに適用）
+# 和暦の元年の前年（令和1年 = 2019年）
+_ERA_OFFSETS = {'令和': 2018, '平成': 1988}
+_WEEKDAY_NUMBERS = {'月': 0, '火': 1, '水': 2, '木': 3, '金': 4, '土': 5, '日': 6,
+                    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+# 年のない日付が基準日よりこの日数以上前なら翌年とみなす（直近の過去の日付は同じ年のまま）
+YEAR_ROLLOVER_GRACE_DAYS = 60
+
+# 曜日表記: (土)、（土・祝）、[SAT]、(Sat.)
+_WEEKDAY_MARK = (r'\s*[(\[]\s*(?:({weekday})\.?(?:\s*・?\s*祝)?|祝)\s*[)\]]')
+_WEEKDAY_TOKENS = r'[月火水木金土日]|mon|tue|wed|thu|fri|sat|sun'
+_WEEKDAY_SUFFIX = '(?:' + _WEEKDAY_MARK.format(weekday='?P<weekday>' + _WEEKDAY_TOKENS) + ')?'
+_DATE_EXPRESSION = re.compile(
+    # 先頭文字の先読みで、日付が始まり得ない位置を選択パターンを試さずに読み飛ばす
+    r'(?=[\d令平])(?<![\d/.])(?:'
+    # 2025年3月1日、2025/3/1、2025.03.01、2025-03-01、令和7年3月1日
+    r'(?:(?P<year>\d{4})\s*[年./-]|(?P<era>令和|平成)\s*(?P<era_year>\d{1,2}|元)\s*年)'
+    r'\s*(?P<month>\d{1,2})\s*[月./-]\s*(?P<day>\d{1,2})(?!\d)\s*日?'
+    r'|(?P<md_month>\d{1,2})\s*月\s*(?P<md_day>\d{1,2})\s*日'  # 3月1日
+    # 3/1（1/2サイズ・第3/4半期のような分数と区別するため、直後が曜日表記・日・空白・区切り・末尾のものだけ）
+    r'|(?P<slash_month>\d{1,2})/(?P<slash_day>\d{1,2})(?=\s|$|日|から|[~〜\-–—、,。)」』|｜]|'
+    + _WEEKDAY_MARK.format(weekday=_WEEKDAY_TOKENS) + r')'
+    # 3.1(土)（年のないドット区切りは小数と区別するため曜日表記があるものだけ）
+    r'|(?P<dot_month>\d{1,2})\.(?P<dot_day>\d{1,2})(?=' + _WEEKDAY_MARK.format(weekday=_WEEKDAY_TOKENS) + r')'
+    r')' + _WEEKDAY_SUFFIX,
+    re.IGNORECASE
+)
+# 期間の区切り（〜・~・-・から）と、終了日が日だけの表記（1月15日〜17日、3/1(土)〜3(月)）
+_RANGE_SEPARATOR = re.compile(r'\s*(?:[~〜\-–—]|から)\s*')
+# 「3/1 - 20時」「3/1〜20:00」の時刻は終了日として読まない
+_RANGE_DAY = re.compile(r'(?P<day>\d{1,2})(?![\d/.])(?!\s*[:時分])\s*日?' + _WEEKDAY_SUFFIX, re.IGNORECASE)
+# 日だけの列挙（11月15日(土)・16日(日)）。「4日間」「2日目」や日も曜日表記もない数字は日付として読まない
+_LISTED_DAY = re.compile(
+    r'\s*[・、,]\s*(?P<day>\d{1,2})(?![\d/.])(?=\s*[日(\[])\s*(?P<day_mark>日(?![間目後前以]))?' + _WEEKDAY_SUFFIX,
+    re.IGNORECASE
+)
+# NFKC正規化で数字・区切り・括弧・曜日の英字・年月日の漢字に変わり得る互換文字
+# （含まないテキストは正規化しなくても日付の読み取り結果が変わらない）
+_DATE_COMPAT_CHARS = ('\u00b2\u00b3\u00b9\u2070-\u209f\u2150-\u24ff\u2e80-\u2fdf\u3200-\u33ff'
+                      '\uf900-\ufaff\ufe30-\ufe6f\uff08-\uff1a\uff21-\uff3d\uff41-\uff65'
+                      '\U0001d400-\U0001d7ff\U0001f100-\U0001f1ff')
+_NEEDS_NFKC = re.compile(f'[{_DATE_COMPAT_CHARS}]')
+
+
+# 時刻表記（19:30・19時30分・19時）を1つの選択パターンで読む
+_TIME_PATTERN = re.compile(r'(?<!\d)(\d{1,2})(?::(\d{2})(?!\d)|時(?:(\d{1,2})分?)?)')
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_COMPACT_DATE = re.compile(r'^(\d{4})(\d{2})(\d{2})$')  # 20250120
+_ISO_TIME = re.compile(r'^\d{2}:\d{2}$')
+_DATE_OR_TIME_PATTERN = re.compile(r'\d{1,2}/\d{1,2}|\d{1,2}月\d{1,2}日|\d{1,2}:\d{2}|\d{1,2}時\d{1,2}')
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    """存在する日付のみdateに変換"""
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _infer_year(month: int, day: int, reference: date, weekday: Optional[int] = None) -> Optional[date]:
+    """
+    年のない月日に年を補う
+    基準日の年とし、基準日よりYEAR_ROLLOVER_GRACE_DAYS日以上前になる場合は翌年とみなす
+    曜日の指定があり合わない場合は、前後の年で曜日が一致する方を採用する
+    （どの年も曜日と合わない場合は、過去の記事の日付などとみなしNone）
+    """
+    found = _safe_date(reference.year, month, day)
+    if found is None or found < reference - timedelta(days=YEAR_ROLLOVER_GRACE_DAYS):
+        # 2月29日は次の閏年まで進める
+        for year in range(reference.year + 1, reference.year + 5):
+            found = _safe_date(year, month, day)
+            if found:
+                break
+    if found is None or weekday is None or found.weekday() == weekday:
+        return found
+    for year in (found.year + 1, found.year - 1):
+        alternative = _safe_date(year, month, day)
+        if alternative and alternative.weekday() == weekday:
+            return alternative
+    return None
+
+
+def _resolve_date(match: 're.Match', reference: Optional[date]) -> Tuple[Optional[date], bool]:
+    """日付表記のマッチを日付にする（戻り値の2つ目は年が明示されていたか、基準日がNoneなら今日）"""
+    year, era = match.group('year', 'era')
+    if year or era:
+        if era:
+            era_year = match.group('era_year')
+            year = _ERA_OFFSETS[era] + (1 if era_year == '元' else int(era_year))
+        return _safe_date(int(year), int(match.group('month')), int(match.group('day'))), True
+    md_month, md_day, slash_month, slash_day, dot_month, dot_day, weekday = match.group(
+        'md_month', 'md_day', 'slash_month', 'slash_day', 'dot_month', 'dot_day', 'weekday'
+    )
+    month, day = int(md_month or slash_month or dot_month), int(md_day or slash_day or dot_day)
+    weekday_number = _WEEKDAY_NUMBERS[weekday.lower()] if weekday else None
+    return _infer_year(month, day, reference or date.today(), weekday_number), False
+
+
+def _day_after(start: date, day: int) -> Optional[date]:
+    """開始日以降で最初の「day日」（開始日の月で過ぎていれば翌月）"""
+    found = _safe_date(start.year, start.month, day)
+    if found is None or found < start:
+        found = _safe_date(start.year + start.month // 12, start.month % 12 + 1, day)
+    return found
+
+
+def _resolve_range_end(text: str, position: int, start: date) -> Tuple[Optional[date], int]:
+    """期間の区切りの後ろの終了日を読む（開始日より前になる場合は翌月・翌年とみなす）"""
+    match = _DATE_EXPRESSION.match(text, position)
+    if match:
+        end, explicit = _resolve_date(match, start)
+        if end and not explicit and end < start:
+            end = _safe_date(start.year + 1, end.month, end.day)
+        return end, match.end()
+    match = _RANGE_DAY.match(text, position)
+    if not match:
+        return None, position
+    return _day_after(start, int(match.group('day'))), match.end()
+
+
+def _parse_date_expressions(text: str, today: Optional[date],
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    NFKC正規化済みテキストの日付表記を出現順に読む（年のない日付は直前の年付き日付か今日を基準にする）
+    日だけの列挙（11月15日・16日）は直前の日付と同じ月の別の日付として読む
+    limit件読んだ時点で打ち切る（weekdayは開始日の曜日表記、なければNone、todayがNoneなら今日）
+    """
+    expressions = []
+    reference = today
+    position = 0
+    while limit is None or len(expressions) < limit:
+        match = _DATE_EXPRESSION.search(text, position)
+        if match is None:
+            break
+        position = match.end()
+        start, explicit = _resolve_date(match, reference)
+        if start is None:
+            continue
+        if explicit:
+            reference = start
+        
+        end = None
+        separator = _RANGE_SEPARATOR.match(text, position)
+        if separator:
+            end, end_position = _resolve_range_end(text, separator.end(), start)
+            if end:
+                position = end_position
+        expressions.append({
+            'start': start,
+            'end': end,
+            'explicit_year': explicit,
+            'weekday': _WEEKDAY_NUMBERS[match.group('weekday').lower()] if match.group('weekday') else None,
+            'span': (match.start(), position),
+            'text': text[match.start():position]
+        })
+        
+        while limit is None or len(expressions) < limit:
+            listed = _LISTED_DAY.match(text, position)
+            if listed is None:
+                break
+            weekday = _WEEKDAY_NUMBERS[listed.group('weekday').lower()] if listed.group('weekday') else None
+            if listed.group('day_mark') is None and weekday is None:
+                break
+            previous = expressions[-1]
+            day = _day_after(previous['end'] or previous['start'], int(listed.group('day')))
+            if day is None or (weekday is not None and day.weekday() != weekday):
+                break
+            position = listed.end()
+            expressions.append({
+                'start': day,
+                'end': None,
+                'explicit_year': previous['explicit_year'],
+                'weekday': weekday,
+                'span': (listed.start('day'), position),
+                'text': text[listed.start('day'):position]
+            })
+    return expressions
+
+
+def _nfkc(text: str) -> str:
+    """NFKC正規化（正規化済みのテキストはそのまま返す）"""
+    return text if unicodedata.is_normalized('NFKC', text) else unicodedata.normalize('NFKC', text)
+
+
+def _fold_for_dates(text: str) -> str:
+    """日付の値だけを読む用途のNFKC正規化（結果に関わる互換文字がなければ正規化を省く）"""
+    if unicodedata.is_normalized('NFKC', text) or not _NEEDS_NFKC.search(text):
+        return text
+    return unicodedata.normalize('NFKC', text)
+
+
+def _first_date(text: str, today: Optional[date]) -> Optional[date]:
+    """最初に読める日付（期間は開始日、年のない日付がなければ今日を求めない）"""
+    for match in _DATE_EXPRESSION.finditer(_fold_for_dates(text)):
+        found, _ = _resolve_date(match, today)
+        if found:
+            return found
+    return None
+
+
+def _format_time(match: 're.Match') -> Optional[str]:
+    """時刻表記のマッチをHH:MMにする（深夜帯の25:00は残し、存在しない時刻はNone）"""
+    hour, minute = match.group(1), match.group(2) or match.group(3) or '0'
+    if int(hour) > 29 or int(minute) > 59:
+        return None
+    return f"{hour.zfill(2)}:{minute.zfill(2)}"
+
+
+def _normalize_date(date_str: str, today: Optional[date]) -> Optional[str]:
+    """日付文字列をYYYY-MM-DDに正規化（年のない日付はtoday、Noneなら今日を基準に年を補う）"""
+    if not date_str:
+        return None
+    
+    # 既に標準形式の場合
+    if len(date_str) == 10 and _ISO_DATE.match(date_str):
+        return date_str
+    compact = _COMPACT_DATE.match(date_str) if len(date_str) == 8 else None
+    if compact:
+        found = _safe_date(*(int(part) for part in compact.groups()))
+        return found.isoformat() if found else None
+    
+    found = _first_date(date_str, today)
+    return found.isoformat() if found else None
+
+
+def _scan_text(text: str, today: date) -> Dict[str, List[str]]:
+    """
+    テキスト中の日付・時刻表記を出現順に正規化して返す（存在しない日付・時刻は除く）
+    日付はparse_date_expressionsと同じ文法で読み、期間は開始日と終了日を返す
+    """
+    text = _fold_for_dates(text)
+    dates: List[str] = []
+    for expression in _parse_date_expressions(text, today):
+        dates.append(expression['start'].isoformat())
+        if expression['end']:
+            dates.append(expression['end'].isoformat())
+    times = [found for found in map(_format_time, _TIME_PATTERN.finditer(text)) if found]
+    return {'dates': dates, 'times': times}
+
 
 class JapaneseTextProcessor:
     """日本語テキスト処理クラス"""
@@ -21,104 +265,216 @@ class JapaneseTextProcessor:
         return text
     
     @staticmethod
-    def extract_date_jp(text: str) -> Optional[str]:
-        """日本語テキストから日付を抽出"""
-        patterns = [
-            r'(\d{4})年(\d{1,2})月(\d{1,2})日',  # 2024年1月15日
-            r'(\d{1,2})/(\d{1,2})',  # 1/15
-            r'(\d{1,2})月(\d{1,2})日',  # 1月15日
-        ]
+    def extract_date_jp(text: str, today: Optional[date] = None) -> Optional[str]:
+        """日本語テキストから最初の日付を抽出（年のない日付は今日を基準に年を補う）"""
+        return _normalize_date(text, today)
+    
+    @staticmethod
+    def extract_dates_jp(text: str, today: Optional[date] = None) -> List[str]:
+        """
+        日本語テキストからすべての日付を出現順に抽出（期間は開始日）
         
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                if len(match.groups()) == 3:  # 年月日
-                    year, month, day = match.groups()
-                    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                elif len(match.groups()) == 2:  # 月日のみ
-                    month, day = match.groups()
-                    current_year = datetime.now().year
-                    return f"{current_year}-{month.zfill(2)}-{day.zfill(2)}"
+        Args:
+            text: 対象テキスト
+            today: 年のない日付の年を補う基準日（省略時は今日）
+            
+        Returns:
+            YYYY-MM-DD形式の日付のリスト
+        """
+        expressions = JapaneseTextProcessor.parse_date_expressions(text, today)
+        return [expression['start'].isoformat() for expression in expressions]
+    
+    @staticmethod
+    def parse_date_expressions(text: str, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        テキスト中の日付表記を読む
+        年月日（2025年3月1日・2025/3/1・2025.03.01）、和暦（令和7年3月1日）、月日（3月1日・3/1・3.1(土)）、
+        曜日表記、期間（1月15日〜17日・12/30〜1/2）に対応する
+        年のない日付は直前の年付き日付（なければ今日）を基準に、過ぎていれば翌年とみなし、曜日表記と合う年を優先する
+        （曜日表記と合う年がない日付は読まない）
         
-        return None
+        Args:
+            text: 対象テキスト
+            today: 基準日（省略時は今日）
+            
+        Returns:
+            出現順の {'start': 開始日, 'end': 終了日（期間でなければNone）, 'explicit_year': 年の明示有無,
+            'weekday': 曜日表記（月曜=0、なければNone）, 'span': NFKC正規化後のテキストでの位置, 'text': 表記}
+        """
+        return _parse_date_expressions(_nfkc(text or ''), today or date.today())
     
     @staticmethod
     def extract_time_jp(text: str) -> Optional[str]:
-        """日本語テキストから時刻を抽出"""
-        patterns = [
-            r'(\d{1,2}):(\d{2})',  # 19:30
-            r'(\d{1,2})時(\d{1,2})?分?',  # 19時30分 or 19時
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                if len(match.groups()) == 2 and match.group(2):
-                    hour, minute = match.groups()
-                    return f"{hour.zfill(2)}:{minute.zfill(2)}"
-                elif len(match.groups()) >= 1:
-                    hour = match.group(1)
-                    return f"{hour.zfill(2)}:00"
-        
-        return None
+        """日本語テキストから時刻を抽出（H:MM表記があればそれを、なければ最初のH時表記を返す）"""
+        hour_form = None
+        for match in _TIME_PATTERN.finditer(_fold_for_dates(text or '')):
+            found = _format_time(match)
+            if found is None:
+                continue
+            if match.group(2) is not None:
+                return found
+            hour_form = hour_form or found
+        return hour_form
     
     @staticmethod
     def normalize_date(date_str: str) -> Optional[str]:
         """日付文字列を標準形式(YYYY-MM-DD)に正規化"""
-        if not date_str:
+        return _normalize_date(date_str, None)
+    
+    @staticmethod
+    def normalize_time(time_str: str) -> Optional[str]:
+        """時刻文字列を標準形式(HH:MM)に正規化"""
+        if not time_str:
             return None
         
         # 既に標準形式の場合
-        if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-            return date_str
+        if _ISO_TIME.match(time_str):
+            return time_str
         
-        # 日本語日付から抽出
-        extracted = JapaneseTextProcessor.extract_date_jp(date_str)
-        if extracted:
-            return extracted
+        # 日本語時刻から抽出（H:MM形式もここで正規化される）
+        return JapaneseTextProcessor.extract_time_jp(time_str)
+    
+    @staticmethod
+    def normalize_dates(date_strs: List[str], today: Optional[date] = None) -> List[Optional[str]]:
+        """
+        日付文字列をまとめて標準形式(YYYY-MM-DD)に正規化（同じ値は1度だけ解析する）
         
-        # その他の形式を試行
-        try:
-            # ISO形式のパース試行
-            if 'T' in date_str:
-                date_str = date_str.split('T')[0]
+        Args:
+            date_strs: 日付文字列のリスト
+            today: 年のない日付の年を補う基準日（省略時は今日）
             
-            # スラッシュ区切り (YYYY/MM/DD)
-            if re.match(r'^\d{4}/\d{1,2}/\d{1,2}$', date_str):
-                parts = date_str.split('/')
-                return f"{parts[0]}-{parts[1].zfill(2)}-{parts[2].zfill(2)}"
+        Returns:
+            入力と同じ順の正規化結果（解釈できない値・文字列以外はNone）
+        """
+        today = today or date.today()
+        memo: Dict[str, Optional[str]] = {}
+        results = []
+        for value in date_strs:
+            if not isinstance(value, str):
+                results.append(None)
+                continue
+            if value not in memo:
+                memo[value] = _normalize_date(value, today)
+            results.append(memo[value])
+        return results
+    
+    @staticmethod
+    def normalize_times(time_strs: List[str]) -> List[Optional[str]]:
+        """
+        時刻文字列をまとめて標準形式(HH:MM)に正規化（同じ値は1度だけ解析する）
+        
+        Args:
+            time_strs: 時刻文字列のリスト
             
-            return None
+        Returns:
+            入力と同じ順の正規化結果（解釈できない値・文字列以外はNone）
+        """
+        memo: Dict[str, Optional[str]] = {}
+        results = []
+        for value in time_strs:
+            if not isinstance(value, str):
+                results.append(None)
+                continue
+            if value not in memo:
+                memo[value] = JapaneseTextProcessor.normalize_time(value)
+            results.append(memo[value])
+        return results
+    
+    @staticmethod
+    def scan(texts: List[str], today: Optional[date] = None) -> List[Dict[str, List[str]]]:
+        """
+        複数テキストの日付・時刻表記を取り出す
+        日付はparse_date_expressionsと同じ文法で読み（期間は開始日と終了日）、時刻は1つの選択パターンで読む
+        
+        Args:
+            texts: 対象テキストのリスト
+            today: 年のない日付の年を補う基準日（省略時は今日）
             
-        except Exception:
-            return None
+        Returns:
+            テキストごとの {'dates': [YYYY-MM-DD...], 'times': [HH:MM...]}（出現順）
+        """
+        today = today or date.today()
+        return [_scan_text(text or '', today) for text in texts]
     
     @staticmethod
-    def normalize_time(time_str: str) -> Optional[str]:
-        """時刻文字列を標準形式(HH:MM)に正規化"""
-        if not time_str:
-            return None
+    def contains_date_or_time(text: str) -> bool:
+        """テキストに日付（年月日・M/D・M月D日）または時刻（H:MM・H時M分）の表記が含まれるか"""
+        return bool(_DATE_OR_TIME_PATTERN.search(text or ''))
+
+    @staticmethod
+    def count_date_mentions(text: str) -> int:
+        """
+        テキスト中の日付表記（parse_date_expressionsと同じ文法の表記と年月のみの表記）の数
+        年の推定や曜日の照合はしないため、過去の日付や曜日の合わない表記も数える
+
+        Args:
+            text: 対象テキスト
+
+        Returns:
+            日付表記の数
+        """
+        text = _fold_for_dates(text or '')
+        return (sum(1 for _ in _DATE_EXPRESSION.finditer(text))
+                + sum(1 for _ in _YM_PATTERN.finditer(text)))
+
+    @staticmethod
+    def contains_date_mention(text: str) -> bool:
+        """テキストに日付表記（count_date_mentionsで数える表記）が含まれるか"""
+        text = _fold_for_dates(text or '')
+        return bool(_DATE_EXPRESSION.search(text) or _YM_PATTERN.search(text))
+
+    @staticmethod
+    def find_date_candidates(text: str, today: Optional[date] = None) -> List[date]:
+        """
+        テキスト中の日付表記（parse_date_expressionsの開始日・終了日、年月のみの表記）を日付に変換
         
-        # 既に標準形式の場合
-        if re.match(r'^\d{2}:\d{2}$', time_str):
-            return time_str
+        Args:
+            text: 対象テキスト
+            today: 基準日（省略時は今日）
+            
+        Returns:
+            検出された日付のリスト
+        """
+        today = today or date.today()
+        text = _fold_for_dates(text or '')
+        candidates: List[date] = []
+        for expression in _parse_date_expressions(text, today):
+            candidates.append(expression['start'])
+            if expression['end']:
+                candidates.append(expression['end'])
         
-        # 日本語時刻から抽出
-        extracted = JapaneseTextProcessor.extract_time_jp(time_str)
-        if extracted:
-            return extracted
+        for match in _YM_PATTERN.finditer(text):
+            # 年月のみの表記は月末日で代表させる
+            year, month = int(match.group(1)), int(match.group(2))
+            if 1 <= month <= 12:
+                next_month = date(year + month // 12, month % 12 + 1, 1)
+                candidates.append(next_month - timedelta(days=1))
         
-        # その他の形式を試行
-        try:
-            # 単純な時:分形式
-            if re.match(r'^\d{1,2}:\d{2}$', time_str):
-                parts = time_str.split(':')
-                return f"{parts[0].zfill(2)}:{parts[1]}"
-            
-            return None
+        return candidates
+    
+    @staticmethod
+    def has_plausible_future_date(text: str, today: Optional[date] = None,
+                                  horizon_days: int = 400) -> bool:
+        """
+        テキストに今日以降の日付らしき表記が含まれるか（LLM送信前の事前フィルタ用）
+        日付表記が1つもなくても曜日表記（（土）など）があれば候補とみなす
+        （過去の日付や曜日の合わない日付しかない場合は候補にしない）
+        
+        Args:
+            text: 対象テキスト
+            today: 基準日（省略時は今日）
+            horizon_days: 未来側の上限日数
             
-        except Exception:
-            return None
+        Returns:
+            今日から horizon_days 日以内の日付、または日付表記のない曜日表記を含む場合True
+        """
+        today = today or date.today()
+        limit = today + timedelta(days=horizon_days)
+        text = _fold_for_dates(text or '')
+        if any(today <= found <= limit for found in JapaneseTextProcessor.find_date_candidates(text, today)):
+            return True
+        return (bool(_WEEKDAY_PATTERN.search(text))
+                and not JapaneseTextProcessor.contains_date_mention(text))
     
     @staticmethod
     def detect_event_type(text: str) -> str:
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+検索結果処理ユーティリティ
+URL正規化・近似重複除去・トークン数見積もり
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import List, Dict, Any, Tuple, Callable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.config import HIGH_RELIABILITY_DOMAINS
+from app.utils.japanese import JapaneseTextProcessor
+
+# 正規化時に除去するトラッキング系クエリパラメータ
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'yclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'spm', 'via', 'share',
+    'amp', 'outputtype', 'cmpid'
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+# 同一サイトのミラー・モバイル・AMP用サブドメイン
+HOST_PREFIXES = ('www.', 'm.', 'sp.', 'mobile.', 'amp.')
+
+# 近似重複とみなすSimHashのハミング距離
+NEAR_DUPLICATE_DISTANCE = 3
+
+_AMP_PATH = re.compile(r'(/amp/?|\.amp)$')
+_AMP_PREFIX = re.compile(r'^/amp(?=/)')
+_INDEX_PAGE = re.compile(r'/index\.(html?|php)$')
+_NON_WORD = re.compile(r'[\s\W_]+')
+_CJK = re.compile(r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uff66-\uff9f]')
+_ASCII_WORD = re.compile(r'[A-Za-z0-9]+')
+
+# 検索結果の価値評価の重み
+HIGH_RELIABILITY_WEIGHT = 2.0
+MAX_DATE_MENTIONS = 5
+MAX_DATE_DENSITY = 2.0
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URLを正規化（トラッキングパラメータ・AMP/モバイル表記・フラグメントを除去）
+
+    Args:
+        url: 正規化するURL
+
+    Returns:
+        正規化されたURL（解析できない場合は入力をそのまま返す）
+    """
+    if not url:
+        return url
+
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    if not parts.netloc:
+        return url
+
+    host = parts.netloc.lower()
+    if host.endswith(':443') or host.endswith(':80'):
+        host = host.rsplit(':', 1)[0]
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    path = _AMP_PREFIX.sub('', parts.path)
+    path = _AMP_PATH.sub('', path)
+    path = _INDEX_PAGE.sub('/', path)
+    path = path.rstrip('/') or '/'
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+def is_high_reliability_url(url: str) -> bool:
+    """公式サイト・チケットサイト・大手メディアのURLか判定"""
+    host = urlsplit(url).netloc.lower() if url else ''
+    if not host:
+        return False
+    if 'official' in host:
+        return True
+    return any(host == domain or host.endswith('.' + domain) for domain in HIGH_RELIABILITY_DOMAINS)
+
+
+def simhash(text: str, ngram: int = 3) -> int:
+    """
+    文字n-gramによる64bit SimHashを計算
+
+    Args:
+        text: 対象テキスト
+        ngram: n-gramの文字数
+
+    Returns:
+        64bitのSimHash値
+    """
+    normalized = _NON_WORD.sub('', unicodedata.normalize('NFKC', text).lower())
+    if not normalized:
+        return 0
+
+    grams = {normalized[i:i + ngram] for i in range(max(len(normalized) - ngram + 1, 1))}
+    weights = [0] * 64
+
+    for gram in grams:
+        value = int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """2つのハッシュ値のハミング距離"""
+    return bin(a ^ b).count('1')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    LLM入力トークン数の概算
+    日本語・韓国語は1文字≒1トークン、英数字は4文字≒1トークンとして見積もる
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    ascii_chars = sum(len(word) for word in _ASCII_WORD.findall(text))
+    other = len(text) - cjk - ascii_chars
+    return cjk + (ascii_chars + 3) // 4 + other // 2
+
+
+def dedupe_search_results(search_results: List[Dict[str, Any]],
+                          max_distance: int = NEAR_DUPLICATE_DISTANCE
+                          ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    正規化URLの一致とタイトル+概要のSimHashで重複する検索結果を除去
+    重複グループ内では信頼性の高いURLを優先して残す
+
+    Args:
+        search_results: 検索結果のリスト
+        max_distance: 近似重複とみなすハミング距離の上限
+
+    Returns:
+        (残った検索結果, 除去された検索結果)
+    """
+    kept: List[Dict[str, Any]] = []
+    fingerprints: List[int] = []
+    canonical_index: Dict[str, int] = {}
+    removed: List[Dict[str, Any]] = []
+
+    for result in search_results:
+        canonical = canonicalize_url(result.get('url', ''))
+        fingerprint = simhash(f"{result.get('title', '')} {result.get('snippet', '')}")
+
+        duplicate_of = canonical_index.get(canonical)
+        if duplicate_of is None and fingerprint:
+            for index, existing in enumerate(fingerprints):
+                if existing and hamming_distance(existing, fingerprint) <= max_distance:
+                    duplicate_of = index
+                    break
+
+        if duplicate_of is None:
+            canonical_index[canonical] = len(kept)
+            kept.append(result)
+            fingerprints.append(fingerprint)
+            continue
+
+        # 重複グループ内では信頼性の高い方を残す
+        current = kept[duplicate_of]
+        if is_high_reliability_url(result.get('url', '')) and not is_high_reliability_url(current.get('url', '')):
+            kept[duplicate_of] = result
+            fingerprints[duplicate_of] = fingerprint
+            canonical_index[canonical] = duplicate_of
+            removed.append(current)
+        else:
+            removed.append(result)
+
+    return kept, removed
+
+
+def score_search_result(result: Dict[str, Any]) -> float:
+    """
+    情報源の信頼性と日付表記の密度から検索結果の価値を評価
+
+    Args:
+        result: 検索結果
+
+    Returns:
+        価値スコア（高いほどプロンプトに優先して含める）
+    """
+    text = ' '.join(result.get(field, '') for field in ('title', 'snippet', 'page_text'))
+    dates = JapaneseTextProcessor.count_date_mentions(text)
+    # 50トークンあたりの日付表記数
+    density = min(dates * 50 / max(estimate_tokens(text), 1), MAX_DATE_DENSITY)
+    reliability = HIGH_RELIABILITY_WEIGHT if is_high_reliability_url(result.get('url', '')) else 1.0
+    return reliability * (1.0 + min(dates, MAX_DATE_MENTIONS) + density)
+
+
+def select_results_within_budget(search_results: List[Dict[str, Any]], token_budget: int,
+                                 render: Callable[[Dict[str, Any]], str]
+                                 ) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    価値の高い検索結果から順にトークン予算を埋める
+
+    Args:
+        search_results: 検索結果のリスト
+        token_budget: プロンプトに含める検索結果の最大トークン数
+        render: 検索結果1件をプロンプト用テキストに変換する関数
+
+    Returns:
+        (価値の高い順に並べた採用結果, 採用結果の合計トークン数)
+        予算を超える場合も最も価値の高い1件は必ず含める
+    """
+    ranked = sorted(search_results, key=score_search_result, reverse=True)
+    selected: List[Dict[str, Any]] = []
+    used = 0
+
+    for result in ranked:
+        cost = estimate_tokens(render(result))
+        if selected and used + cost > token_budget:
+            continue
+        selected.append(result)
+        used += cost
+
+    return selected, used
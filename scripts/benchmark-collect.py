@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スケジュール収集パイプラインのベンチマークスクリプト
+カセットに記録したCustom Search・Gemini応答を再生し、ネットワークなしで収集全体の所要時間を計測する
+
+使い方:
+    # 1. 本番APIを呼び出して記録（GOOGLE_API_KEY・GOOGLE_SEARCH_ENGINE_ID・GEMINI_API_KEYが必要）
+    python scripts/benchmark-collect.py --mode record --cassette .cache/cassettes/bench.json.gz IVE aespa
+    # 2. 記録を再生して計測（APIキー・ネットワーク不要）
+    python scripts/benchmark-collect.py --cassette .cache/cassettes/bench.json.gz --repeat 5 IVE aespa
+"""
+
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.cassette import Cassette
+from app.services.extraction_cache import ExtractionCache
+from app.services.llm_clients import LLMClientRegistry
+from app.services.search_cache import SearchCache
+from app.services.schedule_collector import (
+    EvidenceStore, ScheduleCollector, SearchQueryPlanner, SearchQuotaManager
+)
+
+
+def build_collector(cassette: Cassette) -> ScheduleCollector:
+    """実行ごとに状態を持ち越さないよう、キャッシュ類をメモリのみの新しいインスタンスにした収集サービスを生成"""
+    return ScheduleCollector(
+        google_api_key=os.getenv('GOOGLE_API_KEY', 'replay'),
+        google_search_engine_id=os.getenv('GOOGLE_SEARCH_ENGINE_ID', 'replay'),
+        gemini_api_key=os.getenv('GEMINI_API_KEY', 'replay'),
+        search_cache=SearchCache(db_path=""),
+        quota_manager=SearchQuotaManager(daily_quota=10 ** 6, db_path=""),
+        query_planner=SearchQueryPlanner(db_path=""),
+        evidence_store=EvidenceStore(db_path=""),
+        extraction_cache=ExtractionCache(db_path=""),
+        enrich_pages=False,
+        llm_registry=LLMClientRegistry(),
+        cassette=cassette
+    )
+
+
+async def run_once(cassette: Cassette, artists, days_ahead: int) -> float:
+    """全アーティストを1回収集して所要秒数を返す"""
+    collector = build_collector(cassette)
+    started = time.perf_counter()
+    try:
+        async for result in collector.iter_multiple_artists_schedules(artists, days_ahead=days_ahead):
+            status = 'ok' if result.get('success') else f"failed ({result.get('message')})"
+            print(f"   {result.get('artist_name')}: {len(result.get('extracted_events', []))} events, {status}")
+    finally:
+        await ScheduleCollector.close_http_client()
+    return time.perf_counter() - started
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="カセットを使ったスケジュール収集のベンチマーク")
+    parser.add_argument('artists', nargs='+', help="収集するアーティスト名")
+    parser.add_argument('--cassette', default='.cache/cassettes/benchmark.json.gz', help="カセットファイル")
+    parser.add_argument('--mode', choices=[Cassette.RECORD, Cassette.REPLAY], default=Cassette.REPLAY)
+    parser.add_argument('--repeat', type=int, default=3, help="再生モードでの計測回数")
+    parser.add_argument('--latency-scale', type=float, default=0.0,
+                        help="記録されたレイテンシを何倍で再現するか（0で待機しない）")
+    parser.add_argument('--days-ahead', type=int, default=30)
+    parser.add_argument('--profile', action='store_true', help="cProfileで最後の1回を計測して上位を表示")
+    args = parser.parse_args()
+
+    load_dotenv(override=True)
+    cassette = Cassette(args.cassette, args.mode, latency_scale=args.latency_scale)
+    repeat = 1 if args.mode == Cassette.RECORD else args.repeat
+
+    print(f"=== スケジュール収集ベンチマーク ({args.mode}: {args.cassette}) ===")
+    timings = []
+    for index in range(repeat):
+        print(f"\n▶ run {index + 1}/{repeat}")
+        if args.profile and index == repeat - 1:
+            profiler = cProfile.Profile()
+            elapsed = profiler.runcall(asyncio.run, run_once(cassette, args.artists, args.days_ahead))
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+        else:
+            elapsed = asyncio.run(run_once(cassette, args.artists, args.days_ahead))
+        timings.append(elapsed)
+        print(f"   ⏱ {elapsed * 1000:.1f} ms")
+    if cassette.recording:
+        cassette.save()
+
+    print("\n=== 結果 ===")
+    print(f"runs: {len(timings)}  median: {statistics.median(timings) * 1000:.1f} ms  "
+          f"min: {min(timings) * 1000:.1f} ms  max: {max(timings) * 1000:.1f} ms")
+    stats = cassette.get_stats()
+    print(f"cassette: {stats}")
+    if stats['missed'] > 0:
+        # 記録にない呼び出しがあると一部の収集が失敗し、計測値が実際の処理と一致しない
+        print(f"❌ {stats['missed']} requests were not in the cassette; re-record it with --mode record")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日付・時刻スキャナーのマイクロベンチマーク
+検索結果スニペット風のテキスト（既定10万件）で、呼び出しごとにパターンを1つずつ試す従来方式と
+コンパイル済みパターン・1パスのスキャナー（scan）・一括正規化（normalize_dates）のスループットを比較する
+従来方式は曜日・和暦・期間・存在しない日付の判定をしないため、現行の文法は同じ件数でもより多くの処理をしている
+一括正規化の差は同じ値を1度だけ解析することによるもので、重複のない入力での値も併せて表示する
+
+使い方:
+    python scripts/benchmark-japanese-scanner.py --count 100000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.japanese import JapaneseTextProcessor
+
+TEMPLATES = [
+    "{artist} LIVE TOUR {y}年{m}月{d}日 開場{h}:30 開演{h2}:00 東京ドーム",
+    "【速報】{artist}が{m}/{d}(土)の音楽番組に出演決定！ {h}時{mi}分から放送",
+    "{artist} 新曲「Blue」{m}月{d}日リリース。MVは{h}時公開予定",
+    "{artist}のファンミーティング開催決定 詳細は後日発表",
+    "チケット一般発売 {y}年{m}月{d}日 10:00〜 e+・ぴあ・ローチケ",
+]
+ARTISTS = ["IVE", "aespa", "NewJeans", "LE SSERAFIM", "TWICE", "SEVENTEEN"]
+
+
+LEGACY_DATE_PATTERNS = [r'(\d{4})年(\d{1,2})月(\d{1,2})日', r'(\d{1,2})/(\d{1,2})', r'(\d{1,2})月(\d{1,2})日']
+LEGACY_TIME_PATTERNS = [r'(\d{1,2}):(\d{2})', r'(\d{1,2})時(\d{1,2})?分?']
+
+
+def legacy_extract_date(text):
+    """従来方式: 呼び出しごとにパターンを1つずつ試す"""
+    for pattern in list(LEGACY_DATE_PATTERNS):
+        match = re.search(pattern, text)
+        if match:
+            groups = match.groups()
+            if len(groups) == 3:
+                return f"{groups[0]}-{groups[1].zfill(2)}-{groups[2].zfill(2)}"
+            return f"{time.localtime().tm_year}-{groups[0].zfill(2)}-{groups[1].zfill(2)}"
+    return None
+
+
+def legacy_extract_time(text):
+    """従来方式: 呼び出しごとにパターンを1つずつ試す"""
+    for pattern in list(LEGACY_TIME_PATTERNS):
+        match = re.search(pattern, text)
+        if match:
+            hour, minute = match.group(1), match.group(2)
+            return f"{hour.zfill(2)}:{(minute or '00').zfill(2)}"
+    return None
+
+
+def legacy_scan(text):
+    """従来方式ですべての表記を集める: パターンごとにテキスト全体を走査する"""
+    return ([match.groups() for pattern in LEGACY_DATE_PATTERNS for match in re.finditer(pattern, text)],
+            [match.groups() for pattern in LEGACY_TIME_PATTERNS for match in re.finditer(pattern, text)])
+
+
+def legacy_contains_date_pattern(text):
+    """従来方式: TwitterScraper._contains_date_pattern 相当"""
+    import re as regex
+    for pattern in [r'\d{4}年\d{1,2}月\d{1,2}日', r'\d{1,2}/\d{1,2}', r'\d{1,2}月\d{1,2}日',
+                    r'\d{1,2}:\d{2}', r'\d{1,2}時\d{1,2}分?']:
+        if regex.search(pattern, text):
+            return True
+    return False
+
+
+def make_snippets(count, seed):
+    """テンプレートから検索結果スニペット風のテキストを生成"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            artist=rng.choice(ARTISTS), y=rng.choice([2025, 2026, 2027]), m=rng.randint(1, 12),
+            d=rng.randint(1, 28), h=rng.randint(10, 20), h2=rng.randint(17, 21), mi=rng.choice(['00', '30'])
+        )
+        for _ in range(count)
+    ]
+
+
+def measure(label, func, count, repeat):
+    """repeat回実行して最速の所要時間とスループットを表示"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    elapsed = min(timings)
+    print(f"{label:<44} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} texts/s")
+    return elapsed
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="日付・時刻スキャナーのマイクロベンチマーク")
+    parser.add_argument('--count', type=int, default=100000, help="スニペット数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="計測回数（最速値を表示）")
+    args = parser.parse_args()
+
+    snippets = make_snippets(args.count, args.seed)
+    processor = JapaneseTextProcessor()
+    print(f"=== 日付・時刻スキャナー ベンチマーク ({args.count:,} snippets) ===")
+
+    n, r = args.count, args.repeat
+    results = {}
+    for name, label, func in [
+        ('legacy_extract', "legacy extract_date + extract_time",
+         lambda: [(legacy_extract_date(t), legacy_extract_time(t)) for t in snippets]),
+        ('extract', "extract_date_jp + extract_time_jp",
+         lambda: [(processor.extract_date_jp(t), processor.extract_time_jp(t)) for t in snippets]),
+        ('legacy_scan', "legacy all tokens (finditer per pattern)", lambda: [legacy_scan(t) for t in snippets]),
+        ('scan', "scan (single pass, all tokens)", lambda: processor.scan(snippets)),
+        ('legacy_contains', "legacy _contains_date_pattern",
+         lambda: [legacy_contains_date_pattern(t) for t in snippets]),
+        ('contains', "contains_date_or_time", lambda: [processor.contains_date_or_time(t) for t in snippets]),
+    ]:
+        results[name] = measure(label, func, n, r)
+
+    dates = [processor.extract_date_jp(t) or '' for t in snippets]
+    results['normalize'] = measure("normalize_date (one by one)",
+                                   lambda: [processor.normalize_date(d) for d in dates], n, r)
+    results['normalize_batch'] = measure("normalize_dates (batch)", lambda: processor.normalize_dates(dates), n, r)
+    unique_dates = list(dict.fromkeys(dates))
+    u = len(unique_dates)
+    print(f"   ({u:,} distinct values, {1 - u / n:.0%} duplicates)")
+    results['normalize_unique'] = measure("normalize_date (distinct values)",
+                                          lambda: [processor.normalize_date(d) for d in unique_dates], u, r)
+    results['normalize_batch_unique'] = measure("normalize_dates (distinct values)",
+                                                lambda: processor.normalize_dates(unique_dates), u, r)
+
+    print("\n=== speedup ===")
+    for baseline, name in [('legacy_extract', 'extract'), ('legacy_scan', 'scan'),
+                           ('legacy_contains', 'contains'), ('normalize', 'normalize_batch'),
+                           ('normalize_unique', 'normalize_batch_unique')]:
+        print(f"{name:<24} {results[baseline] / results[name]:6.2f}x vs {baseline}")
+
+
+if __name__ == "__main__":
+    main()
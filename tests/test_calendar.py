@@ -18,7 +18,7 @@ except ImportError:
     IMPORT_SUCCESS = False
 
 # テストデータ用のEventDataインポート
-from app.routers.events import EventData
+from app.models.events import EventData
 
 
 class TestCalendarService:
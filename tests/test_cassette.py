@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Custom Search・Gemini呼び出しの記録/再生のテスト
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import os
+from datetime import date, timedelta
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import httpx
+import pytest
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cassette import Cassette, CassetteMissError
+from app.services.schedule_collector import (
+    ScheduleCollector, SearchQuotaManager, SearchQueryPlanner, EvidenceStore
+)
+from app.services.search_cache import SearchCache
+from app.services.extraction_cache import ExtractionCache
+from app.services.model_cascade import CascadeStats
+from app.services.llm_clients import LLMClientRegistry
+from app.services.resilience import CircuitBreaker
+
+UPCOMING = (date.today() + timedelta(days=30)).isoformat()
+
+
+def _collector(cassette):
+    """状態を持ち越さないカセット付きのScheduleCollector"""
+    with patch('app.services.llm_clients.genai'):
+        instance = ScheduleCollector(
+            google_api_key="secret-key",
+            google_search_engine_id="test-cx",
+            gemini_api_key="test-gemini",
+            search_cache=SearchCache(db_path=""),
+            quota_manager=SearchQuotaManager(daily_quota=1000, db_path=""),
+            query_planner=SearchQueryPlanner(db_path=""),
+            evidence_store=EvidenceStore(db_path=""),
+            extraction_cache=ExtractionCache(db_path=""),
+            cascade_models=["flash"],
+            cascade_stats=CascadeStats(),
+            date_prefilter=False,
+            llm_registry=LLMClientRegistry(),
+            cassette=cassette
+        )
+    instance.search_breaker = CircuitBreaker('google_search')
+    instance.gemini_breaker = CircuitBreaker('gemini')
+    return instance
+
+
+def _search_handler(request):
+    query = request.url.params["q"]
+    return httpx.Response(200, json={"items": [{
+        "title": f"{query} 結果", "link": f"https://example.com/{len(query)}", "snippet": f"{UPCOMING} 東京ドーム"
+    }]})
+
+
+def _gemini_response(*args, **kwargs):
+    response = MagicMock()
+    response.text = json.dumps({"events": [{"date": UPCOMING, "title": "IVE LIVE", "confidence": 0.9}]})
+    return response
+
+
+@pytest.fixture(autouse=True)
+def close_http_client():
+    yield
+    asyncio.run(ScheduleCollector.close_http_client())
+
+
+class TestCassette:
+    """カセットの記録・再生のテストクラス"""
+
+    def test_record_then_replay_without_network(self, tmp_path):
+        """記録した収集結果がネットワーク・Geminiなしで同じく再現される"""
+        path = str(tmp_path / "cassette.json.gz")
+
+        recorder = _collector(Cassette(path, Cassette.RECORD))
+        recorder.gemini_models[0][1]._model.generate_content_async = AsyncMock(side_effect=_gemini_response)
+        ScheduleCollector._http_client = httpx.AsyncClient(transport=httpx.MockTransport(_search_handler))
+        recorded = asyncio.run(recorder.collect_artist_schedules("IVE"))
+        asyncio.run(ScheduleCollector.close_http_client())
+        recorder.cassette.save()
+
+        def offline(request):
+            raise AssertionError("network used during replay")
+
+        cassette = Cassette(path, Cassette.REPLAY)
+        player = _collector(cassette)
+        player.gemini_models[0][1]._model.generate_content_async = AsyncMock(side_effect=AssertionError)
+        ScheduleCollector._http_client = httpx.AsyncClient(transport=httpx.MockTransport(offline))
+        replayed = asyncio.run(player.collect_artist_schedules("IVE"))
+
+        assert recorded['success'] and replayed['success']
+        def events(result):
+            return [{k: v for k, v in e.items() if k != 'validated_at'} for e in result['extracted_events']]
+
+        assert events(replayed) == events(recorded) != []
+        assert replayed['search_results'] == recorded['search_results']
+        assert cassette.get_stats()['missed'] == 0
+        assert cassette.get_stats()['replayed'] == cassette.get_stats()['interactions']
+
+    def test_api_key_is_not_recorded(self, tmp_path):
+        """APIキーはカセットファイルに残らず、キーが違っても再生できる"""
+        path = str(tmp_path / "cassette.json.gz")
+        cassette = Cassette(path, Cassette.RECORD)
+        client = cassette.wrap_http_client(httpx.AsyncClient(transport=httpx.MockTransport(_search_handler)))
+
+        asyncio.run(client.get("https://search.example/v1", params={"key": "secret-key", "q": "IVE"}))
+        cassette.save()
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            assert "secret-key" not in f.read()
+        player = Cassette(path, Cassette.REPLAY).wrap_http_client(None)
+        response = asyncio.run(player.get("https://search.example/v1", params={"key": "other", "q": "IVE"}))
+        assert response.status_code == 200
+        assert response.json()["items"][0]["title"] == "IVE 結果"
+
+    def test_replay_miss_and_simulated_latency(self, tmp_path):
+        """記録にない呼び出しはエラー、記録済みのレイテンシは倍率をかけて再現する"""
+        path = str(tmp_path / "cassette.json.gz")
+        recorder = Cassette(path, Cassette.RECORD)
+        model = MagicMock()
+        model.generate_content.side_effect = _gemini_response
+        recorder.wrap_gemini_model("flash", model).generate_content("prompt")
+        with recorder._lock:
+            next(iter(recorder._interactions.values()))['latency'] = 0.5
+        recorder.save()
+
+        player = Cassette(path, Cassette.REPLAY, latency_scale=2.0)
+        with patch('app.services.cassette.time.sleep') as sleep:
+            response = player.wrap_gemini_model("flash", None).generate_content("prompt")
+
+        assert json.loads(response.text)["events"][0]["title"] == "IVE LIVE"
+        sleep.assert_called_once_with(1.0)
+        with pytest.raises(CassetteMissError):
+            player.wrap_gemini_model("pro", None).generate_content("prompt")
+
+    def test_replay_pins_today_to_recorded_date(self, tmp_path):
+        """再生時は記録した日を基準日にし、日付で変わる検索クエリも記録と一致する"""
+        path = str(tmp_path / "cassette.json.gz")
+        recorded_on = date.today() - timedelta(days=366)
+
+        recorder = _collector(Cassette(path, Cassette.RECORD))
+        recorder.cassette.recorded_on = recorded_on
+        recorder.gemini_models[0][1]._model.generate_content_async = AsyncMock(side_effect=_gemini_response)
+        ScheduleCollector._http_client = httpx.AsyncClient(transport=httpx.MockTransport(_search_handler))
+        asyncio.run(recorder.collect_artist_schedules("IVE"))
+        asyncio.run(ScheduleCollector.close_http_client())
+        recorder.cassette.save()
+
+        cassette = Cassette(path, Cassette.REPLAY)
+        player = _collector(cassette)
+        replayed = asyncio.run(player.collect_artist_schedules("IVE"))
+
+        assert cassette.today() == recorded_on
+        assert player._reference_date() == recorded_on
+        assert replayed['success'] and replayed['extracted_events'] != []
+        assert cassette.get_stats()['missed'] == 0
+
+    def test_replay_miss_fails_the_collection(self, tmp_path):
+        """記録にない呼び出しは空の検索結果として隠さず、収集の失敗になる"""
+        cassette = Cassette(str(tmp_path / "empty.json.gz"), Cassette.REPLAY)
+        player = _collector(cassette)
+
+        result = asyncio.run(player.collect_artist_schedules("IVE"))
+
+        assert not result['success']
+        assert 'No recorded search interaction' in result['message']
+        assert cassette.get_stats()['missed'] > 0
@@ -4,24 +4,53 @@
 Gemini APIを使用したスケジュール情報抽出のテスト
 """
 
+import asyncio
+import json
 import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # プロジェクトのルートをPythonパスに追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.main import app
+from app.services.extraction_cache import ExtractionCache
+from app.services.llm_clients import LLMClientRegistry
+from app.services.resilience import CircuitBreaker
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def extraction_cache():
+    """テストごとに独立した抽出キャッシュ"""
+    cache = ExtractionCache(db_path="")
+    with patch('app.routers.extract.get_extraction_cache', return_value=cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def llm_registry():
+    """テストごとに独立したLLMクライアントレジストリ"""
+    registry = LLMClientRegistry()
+    with patch('app.routers.extract.get_llm_registry', return_value=registry):
+        yield registry
+
+
+@pytest.fixture(autouse=True)
+def gemini_breaker():
+    """テストごとに独立したGeminiのサーキットブレーカー"""
+    breaker = CircuitBreaker('gemini', failure_threshold=1, reset_timeout=60)
+    with patch('app.routers.extract.get_circuit_breaker', return_value=breaker):
+        yield breaker
+
+
 class TestExtractEndpoint:
     """POST /extract エンドポイントのテストクラス"""
     
-    @patch('app.routers.extract.genai')
+    @patch('app.services.llm_clients.genai')
     def test_extract_success(self, mock_genai):
         """正常系：検索結果からスケジュール情報を抽出"""
         # Gemini APIのモック設定
@@ -55,7 +84,7 @@ class TestExtractEndpoint:
             ]
         }
         '''
-        mock_model.generate_content.return_value = mock_response
+        mock_model.generate_content_async = AsyncMock(return_value=mock_response)
         mock_genai.GenerativeModel.return_value = mock_model
         
         # リクエストデータ
@@ -104,14 +133,14 @@ class TestExtractEndpoint:
         response = client.post("/extract", json={"sources": "invalid"})
         assert response.status_code == 422
     
-    @patch('app.routers.extract.genai')
+    @patch('app.services.llm_clients.genai')
     def test_extract_no_events_found(self, mock_genai):
         """正常系：スケジュール情報が見つからない場合"""
         # Gemini APIのモック設定
         mock_model = MagicMock()
         mock_response = MagicMock()
         mock_response.text = '{"events": []}'
-        mock_model.generate_content.return_value = mock_response
+        mock_model.generate_content_async = AsyncMock(return_value=mock_response)
         mock_genai.GenerativeModel.return_value = mock_model
         
         request_data = {
@@ -128,4 +157,185 @@ class TestExtractEndpoint:
         
         assert response.status_code == 200
         data = response.json()
-        assert data["events"] == []
\ No newline at end of file
+        assert data["events"] == []
+    
+    @patch('app.services.llm_clients.genai')
+    def test_extract_repeated_request_uses_cache(self, mock_genai, extraction_cache):
+        """正常系：同一リクエストの2回目はGeminiを呼ばずキャッシュから返す"""
+        mock_model = MagicMock()
+        mock_response = MagicMock()
+        mock_response.text = '{"events": [{"date": "2099-01-20", "title": "TOUR"}]}'
+        mock_model.generate_content_async = AsyncMock(return_value=mock_response)
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        request_data = {
+            "sources": [
+                {
+                    "title": "IVE TOUR",
+                    "url": "https://example.com/ive",
+                    "snippet": "2099年1月20日 東京ドーム"
+                }
+            ]
+        }
+        
+        first = client.post("/extract", json=request_data)
+        second = client.post("/extract", json=request_data)
+        
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert mock_model.generate_content_async.call_count == 1
+        assert extraction_cache.get_stats()['memory_hits'] == 1
+    
+    @patch('app.services.llm_clients.genai')
+    def test_extract_timeout(self, mock_genai):
+        """異常系：Gemini APIがタイムアウトした場合は504エラー"""
+        async def slow(prompt, **kwargs):
+            await asyncio.sleep(10)
+        
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(side_effect=slow)
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        request_data = {
+            "sources": [
+                {"title": "IVE TOUR", "url": "https://example.com/ive", "snippet": "2099年1月20日"}
+            ]
+        }
+        
+        with patch('app.routers.extract.Config.GEMINI_REQUEST_TIMEOUT', 0.05):
+            response = client.post("/extract", json=request_data)
+        
+        assert response.status_code == 504
+
+    @patch('app.services.llm_clients.genai')
+    def test_extract_open_circuit_returns_503(self, mock_genai, gemini_breaker):
+        """異常系：Gemini APIの429が続いた後はAPIを呼ばずに503を返す"""
+        from google.api_core.exceptions import ResourceExhausted
+
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(side_effect=ResourceExhausted("quota"))
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        request_data = {
+            "sources": [
+                {"title": "IVE TOUR", "url": "https://example.com/ive", "snippet": "2099年1月20日"}
+            ]
+        }
+
+        with patch('app.services.resilience.Config.RETRY_MAX_ATTEMPTS', 1):
+            first = client.post("/extract", json=request_data)
+            second = client.post("/extract", json=request_data)
+
+        assert first.status_code == 503
+        assert second.status_code == 503
+        assert int(second.headers["Retry-After"]) > 0
+        assert mock_model.generate_content_async.call_count == 1
+        assert gemini_breaker.get_stats()['state'] == 'open'
+
+
+def _stream(chunks, consumed):
+    """断片を順に返すストリーミング応答のモック（消費済みの断片数をconsumedに記録）"""
+    class Response:
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            for text in chunks:
+                consumed.append(text)
+                chunk = MagicMock()
+                chunk.text = text
+                yield chunk
+    return Response()
+
+
+class TestExtractStreamEndpoint:
+    """POST /extract/stream エンドポイントのテストクラス"""
+
+    CHUNKS = [
+        '{"events": [{"date": "2099-01-20", "title": "IVE TOUR",',
+        ' "confidence": 0.9}, {"date": "2099-01-21",',
+        ' "title": "IVE FANMEETING", "confidence": 0.9}]}',
+    ]
+
+    REQUEST = {"sources": [{"title": "IVE TOUR", "url": "https://example.com/ive", "snippet": "2099年1月20日"}]}
+
+    @patch('app.services.llm_clients.genai')
+    def test_stream_emits_events_as_ndjson(self, mock_genai):
+        """正常系：完成したイベントから順にNDJSONで返し、最後にdone行を返す"""
+        consumed = []
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(return_value=_stream(self.CHUNKS, consumed))
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        response = client.post("/extract/stream", json=self.REQUEST)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["event", "event", "done"]
+        assert [line["event"]["title"] for line in lines[:2]] == ["IVE TOUR", "IVE FANMEETING"]
+        assert lines[-1]["count"] == 2
+        assert mock_model.generate_content_async.call_args.kwargs["stream"] is True
+
+    @patch('app.services.llm_clients.genai')
+    def test_first_event_arrives_before_generation_finishes(self, mock_genai):
+        """最初のイベントは応答全体の生成完了前に送出される"""
+        from app.routers.extract import _stream_extracted_events
+
+        consumed = []
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(return_value=_stream(self.CHUNKS, consumed))
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        async def first_line():
+            lines = _stream_extracted_events("prompt", "key")
+            line = await lines.__anext__()
+            await lines.aclose()
+            return json.loads(line)
+
+        line = asyncio.run(first_line())
+
+        assert line["event"]["title"] == "IVE TOUR"
+        assert len(consumed) < len(self.CHUNKS)
+
+    @patch('app.services.llm_clients.genai')
+    def test_stream_uses_cache_on_repeat(self, mock_genai):
+        """同じリクエストの2回目はキャッシュから返す"""
+        consumed = []
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(return_value=_stream(self.CHUNKS, consumed))
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client.post("/extract/stream", json=self.REQUEST)
+        response = client.post("/extract/stream", json=self.REQUEST)
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1] == {"type": "done", "count": 2, "cached": True}
+        assert mock_model.generate_content_async.call_count == 1
+
+    @patch('app.services.llm_clients.genai')
+    def test_stream_failure_after_start_opens_circuit(self, mock_genai, gemini_breaker):
+        """ストリーム開始後の失敗もGeminiのサーキットに記録する"""
+        class Broken:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise ConnectionError("stream reset")
+
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(return_value=Broken())
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        response = client.post("/extract/stream", json=self.REQUEST)
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1]["type"] == "error"
+        assert gemini_breaker.get_stats()['state'] == 'open'
+
+    def test_stream_empty_sources(self):
+        """異常系：sourcesが空の場合はストリーム開始前に400エラー"""
+        response = client.post("/extract/stream", json={"sources": []})
+
+        assert response.status_code == 400
+
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+ExtractionCache のテスト
+"""
+
+import sys
+import os
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.extraction_cache import ExtractionCache, compute_template_version
+
+
+class TestExtractionCache:
+    """Gemini応答キャッシュのテストクラス"""
+
+    def test_key_depends_on_model_and_prompt(self):
+        """モデル名・プロンプトが異なれば別のエントリになる"""
+        cache = ExtractionCache(db_path="")
+        cache.set("gemini-1.5-flash", "prompt", '{"events": []}')
+
+        assert cache.get("gemini-1.5-flash", "prompt") == '{"events": []}'
+        assert cache.get("gemini-1.5-pro", "prompt") is None
+        assert cache.get("gemini-1.5-flash", "prompt ") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """SQLite層により再起動後もヒットする"""
+        db_path = str(tmp_path / "extraction.sqlite3")
+        ExtractionCache(db_path=db_path).set("m", "p", "response")
+
+        cache = ExtractionCache(db_path=db_path)
+
+        assert cache.get("m", "p") == "response"
+        assert cache.get_stats()['disk_hits'] == 1
+
+    def test_version_change_invalidates_entries(self, tmp_path):
+        """テンプレートのバージョンタグが変わると既存エントリは無効になる"""
+        db_path = str(tmp_path / "extraction.sqlite3")
+        ExtractionCache(db_path=db_path, version="old").set("m", "p", "response")
+
+        assert ExtractionCache(db_path=db_path, version="new").get("m", "p") is None
+        assert ExtractionCache(db_path=db_path, version="old").get("m", "p") is None
+
+    def test_expired_entries_miss(self):
+        """TTLを過ぎたエントリはミスになる"""
+        cache = ExtractionCache(db_path="", ttl=0)
+        cache.set("m", "p", "response")
+
+        assert cache.get("m", "p") is None
+
+    def test_template_version_is_stable(self):
+        """同じテンプレートからは同じバージョンタグが得られる"""
+        assert compute_template_version() == compute_template_version()
+        assert ExtractionCache(db_path="").version == compute_template_version()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+ScheduleExtractor の一括・並行抽出テスト
+"""
+
+import asyncio
+import json
+import re
+import sys
+import os
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import pytest
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("vertexai")
+
+from app.services.extractor import ScheduleExtractor
+from app.services.extraction_cache import ExtractionCache
+from app.services.llm_clients import LLMClientRegistry
+
+
+def _tweet(tweet_id, content):
+    return {"id": tweet_id, "url": f"https://x.com/ive/status/{tweet_id}", "username": "ive",
+            "display_name": "IVE", "content": content}
+
+
+def _response(payload):
+    response = MagicMock()
+    response.text = json.dumps(payload)
+    return response
+
+
+@pytest.fixture
+def extractor():
+    """Vertex AIをモック化したScheduleExtractor"""
+    with patch('app.services.extractor.vertexai'), \
+            patch('app.services.extractor.GenerativeModel'):
+        instance = ScheduleExtractor("test-project", extraction_cache=ExtractionCache(db_path=""),
+                                     cascade_models=["flash"], batch_size=3, max_concurrency=2,
+                                     llm_registry=LLMClientRegistry())
+    instance.model.generate_content_async = AsyncMock()
+    yield instance
+
+
+class TestBatchedTweetExtraction:
+    """extract_from_tweets の一括抽出テストクラス"""
+
+    @staticmethod
+    async def _generate_by_section(prompt, **kwargs):
+        # プロンプト内のIDとツイート本文の対応どおりに応答する
+        sections = re.findall(r'【ID: (T\d+)[^】]*】\n(\S+)', prompt)
+        return _response({"artists": {
+            section_id: {"events": [{"date": "2099-01-20", "title": f"{content} LIVE", "confidence": 0.9}]}
+            for section_id, content in sections
+        }})
+
+    def test_events_map_back_to_source_tweets(self, extractor):
+        """一括プロンプトの結果が元のツイートに振り分けられる"""
+        extractor.model.generate_content_async.side_effect = self._generate_by_section
+        tweets = [_tweet(str(i), f"tweet{i}") for i in range(5)]
+
+        schedules = extractor.extract_from_tweets(tweets)
+
+        assert extractor.model.generate_content_async.call_count == 2  # 3件 + 2件
+        assert {(s['title'], s['source_tweet_id']) for s in schedules} == {
+            (f"tweet{i} LIVE", str(i)) for i in range(5)
+        }
+        assert all(s['source_tweet_url'].endswith(s['source_tweet_id']) for s in schedules)
+
+    def test_missing_item_falls_back_to_single_prompt(self, extractor):
+        """応答に含まれないツイートは単体プロンプトで抽出し直す"""
+        async def generate(prompt, **kwargs):
+            if '【ID:' in prompt:
+                return _response({"artists": {"T1": {"events": []}}})
+            return _response({"events": [{"date": "2099-02-01", "title": "single", "confidence": 0.9}]})
+
+        extractor.model.generate_content_async.side_effect = generate
+
+        schedules = extractor.extract_from_tweets([_tweet("1", "a"), _tweet("2", "b")])
+
+        assert [(s['title'], s['source_tweet_id']) for s in schedules] == [("single", "2")]
+        assert extractor.model.generate_content_async.call_count == 2
+
+    def test_batches_run_concurrently(self, extractor):
+        """チャンクは同時実行数の上限まで並行に処理される"""
+        in_flight = 0
+        peak = 0
+
+        async def generate(prompt, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return await self._generate_by_section(prompt)
+
+        extractor.model.generate_content_async.side_effect = generate
+
+        extractor.batch_extract_schedules([f"text{i}" for i in range(12)])
+
+        assert extractor.model.generate_content_async.call_count == 4
+        assert peak == 2
+
+    def test_fallbacks_run_concurrently(self, extractor):
+        """一括応答を解析できない場合の単体抽出は、同時実行数の上限まで並行に処理される"""
+        in_flight = 0
+        peak = 0
+
+        async def generate(prompt, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            if '【ID:' in prompt:
+                return MagicMock(text="not json")
+            return _response({"events": [{"date": "2099-02-01", "title": "single", "confidence": 0.9}]})
+
+        extractor.model.generate_content_async.side_effect = generate
+
+        schedules = extractor.batch_extract_schedules([f"text{i}" for i in range(3)])
+
+        assert extractor.model.generate_content_async.call_count == 4  # 一括1回 + 単体3回
+        assert [s['title'] for s in schedules] == ["single"] * 3
+        assert peak == 2
+
+    def test_slow_call_times_out(self, extractor):
+        """応答の遅いGemini呼び出しは打ち切り、他のテキストの抽出を止めない"""
+        async def generate(prompt, **kwargs):
+            await asyncio.sleep(10)
+
+        extractor.model.generate_content_async.side_effect = generate
+
+        with patch('app.services.extractor.Config.GEMINI_REQUEST_TIMEOUT', 0.05):
+            assert extractor.extract_schedules_from_text("2099年1月20日 LIVE", "IVE") == []
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Gemini構造化出力ユーティリティのテスト
+"""
+
+import sys
+import os
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.events import EventData
+from app.utils.gemini_json import (
+    EVENT_SCHEMA, EVENTS_RESPONSE_SCHEMA, IncrementalEventParser, build_batch_response_schema,
+    parse_events, parse_batch_events
+)
+import json
+
+
+class TestResponseSchema:
+    """レスポンススキーマのテストクラス"""
+
+    def test_event_schema_follows_event_data_fields(self):
+        """イベントスキーマはEventDataのフィールドから生成される"""
+        assert set(EVENT_SCHEMA['properties']) == set(EventData.model_fields)
+        assert EVENT_SCHEMA['properties']['confidence']['type'] == 'number'
+        assert EVENT_SCHEMA['properties']['date']['type'] == 'string'
+
+    def test_batch_schema_requires_every_section(self):
+        """一括抽出スキーマはすべてのセクションIDを必須にする"""
+        schema = build_batch_response_schema(["A1", "A2"])
+        artists = schema['properties']['artists']
+
+        assert artists['required'] == ["A1", "A2"]
+        assert artists['properties']['A1'] == EVENTS_RESPONSE_SCHEMA
+
+
+class TestParseEvents:
+    """共通パーサーのテストクラス"""
+
+    def test_structured_response(self):
+        """構造化出力の応答をそのまま解析する"""
+        events = parse_events('{"events": [{"date": "2099-01-20", "title": " TOUR ", "confidence": "0.9"}]}')
+
+        assert events == [{"date": "2099-01-20", "title": "TOUR", "confidence": 0.9}]
+
+    def test_legacy_fenced_and_wrapped_responses(self):
+        """コードブロックや前後の文章を含む旧形式の応答も解析する"""
+        fenced = 'はい。\n```json\n{"events": [{"title": "A"}]}\n```'
+        wrapped = '結果は以下です {"events": [{"title": "B"}]} 以上'
+
+        assert parse_events(fenced) == [{"title": "A"}]
+        assert parse_events(wrapped) == [{"title": "B"}]
+
+    def test_unparseable_response_returns_none(self):
+        """解析できない応答はNoneを返す"""
+        assert parse_events("申し訳ありません") is None
+        assert parse_events('{"events": "none"}') is None
+        assert parse_events('{"events": [}') is None
+
+    def test_invalid_fields_are_normalized(self):
+        """不正な型のフィールドは正規化・除去される"""
+        events = parse_events('{"events": [{"title": null, "confidence": "高"}, "broken"]}')
+
+        assert events == [{"title": ""}]
+
+    def test_batch_response_split_by_section(self):
+        """一括抽出の応答をセクションIDごとに分割する"""
+        text = '{"artists": {"A1": {"events": [{"title": "A"}]}, "A3": {"events": []}}}'
+
+        assert parse_batch_events(text, ["A1", "A2"]) == {"A1": [{"title": "A"}]}
+        assert parse_batch_events("not json", ["A1"]) is None
+
+
+class TestIncrementalEventParser:
+    """ストリーミング応答の逐次パーサーのテストクラス"""
+
+    RESPONSE = json.dumps({"events": [
+        {"date": "2099-01-20", "title": "TOUR \"A\" {day1}", "confidence": 0.9},
+        {"date": "2099-01-21", "title": "TOUR [day2]", "confidence": 0.8},
+    ]}, ensure_ascii=False)
+
+    def _feed_in_chunks(self, text, size):
+        parser = IncrementalEventParser()
+        emitted = []
+        for start in range(0, len(text), size):
+            emitted.append([event["title"] for event in parser.feed(text[start:start + size])])
+        return parser, emitted
+
+    def test_events_are_emitted_as_soon_as_complete(self):
+        """各イベントはオブジェクトが閉じた断片で取り出される"""
+        first_end = self.RESPONSE.index("}, {") + 1
+        parser = IncrementalEventParser()
+
+        assert parser.feed(self.RESPONSE[:first_end - 1]) == []
+        assert [e["title"] for e in parser.feed(self.RESPONSE[first_end - 1:first_end])] == ['TOUR "A" {day1}']
+        assert [e["title"] for e in parser.feed(self.RESPONSE[first_end:])] == ["TOUR [day2]"]
+        assert parser.finish() == []
+
+    def test_chunk_boundaries_do_not_matter(self):
+        """断片の区切り位置に関係なく同じイベントが得られる"""
+        for size in (1, 2, 5, 1000):
+            parser, emitted = self._feed_in_chunks(self.RESPONSE, size)
+            titles = [title for chunk in emitted for title in chunk] + [e["title"] for e in parser.finish()]
+            assert titles == ['TOUR "A" {day1}', "TOUR [day2]"]
+
+    def test_fenced_and_legacy_array_responses(self):
+        """コードブロックで囲まれた応答やトップレベル配列の旧形式も逐次解析する"""
+        parser = IncrementalEventParser()
+        assert len(parser.feed("```json\n" + self.RESPONSE + "\n```")) == 2
+
+        parser = IncrementalEventParser()
+        assert parser.feed('[{"title": "A"}, {"title": "B"}]') == [{"title": "A"}, {"title": "B"}]
+
+    def test_nested_objects_are_not_emitted_separately(self):
+        """イベント内の入れ子オブジェクトや他のキーの配列はイベントとして扱わない"""
+        parser = IncrementalEventParser()
+        text = '{"note": [{"title": "x"}], "events": [{"title": "A", "extra": {"events": [{"title": "y"}]}}]}'
+
+        assert [e["title"] for e in parser.feed(text)] == ["A"]
+
+    def test_finish_recovers_missed_events(self):
+        """逐次解析できなかった応答は終了時に応答全体から補完する"""
+        parser = IncrementalEventParser()
+        assert parser.feed('サイズは5" 以上 {"events": [{"title": "A"}]}') == []
+        assert parser.finish() == [{"title": "A"}]
+
@@ -0,0 +1,194 @@
+"""
+日本語テキスト処理の日付候補検出テスト
+"""
+
+from datetime import date
+
+from app.utils.japanese import JapaneseTextProcessor
+
+TODAY = date(2024, 11, 1)
+
+
+class TestFindDateCandidates:
+    """find_date_candidates のテストクラス"""
+
+    def test_full_date(self):
+        """年月日表記をそのまま変換する"""
+        assert JapaneseTextProcessor.find_date_candidates("2025年1月20日 開催", TODAY) == [date(2025, 1, 20)]
+
+    def test_full_width_and_slash_dates(self):
+        """全角数字やスラッシュ区切りも検出する"""
+        found = JapaneseTextProcessor.find_date_candidates("２０２４/１２/３ と 2024.12.24", TODAY)
+        assert found == [date(2024, 12, 3), date(2024, 12, 24)]
+
+    def test_month_day_infers_next_occurrence(self):
+        """年のない表記は今日以降で最も近い日付とみなす"""
+        found = JapaneseTextProcessor.find_date_candidates("12月3日 と 1/15", TODAY)
+        assert found == [date(2024, 12, 3), date(2025, 1, 15)]
+
+    def test_range_end_is_included(self):
+        """期間表記の終了日も候補に含める"""
+        found = JapaneseTextProcessor.find_date_candidates("2024年12月28日(土)〜1月5日", TODAY)
+        assert found == [date(2024, 12, 28), date(2025, 1, 5)]
+
+    def test_time_range_is_not_a_date(self):
+        """時刻の範囲は日付として扱わない"""
+        assert JapaneseTextProcessor.find_date_candidates("開演 18:00〜20:00", TODAY) == []
+
+
+class TestHasPlausibleFutureDate:
+    """has_plausible_future_date のテストクラス"""
+
+    def test_future_date(self):
+        assert JapaneseTextProcessor.has_plausible_future_date("2025年1月20日 東京ドーム", TODAY)
+
+    def test_past_only_dates(self):
+        """過去の日付しかなければ候補にしない"""
+        assert not JapaneseTextProcessor.has_plausible_future_date("2019年4月13日 公演", TODAY)
+
+    def test_beyond_horizon(self):
+        """上限日数より先の日付は候補にしない"""
+        assert not JapaneseTextProcessor.has_plausible_future_date("2030年1月1日", TODAY, horizon_days=400)
+
+    def test_weekday_marker_without_date(self):
+        """曜日表記だけでも候補とみなす"""
+        assert JapaneseTextProcessor.has_plausible_future_date("次の(土)に出演決定", TODAY)
+
+    def test_weekday_marker_with_past_date(self):
+        """日付表記があれば曜日表記だけでは候補にしない（曜日の合う過去の日付・曜日の合わない日付）"""
+        today = date(2025, 10, 17)
+        assert not JapaneseTextProcessor.has_plausible_future_date("3月1日(土) 公演", today)
+        assert not JapaneseTextProcessor.has_plausible_future_date("2/14(月) 公演", today)
+
+    def test_no_date(self):
+        assert not JapaneseTextProcessor.has_plausible_future_date("メンバー紹介", TODAY)
+
+
+class TestScanner:
+    """コンパイル済みパターンによる抽出・一括APIのテストクラス"""
+
+    def test_extract_time_keeps_pattern_priority(self):
+        """H:MM → H時 の優先順は従来どおり"""
+        assert JapaneseTextProcessor.extract_time_jp("19時 開演 18:30 開場") == "18:30"
+        assert JapaneseTextProcessor.extract_time_jp("19時5分") == "19:05"
+
+    def test_scan_returns_all_tokens_in_order(self):
+        """1パスで日付・時刻をすべて出現順に返す"""
+        found = JapaneseTextProcessor.scan([
+            "2026年1月15日 開場17:30 開演18時 追加公演 2026/1/16 25:00",
+            "13月40日 123:45 19:75",
+            "",
+        ], TODAY)
+        assert found == [
+            {'dates': ['2026-01-15', '2026-01-16'], 'times': ['17:30', '18:00', '25:00']},
+            {'dates': [], 'times': []},
+            {'dates': [], 'times': []},
+        ]
+
+    def test_scan_uses_the_date_grammar(self):
+        """scanはparse_date_expressionsと同じ文法で日付を読む（和暦・ドット区切り・曜日・分数・期間・列挙）"""
+        today = date(2025, 10, 17)
+        found = JapaneseTextProcessor.scan([
+            "令和元年5月1日", "第3/4半期 1/2サイズ", "2025.03.01 令和7年3月1日", "12月3日(木)",
+            "11月15日(土)・16日(日)", "1月15日〜17日", "１２月３日（水）１８：００"
+        ], today)
+        assert [entry['dates'] for entry in found] == [
+            ["2019-05-01"], [], ["2025-03-01", "2025-03-01"], ["2026-12-03"],
+            ["2025-11-15", "2025-11-16"], ["2026-01-15", "2026-01-17"], ["2025-12-03"]
+        ]
+        assert found[-1]['times'] == ["18:00"]
+
+    def test_listed_days(self):
+        """日だけの列挙は同じ月の日付として読み、日数・日目や曜日の合わない日は読まない"""
+        assert JapaneseTextProcessor.extract_dates_jp("2025年11月15日・16日・30日 東京ドーム", TODAY) == [
+            "2025-11-15", "2025-11-16", "2025-11-30"
+        ]
+        assert JapaneseTextProcessor.extract_dates_jp("12月3日、4日間のツアー 3月1日、2公演", TODAY) == [
+            "2024-12-03", "2025-03-01"
+        ]
+        assert JapaneseTextProcessor.extract_dates_jp("11月15日(金)・16日(金)", TODAY) == ["2024-11-15"]
+
+    def test_extract_time_skips_invalid_times(self):
+        """存在しない時刻は読み飛ばし、全角の時刻も読む"""
+        assert JapaneseTextProcessor.extract_time_jp("19:75 開演 19時") == "19:00"
+        assert JapaneseTextProcessor.extract_time_jp("開演１８：３０") == "18:30"
+
+    def test_batch_normalization(self):
+        """一括正規化は入力順を保ち、文字列以外はNoneにする"""
+        assert JapaneseTextProcessor.normalize_dates(
+            ["2025-01-20", "2025年1月20日", "2025年1月20日", None, "未定"]
+        ) == ["2025-01-20", "2025-01-20", "2025-01-20", None, None]
+        assert JapaneseTextProcessor.normalize_times(["19:00", "9:05", "19時", "", 19]) == [
+            "19:00", "09:05", "19:00", None, None
+        ]
+
+    def test_contains_date_or_time(self):
+        assert JapaneseTextProcessor.contains_date_or_time("明日 19時30分から配信")
+        assert not JapaneseTextProcessor.contains_date_or_time("詳細は後日発表")
+
+    def test_count_date_mentions_uses_the_date_grammar(self):
+        text = "２０２５年３月１日（土）・2日 東京 / 1/2サイズ / 2025年4月 ツアー開催"
+        assert JapaneseTextProcessor.count_date_mentions(text) == 2  # 3月1日と年月のみの4月（列挙・分数は数えない）
+        assert JapaneseTextProcessor.contains_date_mention("1/21 追加公演決定")
+        assert not JapaneseTextProcessor.contains_date_mention("A4の1/2サイズ 価格未定")
+
+
+class TestDateGrammar:
+    """parse_date_expressions・extract_dates_jp のテストクラス"""
+
+    @staticmethod
+    def _parse(text, today=TODAY):
+        return [(e['start'], e['end']) for e in JapaneseTextProcessor.parse_date_expressions(text, today)]
+
+    def test_ranges(self):
+        """日だけ・月日・年跨ぎの期間を読む"""
+        assert self._parse("1月15日〜17日") == [(date(2025, 1, 15), date(2025, 1, 17))]
+        assert self._parse("3/1(土)〜3(月) 18:00") == [(date(2025, 3, 1), date(2025, 3, 3))]
+        assert self._parse("12/30〜1/2") == [(date(2024, 12, 30), date(2025, 1, 2))]
+        assert self._parse("11/29〜2") == [(date(2024, 11, 29), date(2024, 12, 2))]
+
+    def test_year_forms(self):
+        """ドット・ハイフン・スラッシュ区切り、和暦（元年を含む）を読む"""
+        assert JapaneseTextProcessor.extract_dates_jp(
+            "2025.03.01 / 2025-03-02T18:00 / ２０２５/３/３ / 令和7年3月4日 / 平成元年1月8日", TODAY
+        ) == ["2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04", "1989-01-08"]
+
+    def test_year_rollover_and_weekday(self):
+        """年のない日付は過ぎていれば翌年、曜日表記と合う年があればそちらを選ぶ"""
+        assert JapaneseTextProcessor.extract_date_jp("1/15 開催", TODAY) == "2025-01-15"
+        assert JapaneseTextProcessor.extract_date_jp("10月20日 開催", TODAY) == "2024-10-20"
+        assert JapaneseTextProcessor.extract_date_jp("3.1(金) 開催", TODAY) == "2024-03-01"
+        assert JapaneseTextProcessor.extract_date_jp("3.1 開催", TODAY) is None
+
+    def test_weekday_mismatch_is_not_a_date(self):
+        """どの年も曜日表記と合わない年のない日付（過去の記事など）は読まない"""
+        assert JapaneseTextProcessor.extract_date_jp("2/14(月) 開催", TODAY) is None
+        assert self._parse("2/14(月) 2/14(金)") == [(date(2025, 2, 14), None)]
+
+    def test_year_is_carried_from_previous_date(self):
+        """直前の年付き日付を基準に年を補う"""
+        assert JapaneseTextProcessor.extract_dates_jp("2026年12月28日 公演 追加公演 1/5", TODAY) == [
+            "2026-12-28", "2027-01-05"
+        ]
+
+    def test_times_are_not_dates(self):
+        assert self._parse("開演 18:00〜20:00 / 3.5倍") == []
+
+    def test_time_after_separator_is_not_range_end(self):
+        """区切りの後ろの時刻は期間の終了日として読まない"""
+        assert self._parse("3/1 - 20時") == [(date(2025, 3, 1), None)]
+        assert self._parse("3/1〜20:00") == [(date(2025, 3, 1), None)]
+
+    def test_fractions_are_not_dates(self):
+        """直後に日付らしい文脈がない M/D（分数）は読まない"""
+        assert self._parse("1/2サイズ") == []
+        assert self._parse("第3/4半期") == []
+        assert self._parse("3/1、3/5 開催") == [(date(2025, 3, 1), None), (date(2025, 3, 5), None)]
+
+    def test_normalize_date_uses_grammar(self):
+        """Geminiが返す年なし・曜日付きの日付も正規化できる"""
+        assert JapaneseTextProcessor.normalize_date("2025/03/01(土)") == "2025-03-01"
+        assert JapaneseTextProcessor.normalize_date("令和7年3月1日") == "2025-03-01"
+        assert JapaneseTextProcessor.normalize_date("20250120") == "2025-01-20"
+        assert JapaneseTextProcessor.normalize_date("20251340") is None
+        assert JapaneseTextProcessor.normalize_date("未定") is None
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+LLMClientRegistry のテスト
+"""
+
+import sys
+import os
+from unittest.mock import patch
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.llm_clients import LLMClientRegistry
+
+
+class TestLLMClientRegistry:
+    """LLMクライアント共有レジストリのテストクラス"""
+
+    def test_client_is_created_once(self):
+        """同じキーのクライアントは1度だけ生成される"""
+        registry = LLMClientRegistry()
+        created = []
+
+        def factory():
+            created.append(1)
+            return object()
+
+        first = registry.get("key", factory)
+
+        assert registry.get("key", factory) is first
+        assert len(created) == 1
+        assert registry.get_stats()['created'] == 1
+        assert registry.get_stats()['reused'] == 1
+
+    @patch('app.services.llm_clients.genai')
+    def test_gemini_models_are_shared(self, mock_genai):
+        """Geminiモデルの生成とAPIキー設定はプロセスで1度だけ行われる"""
+        registry = LLMClientRegistry()
+
+        first = registry.get_gemini_models("key", ["flash", "pro"])
+        second = registry.get_gemini_models("key", ["flash", "pro"])
+
+        assert [model for _, model in first] == [model for _, model in second]
+        assert mock_genai.GenerativeModel.call_count == 2
+        mock_genai.configure.assert_called_once_with(api_key="key")
+
+    @patch('app.services.llm_clients.genai')
+    def test_warm_up_creates_cascade_models(self, mock_genai):
+        """起動時のウォームアップでカスケードの全モデルが生成される"""
+        registry = LLMClientRegistry()
+
+        with patch('app.services.llm_clients.Config.GEMINI_CASCADE_MODELS', ["flash", "pro"]):
+            assert registry.warm_up("key") == 2
+            registry.get_gemini_model("key", "pro")
+
+        assert mock_genai.GenerativeModel.call_count == 2
+
+    def test_warm_up_without_api_key_is_skipped(self):
+        """APIキーがなければ何も生成しない"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert LLMClientRegistry().warm_up() == 0
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+PageContentFetcher のテスト
+検索結果ページの本文取得・条件付きGETをモックしてテスト
+"""
+
+import asyncio
+import httpx
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.page_fetcher import PageContentFetcher
+
+PAGE_HTML = """
+<html><head><script>var d = "2025/01/01";</script></head>
+<body>
+  <nav>2024年12月1日 お知らせ一覧</nav>
+  <h1>BLACKPINK WORLD TOUR</h1>
+  <p>ツアーの詳細は後日発表します。</p>
+  <table><tr><td>2025年1月20日（月）</td><td>東京ドーム 18:00開演</td></tr></table>
+  <p>1/21 追加公演決定</p>
+</body></html>
+"""
+
+
+class TestPageContentFetcher:
+    """PageContentFetcher のテストクラス"""
+
+    def test_extracts_only_date_blocks(self):
+        """日付を含むブロックのみ抽出し、script・navは除外する"""
+        text = PageContentFetcher.extract_date_blocks(PAGE_HTML)
+
+        assert "2025年1月20日（月）" in text
+        assert "1/21 追加公演決定" in text
+        assert "後日発表" not in text
+        assert "2024年12月1日" not in text
+        assert "2025/01/01" not in text
+
+    def test_conditional_get_returns_cached_text_on_304(self):
+        """2回目はETagを送信し、304なら保存済みの本文を返す"""
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, html=PAGE_HTML, headers={"ETag": '"v1"'})
+
+        fetcher = PageContentFetcher(
+            db_path="", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        url = "https://blackpink.example.com/tour"
+
+        first = asyncio.run(fetcher.fetch_date_text(url))
+        second = asyncio.run(fetcher.fetch_date_text(url))
+
+        assert first == second
+        assert "2025年1月20日" in first
+        assert requests_seen[1].headers["if-none-match"] == '"v1"'
+        assert fetcher.get_stats() == {'fetched': 1, 'not_modified': 1, 'failed': 0}
+
+    def test_html_is_parsed_off_the_event_loop(self):
+        """HTMLの解析はイベントループのスレッドではなくワーカースレッドで行う"""
+        parsed_on = []
+
+        def extract(html):
+            parsed_on.append(threading.get_ident())
+            return "1月1日"
+
+        fetcher = PageContentFetcher(
+            db_path="", client=httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: httpx.Response(200, html=PAGE_HTML))
+            )
+        )
+
+        async def run():
+            with patch.object(PageContentFetcher, "extract_date_blocks", staticmethod(extract)):
+                text = await fetcher.fetch_date_text("https://example.com/tour")
+            return text, threading.get_ident()
+
+        text, loop_thread = asyncio.run(run())
+
+        assert text == "1月1日"
+        assert parsed_on and parsed_on[0] != loop_thread
+
+    def test_body_is_capped(self):
+        """上限バイト数を超える本文は切り詰められる"""
+        html = "<p>2025年1月20日 公演</p>" + "<p>x</p>" * 10000 + "<p>2025年2月1日 追加公演</p>"
+
+        def handler(request):
+            return httpx.Response(200, html=html)
+
+        fetcher = PageContentFetcher(
+            db_path="", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+
+        with patch('app.services.page_fetcher.Config.PAGE_FETCH_MAX_BYTES', 1024):
+            text = asyncio.run(fetcher.fetch_date_text("https://example.com/long"))
+
+        assert "2025年1月20日" in text
+        assert "2025年2月1日" not in text
+
+    def test_per_host_concurrency_is_limited(self):
+        """同一ホストへの同時接続数が制限される"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, html="<p>1月1日</p>")
+
+        async def run():
+            fetcher = PageContentFetcher(
+                db_path="", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            )
+            results = [{"url": f"https://example.com/{i}"} for i in range(6)]
+            return await fetcher.enrich_results(results)
+
+        with patch('app.services.page_fetcher.Config.PAGE_FETCH_PER_HOST', 2):
+            enriched = asyncio.run(run())
+
+        assert peak == 2
+        assert all(result["page_text"] == "1月1日" for result in enriched)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+再試行とサーキットブレーカーのテスト
+"""
+
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+
+import pytest
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.resilience import (
+    CircuitBreaker, CircuitOpenError, DependencyUnavailableError, TransientError,
+    backoff_delay, call_with_retry, parse_retry_after
+)
+
+
+def _flaky(failures, error=None):
+    """指定回数だけ失敗してから成功する呼び出し"""
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error or TransientError("503", 503)
+        return "ok"
+    return call, calls
+
+
+@pytest.fixture
+def sleeps():
+    """asyncio.sleepの待機秒数を記録（実際には待たない）"""
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    with patch('app.services.resilience.asyncio.sleep', fake_sleep):
+        yield recorded
+
+
+class TestRetry:
+    """call_with_retry のテストクラス"""
+
+    def test_transient_errors_are_retried(self, sleeps):
+        call, calls = _flaky(2)
+
+        assert asyncio.run(call_with_retry(call, CircuitBreaker("dep"), max_attempts=3)) == "ok"
+        assert len(calls) == 3
+        assert len(sleeps) == 2
+
+    def test_gives_up_after_max_attempts(self, sleeps):
+        call, calls = _flaky(5)
+
+        with pytest.raises(DependencyUnavailableError):
+            asyncio.run(call_with_retry(call, CircuitBreaker("dep"), max_attempts=3))
+        assert len(calls) == 3
+
+    def test_non_transient_errors_are_not_retried(self, sleeps):
+        call, calls = _flaky(1, ValueError("bad request"))
+
+        with pytest.raises(ValueError):
+            asyncio.run(call_with_retry(call, CircuitBreaker("dep"), max_attempts=3))
+        assert len(calls) == 1
+
+    def test_retry_after_is_honored(self, sleeps):
+        """サーバー指定の待機秒数以上待ってから再試行する"""
+        call, _ = _flaky(1, TransientError("429", 429, retry_after=3.0))
+
+        asyncio.run(call_with_retry(call, CircuitBreaker("dep"), base_delay=0.1, max_delay=10.0))
+
+        assert sleeps == [3.0]
+
+    def test_retry_after_is_not_clamped_to_max_delay(self, sleeps):
+        """Retry-Afterがバックオフ上限より長くても短縮しない"""
+        call, _ = _flaky(1, TransientError("429", 429, retry_after=20.0))
+
+        asyncio.run(call_with_retry(call, CircuitBreaker("dep"), base_delay=0.1, max_delay=2.0, deadline=60.0))
+
+        assert sleeps == [20.0]
+
+    def test_retry_after_beyond_deadline_gives_up(self, sleeps):
+        """Retry-Afterが全体の期限を超える場合は待たずに諦める"""
+        call, calls = _flaky(1, TransientError("429", 429, retry_after=120.0))
+
+        with pytest.raises(DependencyUnavailableError) as excinfo:
+            asyncio.run(call_with_retry(call, CircuitBreaker("dep"), max_attempts=3, deadline=30.0))
+
+        assert len(calls) == 1
+        assert sleeps == []
+        assert excinfo.value.retry_after == 120.0
+
+    def test_backoff_is_bounded(self):
+        assert all(0 <= backoff_delay(attempt, 0.5, 2.0) <= 2.0 for attempt in range(1, 10))
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestCircuitBreaker:
+    """CircuitBreaker のテストクラス"""
+
+    def test_opens_after_threshold_and_fails_fast(self, sleeps):
+        breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout=60)
+        call, calls = _flaky(10)
+
+        with pytest.raises(DependencyUnavailableError):
+            asyncio.run(call_with_retry(call, breaker, max_attempts=2))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(call_with_retry(call, breaker, max_attempts=2))
+
+        assert len(calls) == 2
+        stats = breaker.get_stats()
+        assert stats['state'] == 'open'
+        assert stats['rejected'] == 1
+
+    def test_half_open_trial_closes_circuit(self):
+        breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.get_stats()['state'] == 'half_open'
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # 復旧確認中は1件しか通さない
+        breaker.record_success()
+
+        assert breaker.get_stats()['state'] == 'closed'
+
+    def test_failed_trial_reopens_circuit(self):
+        breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.reset_timeout = 60
+        breaker.record_failure()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_cancelled_trial_releases_half_open_slot(self):
+        """復旧確認の試行がキャンセルされても次の呼び出しが試行できる"""
+        breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def run():
+            trial = asyncio.ensure_future(call_with_retry(hang, breaker))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            return await call_with_retry(_flaky(0)[0], breaker)
+
+        assert asyncio.run(run()) == "ok"
+        assert breaker.get_stats()['state'] == 'closed'
+
+    def test_non_transient_error_does_not_close_or_reset_circuit(self, sleeps):
+        """呼び出し側の誤りは回復の証拠にならず、連続失敗数もリセットしない"""
+        breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        breaker.record_failure()
+
+        with pytest.raises(ValueError):
+            asyncio.run(call_with_retry(_flaky(1, ValueError("blocked"))[0], breaker))
+
+        stats = breaker.get_stats()
+        assert stats['state'] == 'half_open'
+        assert stats['consecutive_failures'] == 2
+        assert asyncio.run(call_with_retry(_flaky(0)[0], breaker)) == "ok"  # 復旧確認の枠は解放済み
+
+    def test_google_deadline_exceeded_is_transient(self, sleeps):
+        """Geminiの504（DeadlineExceeded・GatewayTimeout）は再試行する"""
+        google_exceptions = pytest.importorskip("google.api_core.exceptions")
+        for error in (google_exceptions.DeadlineExceeded("504"), google_exceptions.GatewayTimeout("504")):
+            call, calls = _flaky(1, error)
+
+            assert asyncio.run(call_with_retry(call, CircuitBreaker("dep"), max_attempts=2)) == "ok"
+            assert len(calls) == 2
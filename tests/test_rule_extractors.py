@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+ルールベース抽出器のテスト
+"""
+
+import sys
+import os
+from unittest.mock import patch
+
+import pytest
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rule_extractors import (
+    OfficialScheduleExtractor, RuleExtractor, RuleExtractorRegistry, TicketListingExtractor,
+    build_default_registry
+)
+
+
+class TestTicketListingExtractor:
+    """チケットサイトの公演一覧抽出のテストクラス"""
+
+    def test_eplus_listing(self):
+        """公演日・開演時刻・会場を取り出し、開場時刻は使わない"""
+        result = {
+            "url": "https://eplus.jp/sf/detail/123",
+            "title": "IVE THE 1st WORLD TOUR 'SHOW WHAT I HAVE' - イープラス",
+            "snippet": "2099/12/28(土) 開場15:30 開演17:00 会場：東京ドーム(東京都) 2099/12/29(日) 17:00 東京ドーム"
+        }
+
+        events = TicketListingExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["location"]) for e in events] == [
+            ("2099-12-28", "17:00", "東京ドーム"), ("2099-12-29", "17:00", "東京ドーム")
+        ]
+        assert events[0]["title"] == "IVE THE 1st WORLD TOUR 'SHOW WHAT I HAVE'"
+        assert events[0]["type"] == "コンサート"
+        assert events[0]["source"] == result["url"]
+
+    def test_pia_full_width_listing(self):
+        """全角括弧・年月日表記も読める"""
+        result = {
+            "url": "https://t.pia.jp/pia/event/event.do?eventCd=1",
+            "title": "IVE | チケットぴあ",
+            "snippet": "２０９９年１月２０日（月） 18:30開演 京セラドーム大阪（大阪府）"
+        }
+
+        events = TicketListingExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["location"]) for e in events] == [
+            ("2099-01-20", "18:30", "京セラドーム大阪")
+        ]
+
+    def test_listed_days_share_the_following_detail(self):
+        """「15日・16日 東京ドーム」の列挙はそれぞれの公演日とし、後ろの開演時刻・会場を共有する"""
+        result = {
+            "url": "https://eplus.jp/sf/detail/456",
+            "title": "IVE WORLD TOUR - イープラス",
+            "snippet": "2099年11月15日(日)・16日(月) 開演18:00 東京ドーム"
+        }
+
+        events = TicketListingExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["location"]) for e in events] == [
+            ("2099-11-15", "18:00", "東京ドーム"), ("2099-11-16", "18:00", "東京ドーム")
+        ]
+
+    def test_yearless_range_and_wareki_listing(self):
+        """年のない期間表記・和暦もローカルで読み、期間は開始日で代表させる"""
+        result = {
+            "url": "https://l-tike.com/concert/mevent/?mid=2",
+            "title": "IVE FANMEETING | ローチケ",
+            "snippet": "令和9年2月1日 17:00 大阪城ホール 2/3(水)〜5(金) 開演18:00 横浜アリーナ"
+        }
+
+        events = TicketListingExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["location"]) for e in events] == [
+            ("2027-02-01", "17:00", "大阪城ホール"), ("2027-02-03", "18:00", "横浜アリーナ")
+        ]
+
+    def test_yearless_date_without_weekday_is_left_for_llm(self):
+        """年も曜日もない日付は年を確定できないためLLMに回す"""
+        result = {
+            "url": "https://l-tike.com/concert/mevent/?mid=3",
+            "title": "IVE FANMEETING | ローチケ",
+            "snippet": "5/3 開演18:00 横浜アリーナ"
+        }
+
+        assert TicketListingExtractor().extract(result, "IVE") is None
+
+    def test_other_artist_listing_is_left_for_llm(self):
+        """タイトルにアーティスト名がない（LIVE中のIVEなど）一覧は扱わない"""
+        result = {
+            "url": "https://l-tike.com/concert/mevent/?mid=1",
+            "title": "aespa LIVE TOUR | ローチケ",
+            "snippet": "2099/1/1 開演18:00 横浜アリーナ"
+        }
+
+        assert TicketListingExtractor().extract(result, "IVE") is None
+
+    def test_sale_dates_are_not_performances(self):
+        """発売・受付日程の日付は公演として扱わない（見出しが日付の前でも後でも）"""
+        result = {
+            "url": "https://eplus.jp/sf/detail/3",
+            "title": "IVE TOUR - イープラス",
+            "snippet": "2099/12/28(月) 開演17:00 東京ドーム 一般発売：2099/11/1(日) 10:00〜 "
+                       "2099/10/1(木) 12:00 先行抽選受付締切"
+        }
+
+        events = TicketListingExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["location"]) for e in events] == [("2099-12-28", "17:00", "東京ドーム")]
+
+    def test_date_without_performance_signal_is_left_for_llm(self):
+        """開演時刻・会場の手がかりがない日付を含む一覧はLLMに回す"""
+        result = {
+            "url": "https://eplus.jp/sf/detail/4",
+            "title": "IVE TOUR - イープラス",
+            "snippet": "2099/12/28(月) 開演17:00 東京ドーム 2099/12/1 詳細は後日発表"
+        }
+
+        assert TicketListingExtractor().extract(result, "IVE") is None
+
+    def test_listing_without_date_is_left_for_llm(self):
+        result = {"url": "https://eplus.jp/ive/", "title": "IVE - イープラス", "snippet": "チケット情報はこちら"}
+
+        assert TicketListingExtractor().extract(result, "IVE") is None
+
+
+class TestOfficialScheduleExtractor:
+    """公式スケジュールページ抽出のテストクラス"""
+
+    SCHEDULE = "SCHEDULE\n2099.01.20 [LIVE] IVE THE 2nd TOUR\n2099.02.01 [TV] ミュージックステーション 21:00"
+
+    def test_reads_one_event_per_line(self):
+        result = {"url": "https://ive-official.jp/schedule/", "title": "SCHEDULE | OFFICIAL",
+                  "page_text": self.SCHEDULE}
+
+        events = OfficialScheduleExtractor().extract(result, "IVE")
+
+        assert [(e["date"], e["time"], e["title"]) for e in events] == [
+            ("2099-01-20", "", "IVE THE 2nd TOUR"), ("2099-02-01", "21:00", "ミュージックステーション")
+        ]
+
+    def test_only_official_hosts_match(self):
+        """パスがスケジュール風でも公式サイト以外（ニュース記事など）は対象にしない"""
+        extractor = OfficialScheduleExtractor()
+
+        assert extractor.matches({"url": "https://ive-official.jp/schedule/"})
+        assert not extractor.matches({"url": "https://news.example.com/event/ive-tour"})
+        assert not extractor.matches({"url": "https://ive-official.jp/news/1"})
+
+    def test_configured_official_domains(self):
+        """設定したアーティストの公式ドメインのみそのアーティストのページとして読む"""
+        result = {"url": "https://www.starship-ent.example/schedule/", "page_text": self.SCHEDULE}
+
+        with patch('app.services.rule_extractors.Config.OFFICIAL_SITE_DOMAINS',
+                   {'ive': ['starship-ent.example']}):
+            extractor = OfficialScheduleExtractor()
+            assert extractor.matches(result)
+            assert len(extractor.extract(result, "IVE")) == 2
+            assert extractor.extract(result, "aespa") is None
+
+    def test_prose_is_left_for_llm(self):
+        """日付が行頭にない・助詞で始まる・句読点を含む行は記事の本文とみなしてLLMに回す"""
+        extractor = OfficialScheduleExtractor()
+        url = "https://ive-official.jp/event/"
+
+        for page_text in [
+            "IVEが2099年1月20日に来日公演を開催",
+            "2099.01.20 に東京ドームで公演を行うことが決定した。",
+            "2099.01.20 [LIVE] IVE THE 2nd TOUR 2099.02.01 [TV] ミュージックステーション",
+        ]:
+            assert extractor.extract({"url": url, "page_text": page_text}, "IVE") is None
+
+
+class TestRuleExtractorRegistry:
+    """抽出器レジストリのテストクラス"""
+
+    def test_results_are_split_between_rules_and_llm(self):
+        """ルールで読めた結果はイベントに、それ以外はLLM用に残す"""
+        results = [
+            {"url": "https://eplus.jp/sf/detail/1", "title": "IVE TOUR - イープラス",
+             "snippet": "2099/12/28(土) 17:00 東京ドーム"},
+            {"url": "https://ive-official.jp/schedule/", "title": "SCHEDULE | OFFICIAL",
+             "page_text": "2099.01.20 [LIVE] IVE THE 2nd TOUR\n2099.02.01 [TV] ミュージックステーション 21:00"},
+            {"url": "https://natalie.mu/music/news/1", "title": "IVE来日", "snippet": "2099年1月20日"},
+        ]
+
+        events, handled, leftovers = build_default_registry().extract(results, "IVE")
+
+        assert handled == 2
+        assert [r["url"] for r in leftovers] == ["https://natalie.mu/music/news/1"]
+        assert [(e["date"], e["title"], e["type"]) for e in events] == [
+            ("2099-12-28", "IVE TOUR", "コンサート"),
+            ("2099-01-20", "IVE THE 2nd TOUR", "コンサート"),
+            ("2099-02-01", "ミュージックステーション", "テレビ出演"),
+        ]
+
+    def test_subdomains_and_custom_extractors(self):
+        """サブドメインも登録ドメインに一致し、独自の抽出器を追加できる"""
+        class FanclubExtractor(RuleExtractor):
+            name = 'fanclub'
+            domains = ['fanclub.example.jp']
+
+            def extract(self, result, artist_name, today=None):
+                return [self._event(result, artist_name, "2099-03-01", "FANMEETING")]
+
+        registry = RuleExtractorRegistry()
+        registry.register(FanclubExtractor())
+
+        assert registry.find({"url": "https://ive.fanclub.example.jp/news"}).name == 'fanclub'
+        assert registry.find({"url": "https://example.jp/news"}) is None
+
+    def test_extractors_must_implement_extract(self):
+        """extractを実装していない抽出器は作成できない"""
+        class IncompleteExtractor(RuleExtractor):
+            domains = ['incomplete.example.jp']
+
+        with pytest.raises(TypeError):
+            IncompleteExtractor()
+
+    def test_failing_extractor_falls_back_to_llm(self):
+        """抽出器の例外は検索結果をLLMに回す"""
+        class BrokenExtractor(RuleExtractor):
+            domains = ['broken.example.jp']
+
+            def extract(self, result, artist_name, today=None):
+                raise ValueError("unexpected layout")
+
+        registry = RuleExtractorRegistry()
+        registry.register(BrokenExtractor())
+        result = {"url": "https://broken.example.jp/1"}
+
+        assert registry.extract([result], "IVE") == ([], 0, [result])
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+検索結果処理ユーティリティのテスト
+URL正規化・近似重複除去・トークン予算内の結果選択
+"""
+
+import sys
+import os
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.search_results import (
+    canonicalize_url, dedupe_search_results, estimate_tokens, hamming_distance, simhash,
+    score_search_result, select_results_within_budget
+)
+
+
+class TestCanonicalizeUrl:
+    """canonicalize_url のテストクラス"""
+
+    def test_strips_tracking_params_and_fragment(self):
+        """トラッキングパラメータとフラグメントを除去し、残りを並べ替える"""
+        url = "http://www.example.com/news/123/?utm_source=x&id=5&fbclid=abc&a=1#top"
+        assert canonicalize_url(url) == "https://example.com/news/123?a=1&id=5"
+
+    def test_amp_and_mobile_variants_collapse(self):
+        """AMP・モバイル版は同じURLに正規化される"""
+        expected = canonicalize_url("https://natalie.mu/music/news/500000")
+        assert canonicalize_url("https://m.natalie.mu/music/news/500000/amp") == expected
+        assert canonicalize_url("https://natalie.mu/amp/music/news/500000") == expected
+        assert canonicalize_url("https://natalie.mu/music/news/500000?amp=1") == expected
+
+    def test_invalid_url_is_returned_as_is(self):
+        """解析できないURLはそのまま返す"""
+        assert canonicalize_url("not a url") == "not a url"
+        assert canonicalize_url("") == ""
+
+
+class TestNearDuplicateDetection:
+    """SimHashによる近似重複除去のテストクラス"""
+
+    ARTICLE = "BLACKPINK、2025年1月20日に東京ドームで来日公演を開催することが決定した。チケットは12月より販売"
+
+    def test_similar_snippets_have_close_hashes(self):
+        """配信先で句読点などが違うだけの記事は近いハッシュになる"""
+        syndicated = self.ARTICLE.replace("、", " ").replace("。", "！")
+        unrelated = "TWICEが新アルバムのリリースを発表。収録曲のタイトルも公開された"
+
+        assert hamming_distance(simhash(self.ARTICLE), simhash(syndicated)) <= 3
+        assert hamming_distance(simhash(self.ARTICLE), simhash(unrelated)) > 3
+
+    def test_dedupe_prefers_reliable_source(self):
+        """重複グループ内では信頼性の高いURLが残る"""
+        results = [
+            {"title": "来日公演決定", "url": "https://matome.example.com/1", "snippet": self.ARTICLE},
+            {"title": "来日公演決定", "url": "https://natalie.mu/music/news/1", "snippet": self.ARTICLE + "。"},
+            {"title": "来日公演決定", "url": "https://natalie.mu/music/news/1?utm_source=x", "snippet": "別の概要"},
+            {"title": "新曲", "url": "https://example.com/2", "snippet": "TWICEが新アルバムのリリースを発表"},
+        ]
+
+        kept, removed = dedupe_search_results(results)
+
+        assert [r["url"] for r in kept] == ["https://natalie.mu/music/news/1", "https://example.com/2"]
+        assert len(removed) == 2
+
+    def test_estimate_tokens(self):
+        """日本語は1文字1トークン、英数字は4文字1トークンで見積もる"""
+        assert estimate_tokens("東京ドーム") == 5
+        assert estimate_tokens("BLACKPINK") == 3
+        assert estimate_tokens("") == 0
+
+
+class TestBudgetedSelection:
+    """価値順・トークン予算内の検索結果選択のテストクラス"""
+
+    reliable = {"url": "https://eplus.jp/ive", "title": "IVE 公演", "snippet": "2099年1月20日 東京ドーム"}
+    dated_blog = {"url": "https://blog.example.com/ive", "title": "IVE 公演", "snippet": "2099年1月20日 東京ドーム"}
+    noise = {"url": "https://blog.example.com/noise", "title": "IVEのメンバー紹介", "snippet": "プロフィールまとめ" * 20}
+
+    def test_reliable_and_dated_results_score_higher(self):
+        """信頼性の高い情報源・日付表記の多い結果ほど高く評価される"""
+        assert score_search_result(self.reliable) > score_search_result(self.dated_blog)
+        assert score_search_result(self.dated_blog) > score_search_result(self.noise)
+
+    def test_budget_is_filled_highest_value_first(self):
+        """予算内で価値の高い順に採用し、予算を超える結果は除外する"""
+        render = lambda result: f"{result['title']} {result['url']} {result['snippet']}"
+        budget = estimate_tokens(render(self.reliable)) + estimate_tokens(render(self.dated_blog))
+
+        selected, tokens = select_results_within_budget([self.noise, self.dated_blog, self.reliable], budget, render)
+
+        assert selected == [self.reliable, self.dated_blog]
+        assert tokens <= budget
+
+    def test_best_result_is_kept_even_over_budget(self):
+        """予算が小さすぎても最も価値の高い1件は含める"""
+        selected, _ = select_results_within_budget([self.noise, self.reliable], 1, lambda r: r['snippet'])
+
+        assert selected == [self.reliable]
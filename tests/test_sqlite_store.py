@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+SQLiteStore・TTLCache のテスト
+"""
+
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# プロジェクトのルートをPythonパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.search_cache import SearchCache
+from app.services.schedule_collector import SearchQuotaManager
+
+
+class TestSQLiteStore:
+    """SQLiteストア・キャッシュ共通のデータベース準備のテストクラス"""
+
+    def test_store_falls_back_to_memory_database(self, tmp_path):
+        """開けないパスではメモリ上のDBで動作を続ける"""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        quota = SearchQuotaManager(daily_quota=10, db_path=str(blocker / "quota.sqlite3"))
+
+        assert quota.try_consume(3)
+        assert quota.get_used() == 3
+
+    def test_cache_falls_back_to_memory_only(self, tmp_path):
+        """開けないパスではSQLite層なしでプロセス内LRUのみ使う"""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        cache = SearchCache(db_path=str(blocker / "cache.sqlite3"))
+
+        cache.set({"q": "IVE"}, [{"title": "IVE"}])
+
+        assert cache.get({"q": "IVE"}) == [{"title": "IVE"}]
+        assert cache.get_stats()['persistent'] is False
+
+    def test_cache_persists_and_expires(self, tmp_path):
+        """SQLite層は再起動後もヒットし、TTLが切れたエントリは読まずに削除できる"""
+        db_path = str(tmp_path / "cache.sqlite3")
+        SearchCache(db_path=db_path, ttl=60).set({"q": "IVE"}, [{"title": "IVE"}])
+
+        cache = SearchCache(db_path=db_path)
+        assert cache.get({"q": "IVE"}) == [{"title": "IVE"}]
+        assert cache.get_stats()['disk_hits'] == 1
+
+        with patch('app.services.sqlite_store.time.time', return_value=time.time() + 61):
+            assert cache.get({"q": "IVE"}) is None
+            assert cache.purge_expired() == 1
+        assert SearchCache(db_path=db_path).get({"q": "IVE"}) is None